@@ -1,14 +1,28 @@
 import dash
+import flask
 from dash import html, dcc, Output, Input, State, ctx, MATCH, ALL, callback
 import dash_bootstrap_components as dbc
 from .models import CalculationGraph, Node, Parameter, CanvasLayoutManager, GridPosition
-from .session_graph import get_graph, set_graph, GraphProxy
+from .session_graph import get_graph, set_graph, GraphProxy, record_current_session
+from .autosave import start_autosave
+from .edge_index import edge_payload
+from .search_index import search_index_for
+from .trace_store import get_trace_store, PlotGrid
+from .downsample import lttb, downsample_range
+from .sweep import coarse_to_fine_order, adaptive_sample
+from .sweep_cache import SWEEP_CACHE, sweep_cache_key
+from .batch_eval import ConeEvaluator, evaluate_grid
+from .montecarlo import uncertain_inputs, run_monte_carlo, summarize
+from .tornado import perturbable_inputs, run_tornado
+from .derivatives import downstream_order, forward_derivatives
+from .jobs import JobCancelled, JobRejected, Job, get_job_runner, session_owner, interactive_priority
 from typing import Dict, Optional, List, Any
 import json
 from datetime import datetime
 import uuid
 import plotly.graph_objects as go
 import numpy as np
+import math
 import os
 from .layout import *
 from .examples import *
@@ -16,6 +30,9 @@ import traceback
 from .clientside_callbacks import register_all_clientside_callbacks
 from .constants import AppConstants, ValidationConstants, PerformanceConstants
 import time
+import weakref
+import functools
+from dash._callback import NoUpdate
 
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], suppress_callback_exceptions=True)
 
@@ -23,6 +40,15 @@ app.server.secret_key = os.environ.get("SECRET_KEY", str(uuid.uuid4()))
 
 graph: CalculationGraph = GraphProxy()
 
+
+@app.server.after_request
+def record_session_journal(response):
+    """回调请求结束后把本次修改追加到会话日志，用于进程重启后恢复"""
+    if flask.request.path.endswith("_dash-update-component"):
+        record_current_session()
+    return response
+
+
 # 创建布局管理器
 layout_manager = CanvasLayoutManager(
     initial_cols=AppConstants.DEFAULT_INITIAL_COLUMNS, 
@@ -30,6 +56,59 @@ layout_manager = CanvasLayoutManager(
 )
 graph.set_layout_manager(layout_manager)
 
+# 事件总线：模式匹配回调使用 MATCH 只上传触发组件自身的数据，
+# 回调没有固定输出，结果通过 set_props 写入全局的 store
+# （MATCH 输入、没有输出的回调需要 Dash 4.2.0 及以上，更早版本的前端会因输出中缺少通配符而报错）
+EVENT_BUS_OUTPUTS = [
+    ("node-data", "data"),
+    ("canvas-events", "data"),
+    ("app-messages", "data"),
+]
+
+PARAM_EDIT_MODAL_OUTPUTS = [
+    ("param-edit-modal", "is_open"),
+    ("param-edit-title", "children"),
+    ("param-edit-name", "value"),
+    ("param-edit-type", "value"),
+    ("param-edit-value-display", "children"),
+    ("param-edit-unit", "value"),
+    ("param-edit-description", "value"),
+    ("param-edit-confidence-display", "children"),
+    ("param-edit-distribution", "value"),
+    ("param-edit-calculation", "value"),
+    ("dependency-selector-container", "children"),
+    ("param-edit-data", "data"),
+    ("param-edit-preview", "children"),
+    ("param-edit-preview", "color"),
+]
+
+NODE_EDIT_MODAL_OUTPUTS = [
+    ("node-edit-modal", "is_open"),
+    ("node-edit-title", "children"),
+    ("node-edit-name", "value"),
+    ("node-edit-description", "value"),
+    ("node-edit-data", "data"),
+]
+
+def event_bus_callback(*dependencies, outputs=EVENT_BUS_OUTPUTS, **kwargs):
+    """注册无输出的回调，被装饰函数的返回值按 outputs 顺序通过 set_props 推送
+
+    Args:
+        dependencies: 回调的 Input/State
+        outputs: (组件ID, 属性) 列表，与函数返回值一一对应；值为 no_update 的项不推送
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def publish(*args):
+            results = func(*args)
+            for (component_id, prop), value in zip(outputs, results):
+                if not isinstance(value, NoUpdate):
+                    dash.set_props(component_id, {prop: value})
+
+        callback(*dependencies, **kwargs)(publish)
+        return func
+    return decorator
+
 # 画布事件处理辅助函数
 def create_canvas_event(event_type, data=None):
     """创建画布更新事件"""
@@ -39,6 +118,17 @@ def create_canvas_event(event_type, data=None):
         "data": data or {}
     }
 
+def create_node_moved_event(node_id, direction, old_position, old_cols):
+    """创建节点移动/删除事件，附带受影响的列，供画布局部更新使用"""
+    new_position = graph.layout_manager.get_node_position(node_id)
+    columns = {pos.col for pos in (old_position, new_position) if pos is not None}
+    return create_canvas_event("node_moved", {
+        "node_id": node_id,
+        "direction": direction,
+        "columns": sorted(columns),
+        "cols_changed": graph.layout_manager.cols != old_cols
+    })
+
 def add_canvas_event(current_events, new_event):
     """添加新事件到事件列表，支持批量事件"""
     try:
@@ -145,13 +235,171 @@ def unified_canvas_update(events):
         # 获取最新事件
         latest_event = events[-1]
         event_type = latest_event.get("type")
-        
-        # 目前所有事件都使用全量更新，后续可以优化为增量更新
+
+        # 未修改计算图的事件无需重新渲染
+        if event_type in NOOP_CANVAS_EVENTS:
+            return dash.no_update
+
+        # 优先使用局部更新，无法局部更新时回退到全量更新
+        patch = incremental_canvas_update(event_type, latest_event.get("data") or {})
+        if patch is not None:
+            return patch
         return update_canvas()
     except Exception as e:
         print(f"Error in unified_canvas_update: {e}")
         return update_canvas()
 
+# 不修改计算图的画布事件（校验失败、无效触发等），以及画布已由发布者重绘的 canvas_refreshed
+NOOP_CANVAS_EVENTS = {
+    "canvas_refreshed", "no_trigger", "invalid_trigger", "no_value", "invalid_params", "invalid_node",
+    "invalid_param_index", "param_error", "delete_param_error", "param_move_error",
+    "param_operation_unknown"
+}
+
+def _node_location(node_id):
+    """返回节点在画布中的 (列, 列内序号)，节点不存在时返回None"""
+    position = graph.layout_manager.get_node_position(node_id)
+    if position is None or node_id not in graph.nodes:
+        return None
+    for index, (col_node_id, _) in enumerate(column_node_ids(position.col)):
+        if col_node_id == node_id:
+            return position.col, index
+    return None
+
+def _canvas_columns(patch):
+    # 画布结构: relative-container > Row > [Col...]
+    return patch["props"]["children"][0]["props"]["children"]
+
+def _patch_node(patch, node_id, lean):
+    """在patch中整体替换一个节点，成功返回True"""
+    location = _node_location(node_id)
+    if location is None:
+        return False
+    col, index = location
+    _canvas_columns(patch)[col]["props"]["children"][index] = render_node_slot(node_id, graph.layout_manager.get_node_position(node_id).row, col, lean)
+    return True
+
+def _patch_param_cell(patch, node_id, param_idx, field, lean, replace_cell=False):
+    """在patch中更新参数输入框的值和样式；replace_cell为True时整体替换参数值单元格"""
+    location = _node_location(node_id)
+    node = graph.nodes.get(node_id)
+    if location is None or param_idx >= len(node.parameters):
+        return False
+    col, index = location
+    materialized = MATERIALIZED_NODES.get(get_graph())
+    if materialized is not None and node_id not in materialized:
+        return True  # 占位块中没有参数输入框，进入视口时会按最新状态渲染
+    param = node.parameters[param_idx]
+    # 节点结构: node-container > [header, param-table, node-content]; 参数行: Tr > [名称Td, 值Td, 菜单Td]
+    row = _canvas_columns(patch)[col]["props"]["children"][index]["props"]["children"][1]["props"]["children"][param_idx]
+    if field == "name":
+        # 名称Td > param-row-container > [pin, Tooltip, Input]
+        row["props"]["children"][0]["props"]["children"]["props"]["children"][2]["props"]["value"] = param.name
+    elif replace_cell:
+        row["props"]["children"][1] = render_param_value_cell(node_id, param_idx, param, lean)
+    else:
+        # 值Td > param-value-container > [Tooltip, 输入容器 > [Input, 单位]]
+        value_input = row["props"]["children"][1]["props"]["children"]["props"]["children"][1]["props"]["children"][0]
+        value_input["props"]["value"] = str(param.value)
+        value_input["props"]["style"] = param_value_style(node_id, param_idx, param)
+    return True
+
+def incremental_canvas_update(event_type, data):
+    """根据事件类型生成画布局部更新（dash.Patch）
+
+    参数值变化只更新相关输入框的值和高亮样式，节点移动只重绘受影响的列，
+    参数增删移动只重绘所在节点。无法安全地局部更新时返回None，由调用方全量重绘。
+    """
+    if not graph.nodes or graph.layout_manager.cols < AppConstants.MIN_LAYOUT_COLUMNS:
+        return None
+
+    lean = lean_render_mode()
+    if RENDERED_LEAN_MODE.get(get_graph()) != lean:
+        return None
+    if (MATERIALIZED_NODES.get(get_graph()) is not None) != virtual_render_mode():
+        return None
+
+    patch = dash.Patch()
+
+    if event_type == "param_updated":
+        if data.get("field") == "name":
+            return patch if _patch_param_cell(patch, data.get("node_id"), data.get("param_index", 0), "name", lean) else None
+        if "updated" not in data:
+            return None
+        relayout = set(data.get("relayout", []))
+        keys = set(data["updated"]) | set(data.get("cleared", []))
+        derivatives = LOCAL_DERIVATIVES.get(get_graph())
+        if derivatives:
+            # 上游值变化使内容哈希改变的导数已过期（值未变的参数也可能受影响）：
+            # 丢弃这些导数并整体替换其单元格，仍有效的导数保持显示
+            entries = derivatives['entries']
+            stale_keys = set()
+            for node_id, node in graph.nodes.items():
+                for param_idx, param in enumerate(node.parameters):
+                    entry = entries.get(param)
+                    if entry is not None and entry[0] != param.content_hash:
+                        del entries[param]
+                        stale_keys.add(f"{node_id}-{param_idx}")
+            keys |= stale_keys
+            relayout |= stale_keys
+        for key in keys:
+            node_id, param_idx = key.rsplit("-", 1)
+            if not _patch_param_cell(patch, node_id, int(param_idx), "value", lean, replace_cell=key in relayout):
+                return None
+        return patch
+
+    if event_type == "node_moved":
+        if data.get("cols_changed", True) or "columns" not in data:
+            return None
+        columns = _canvas_columns(patch)
+        for col in data["columns"]:
+            if col >= graph.layout_manager.cols:
+                return None
+            columns[col] = render_column(col, lean)
+        return patch
+
+    if event_type in ("param_added", "param_deleted", "param_moved"):
+        return patch if _patch_node(patch, data.get("node_id"), lean) else None
+
+    return None
+
+@callback(
+    Output("canvas-container", "children", allow_duplicate=True),
+    Input("canvas-viewport", "data"),
+    prevent_initial_call=True
+)
+def materialize_canvas_viewport(viewport):
+    """虚拟化画布的视口变化：进入视口的占位块换成节点，离开视口的节点换回占位块"""
+    if not viewport:
+        raise dash.exceptions.PreventUpdate
+
+    current_graph = get_graph()
+    CANVAS_VIEWPORTS[current_graph] = {"top": viewport.get("top", 0), "bottom": viewport.get("bottom", 0)}
+    heights = NODE_HEIGHTS.setdefault(current_graph, {})
+    for node_id, height in (viewport.get("heights") or {}).items():
+        node = current_graph.nodes.get(node_id)
+        if node is not None:
+            heights[node_id] = (len(node.parameters), height)
+
+    materialized = MATERIALIZED_NODES.get(current_graph)
+    if materialized is None:
+        raise dash.exceptions.PreventUpdate
+    if not virtual_render_mode() or RENDERED_LEAN_MODE.get(current_graph) != lean_render_mode():
+        return update_canvas()
+
+    visible = visible_node_ids()
+    changed = visible ^ materialized
+    if not changed:
+        raise dash.exceptions.PreventUpdate
+
+    MATERIALIZED_NODES[current_graph] = visible
+    lean = RENDERED_LEAN_MODE.get(current_graph)
+    patch = dash.Patch()
+    for node_id in changed:
+        if not _patch_node(patch, node_id, lean):
+            return update_canvas()
+    return patch
+
 # 统一的消息渲染处理器
 @callback(
     Output("output-result", "children"),
@@ -231,23 +479,20 @@ def create_dependency_checkboxes(available_params, selected_deps=None):
     return checkboxes
 
 def get_plotting_parameters():
-    """获取所有可用于绘图的参数"""
-    all_params = []
-    for node_id, node in graph.nodes.items():
-        for param in node.parameters:
-            if hasattr(param, 'param_type') and param.param_type in ['float', 'int'] and isinstance(param.value, (int, float)):
-                all_params.append({
-                    'label': f"{node.name}.{param.name}",
-                    'value': f"{node_id}|{param.name}",
-                    'node_id': node_id,
-                    'param_name': param.name,
-                    'current_value': param.value,
-                    'unit': param.unit
-                })
-    return all_params
+    """获取所有可用于绘图的参数（来自增量维护的参数搜索索引）"""
+    return search_index_for(get_graph()).all()
 
-def perform_sensitivity_analysis(x_param_info, y_param_info, x_start, x_end, x_step):
-    """执行参数敏感性分析"""
+def prepare_sensitivity_analysis(x_param_info, y_param_info, x_start, x_end, x_step, adaptive=False):
+    """解析参数并在当前会话计算图的副本上准备扫描
+
+    adaptive 为True时使用自适应采样（见 sweep.adaptive_sample）：步长作为最小采样间距，
+    只在曲线变化剧烈处加密，计算次数不超过均匀采样点数的 SENSITIVITY_ADAPTIVE_BUDGET_RATIO。
+
+    Returns:
+        成功时为 {'success': True, 'run': 扫描函数, 'cached': 缓存命中时的结果或None}。
+        扫描函数只访问计算图副本，可以在后台线程中执行，接收可选的 Job 用于上报进度和响应取消；
+        失败时为 {'success': False, 'message': ...}
+    """
     try:
         x_node_id, x_param_name = x_param_info['value'].split('|')
         y_node_id, y_param_name = y_param_info['value'].split('|')
@@ -274,65 +519,379 @@ def perform_sensitivity_analysis(x_param_info, y_param_info, x_start, x_end, x_s
         if not x_param or not y_param:
             return {'success': False, 'message': '参数对象不存在'}
 
-        original_x_value = x_param.value
-
-        x_values = []
-        y_values = []
-
         x_range = np.arange(x_start, x_end + x_step, x_step)
 
         if len(x_range) > AppConstants.MAX_DATA_POINTS:
             return {
                 'success': False, 
-                'message': f'数据点过多 ({len(x_range)} 点)，请减少范围或增大步长 (最大1000点)'
+                'message': f'数据点过多 ({len(x_range)} 点)，请减少范围或增大步长 (最大{AppConstants.MAX_DATA_POINTS}点)'
             }
 
-        x_was_unlinked = getattr(x_param, 'unlinked', False)
-        if x_param.calculation_func and x_param.dependencies and not x_was_unlinked:
-            x_param.set_manual_value(x_param.value)  # 保持当前值但断开计算
-
-        for x_val in x_range:
-            try:
-                update_result = graph.set_parameter_value(x_param, float(x_val))
-
-                y_val = y_param.value
-
-                if y_param.calculation_func:
-                    y_val = y_param.calculate()
-
-                x_values.append(float(x_val))
-                y_values.append(float(y_val))
+        # 相同的扫描（Y 的上游锥体内容和扫描设置都相同）直接使用缓存结果
+        cache_key = sweep_cache_key(get_graph(), x_param, y_param, x_start, x_end, x_step, adaptive)
+        cached = SWEEP_CACHE.get(cache_key)
 
-            except Exception as e:
-                print(f"计算错误 (X={x_val}): {e}")
-                continue
+        if cached is None:
+            # 在计算图副本上扫描，不改动当前会话的参数值
+            memo = {}
+            sweep_graph = graph.clone(include_layout=False, memo=memo)
+            x_param = memo[x_param]
+            y_param = memo[y_param]
 
-        if not x_values:
-            return {'success': False, 'message': '没有成功计算的数据点'}
+    except Exception as e:
+        return {
+            'success': False,
+            'message': f"分析失败: {str(e)}"
+        }
 
+    def build_result(x_values, y_values, note=""):
         return {
             'x_values': x_values,
             'y_values': y_values,
             'x_label': f"{x_param_info['label']} ({x_param_info['unit']})" if x_param_info['unit'] else x_param_info['label'],
             'y_label': f"{y_param_info['label']} ({y_param_info['unit']})" if y_param_info['unit'] else y_param_info['label'],
             'success': True,
-            'message': f"成功生成 {len(x_values)} 个数据点"
+            'message': f"成功生成 {len(x_values)} 个数据点{note}"
+        }
+
+    if cached is not None:
+        cached_result = build_result(cached[0].tolist(), cached[1].tolist(), "（缓存结果）")
+        return {'success': True, 'run': lambda job=None: cached_result, 'cached': cached_result}
+
+    def run(job=None):
+        try:
+            if x_param.calculation_func and x_param.dependencies and not x_param.unlinked:
+                x_param.set_manual_value(x_param.value)  # 保持当前值但断开计算
+
+            def evaluate(x_val):
+                try:
+                    update_result = sweep_graph.set_parameter_value(x_param, float(x_val))
+
+                    y_val = y_param.value
+
+                    if y_param.calculation_func:
+                        y_val = y_param.calculate()
+
+                    return float(y_val)
+
+                except Exception as e:
+                    print(f"计算错误 (X={x_val}): {e}")
+                    return None
+
+            if adaptive:
+                budget = max(AppConstants.SENSITIVITY_ADAPTIVE_INITIAL_POINTS,
+                             math.ceil(len(x_range) * AppConstants.SENSITIVITY_ADAPTIVE_BUDGET_RATIO))
+                evaluations = 0
+
+                def on_point(x_val, y_val):
+                    nonlocal evaluations
+                    evaluations += 1
+                    if job is not None:
+                        job.publish((x_val, y_val))
+                        job.checkpoint()
+                        job.report(evaluations, budget)
+
+                def evaluate_finite(x_val):
+                    y_val = evaluate(x_val)
+                    return y_val if y_val is not None and math.isfinite(y_val) else None
+
+                if job is not None:
+                    job.report(0, budget)
+                x_values, y_values = adaptive_sample(
+                    evaluate_finite, x_start, float(x_range[-1]),
+                    initial_points=AppConstants.SENSITIVITY_ADAPTIVE_INITIAL_POINTS,
+                    max_points=budget,
+                    min_step=x_step,
+                    tolerance=AppConstants.SENSITIVITY_ADAPTIVE_TOLERANCE,
+                    on_point=on_point
+                )
+            else:
+                x_values = []
+                y_values = []
+
+                # 由粗到细扫描，已完成的点随时发布给图表预览
+                for count, index in enumerate(coarse_to_fine_order(len(x_range), PerformanceConstants.SWEEP_COARSE_POINTS)):
+                    x_val = x_range[index]
+                    if job is not None:
+                        job.checkpoint()
+                        job.report(count, len(x_range))
+                    y_val = evaluate(x_val)
+                    if y_val is None:
+                        continue
+                    x_values.append(float(x_val))
+                    y_values.append(y_val)
+                    if job is not None:
+                        job.publish((x_values[-1], y_values[-1]))
+
+            if not x_values:
+                return {'success': False, 'message': '没有成功计算的数据点'}
+
+            sorted_indices = np.argsort(x_values, kind='stable')
+            x_values = [x_values[i] for i in sorted_indices]
+            y_values = [y_values[i] for i in sorted_indices]
+
+            SWEEP_CACHE.put(cache_key, x_values, y_values)
+            return build_result(x_values, y_values, f"（自适应采样，均匀采样需 {len(x_range)} 点）" if adaptive else "")
+
+        except JobCancelled:
+            raise
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f"分析失败: {str(e)}"
+            }
+
+    return {'success': True, 'run': run, 'cached': None}
+
+def perform_sensitivity_analysis(x_param_info, y_param_info, x_start, x_end, x_step):
+    """执行参数敏感性分析（在当前线程中同步完成）"""
+    prepared = prepare_sensitivity_analysis(x_param_info, y_param_info, x_start, x_end, x_step)
+    if not prepared['success']:
+        return prepared
+    return prepared['run']()
+
+def find_plot_parameter(param_value):
+    """按 "节点ID|参数名" 查找当前会话计算图中的参数，找不到时返回None"""
+    try:
+        node_id, param_name = param_value.split('|')
+    except (AttributeError, ValueError):
+        return None
+    node = graph.nodes.get(node_id)
+    if not node:
+        return None
+    return next((param for param in node.parameters if param.name == param_name), None)
+
+# 二维扫描的计算方式（见 batch_eval.evaluate_grid）
+GRID_EVALUATION_LABELS = {
+    "vectorized": "向量化计算",
+    "parallel": "多进程并行计算",
+    "serial": "逐点计算",
+}
+
+def prepare_grid_sweep(x_param_info, x2_param_info, y_param_info, x_range_spec, x2_range_spec):
+    """解析参数并在当前会话计算图的副本上准备二维扫描
+
+    两个输入参数各自按 (起始值, 结束值, 步长) 取值，组成网格后批量计算 Y
+    （见 batch_eval.evaluate_grid：能向量化时一次算完，否则多进程并行或逐点计算）。
+
+    Returns:
+        同 prepare_sensitivity_analysis；二维扫描不使用缓存，'cached' 始终为None。
+        成功时结果中 z_values[i][j] 对应 (x_values[j], x2_values[i])
+    """
+    try:
+        x_param = find_plot_parameter(x_param_info['value'])
+        x2_param = find_plot_parameter(x2_param_info['value'])
+        y_param = find_plot_parameter(y_param_info['value'])
+
+        if not x_param or not x2_param or not y_param:
+            return {'success': False, 'message': '参数对象不存在'}
+
+        x_start, x_end, x_step = x_range_spec
+        x2_start, x2_end, x2_step = x2_range_spec
+        x_range = np.arange(x_start, x_end + x_step, x_step)
+        x2_range = np.arange(x2_start, x2_end + x2_step, x2_step)
+
+        grid_points = len(x_range) * len(x2_range)
+        if grid_points > AppConstants.MAX_DATA_POINTS:
+            return {
+                'success': False,
+                'message': f'网格点过多 ({len(x_range)}×{len(x2_range)} = {grid_points} 点)，请减少范围或增大步长 (最大{AppConstants.MAX_DATA_POINTS}点)'
+            }
+
+        # 在计算图副本上扫描，不改动当前会话的参数值
+        memo = {}
+        graph.clone(include_layout=False, memo=memo)
+        evaluator = ConeEvaluator(memo[y_param], (memo[x_param], memo[x2_param]))
+
+    except Exception as e:
+        return {
+            'success': False,
+            'message': f"分析失败: {str(e)}"
+        }
+
+    def label(param_info):
+        return f"{param_info['label']} ({param_info['unit']})" if param_info['unit'] else param_info['label']
+
+    def run(job=None):
+        try:
+            x_grid, x2_grid = np.meshgrid(x_range, x2_range)
+            z_values, method = evaluate_grid(evaluator, [x_grid.ravel(), x2_grid.ravel()], job)
+            if np.isnan(z_values).all():
+                return {'success': False, 'message': '没有成功计算的数据点'}
+
+            failed = int(np.isnan(z_values).sum())
+            note = f"，{failed} 个点计算失败" if failed else ""
+            return {
+                'x_values': x_range,
+                'x2_values': x2_range,
+                'z_values': z_values.reshape(x_grid.shape),
+                'x_label': label(x_param_info),
+                'x2_label': label(x2_param_info),
+                'z_label': label(y_param_info),
+                'success': True,
+                'message': f"成功生成 {len(x_range)}×{len(x2_range)} 网格（{GRID_EVALUATION_LABELS[method]}{note}）"
+            }
+
+        except JobCancelled:
+            raise
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f"分析失败: {str(e)}"
+            }
+
+    return {'success': True, 'run': run, 'cached': None}
+
+def prepare_monte_carlo(y_param_info, samples=AppConstants.MONTE_CARLO_SAMPLES):
+    """在当前会话计算图的副本上准备蒙特卡洛不确定性分析
+
+    Y 上游的输入参数按置信度和各自的分布类型取样（见 montecarlo.py），
+    样本作为数组批量代入计算代码。
+
+    Returns:
+        同 prepare_sensitivity_analysis；不使用缓存，'cached' 始终为None
+    """
+    try:
+        y_param = find_plot_parameter(y_param_info['value'])
+        if not y_param:
+            return {'success': False, 'message': '参数对象不存在'}
+
+        memo = {}
+        graph.clone(include_layout=False, memo=memo)
+        target = memo[y_param]
+        inputs = uncertain_inputs(target)
+        if not inputs:
+            return {'success': False, 'message': f"{y_param_info['label']} 的上游没有置信度低于100%的输入参数"}
+
+    except Exception as e:
+        return {
+            'success': False,
+            'message': f"分析失败: {str(e)}"
         }
 
+    def run(job=None):
+        try:
+            values, method = run_monte_carlo(target, inputs, samples, job)
+            if not np.isfinite(values).any():
+                return {'success': False, 'message': '没有成功计算的样本'}
+
+            stats = summarize(values)
+            percentiles = "，".join(f"P{p} {v:.4g}" for p, v in stats['percentiles'].items())
+            note = f"，{stats['failed']} 个样本计算失败" if stats['failed'] else ""
+            return {
+                'stats': stats,
+                'x_label': f"{y_param_info['label']} ({y_param_info['unit']})" if y_param_info['unit'] else y_param_info['label'],
+                'success': True,
+                'message': (f"蒙特卡洛 {samples} 次采样（{len(inputs)} 个不确定输入，{GRID_EVALUATION_LABELS[method]}{note}）："
+                            f"均值 {stats['mean']:.4g}，标准差 {stats['std']:.4g}，{percentiles}")
+            }
+
+        except JobCancelled:
+            raise
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f"分析失败: {str(e)}"
+            }
+
+    return {'success': True, 'run': run, 'cached': None}
+
+def prepare_tornado(y_param_info, perturbation):
+    """在当前会话计算图的副本上准备龙卷风图分析（见 tornado.py）
+
+    Args:
+        perturbation: 扰动幅度（百分比）
+    Returns:
+        同 prepare_sensitivity_analysis；不使用缓存，'cached' 始终为None
+    """
+    try:
+        y_param = find_plot_parameter(y_param_info['value'])
+        if not y_param:
+            return {'success': False, 'message': '参数对象不存在'}
+
+        memo = {}
+        graph.clone(include_layout=False, memo=memo)
+        target = memo[y_param]
+        inputs = perturbable_inputs(target, perturbation / 100)
+        if not inputs:
+            return {'success': False, 'message': f"{y_param_info['label']} 的上游没有可扰动的数值输入参数"}
+
+        # 副本参数 -> "节点名.参数名"
+        labels = {memo[param]: f"{node.name}.{param.name}" for param, (_, node) in parameter_locations().items()}
+
     except Exception as e:
         return {
             'success': False,
             'message': f"分析失败: {str(e)}"
         }
-    finally:
+
+    def run(job=None):
         try:
-            if 'x_param' in locals() and 'original_x_value' in locals():
-                x_param.value = original_x_value
-                # 恢复原始的unlinked状态
-                if 'x_was_unlinked' in locals() and not x_was_unlinked:
-                    x_param.unlinked = False
+            result = run_tornado(target, inputs, perturbation / 100, job)
+            if not math.isfinite(result['baseline']):
+                return {'success': False, 'message': '基准情景计算失败'}
+
+            rows = [dict(row, label=labels.get(row['param'], row['param'].name)) for row in result['rows']]
+            top = rows[0]
+            return {
+                'baseline': result['baseline'],
+                'rows': rows,
+                'perturbation': perturbation,
+                'x_label': f"{y_param_info['label']} ({y_param_info['unit']})" if y_param_info['unit'] else y_param_info['label'],
+                'success': True,
+                'message': (f"龙卷风图：{len(inputs)} 个输入各扰动 ±{perturbation:g}%，共 {2 * len(inputs) + 1} 个情景"
+                            f"（{GRID_EVALUATION_LABELS[result['method']]}），影响最大的是 {top['label']}"
+                            f"（{top['low']:.4g} ~ {top['high']:.4g}，基准 {result['baseline']:.4g}）")
+            }
+
+        except JobCancelled:
+            raise
         except Exception as e:
-            print(f"恢复原始值和状态时出错: {e}")
+            return {
+                'success': False,
+                'message': f"分析失败: {str(e)}"
+            }
+
+    return {'success': True, 'run': run, 'cached': None}
+
+def plot_target_points(plot_width=None):
+    """降采样后的目标点数：绘图区宽度 × 每像素点数；宽度未知时使用 MAX_CHART_DATA_POINTS"""
+    if not plot_width:
+        return AppConstants.MAX_CHART_DATA_POINTS
+    return max(int(plot_width * AppConstants.PLOT_POINTS_PER_PIXEL), 3)
+
+def create_sensitivity_trace(x_values, y_values, name, color, line_width, marker_size, opacity=None,
+                             target_points=AppConstants.MAX_CHART_DATA_POINTS):
+    """创建一条敏感性分析曲线
+
+    点数超过 PLOT_WEBGL_THRESHOLD 时改用 WebGL 渲染，并用 LTTB 降采样到与图表宽度相当的点数，
+    全分辨率数据保留在服务端（trace_store），缩放时按可见范围重新采样。
+    """
+    hovertemplate = ('<b>%{fullData.name}</b><br>' +
+                     'X: %{x}<br>' +
+                     'Y: %{y}<br>' +
+                     '<extra></extra>')
+    if len(x_values) > AppConstants.PLOT_WEBGL_THRESHOLD:
+        x_sampled, y_sampled = lttb(x_values, y_values, target_points)
+        return go.Scattergl(
+            x=x_sampled,
+            y=y_sampled,
+            mode='lines',
+            name=name,
+            line=dict(width=line_width, color=color),
+            opacity=opacity,
+            hovertemplate=hovertemplate
+        )
+    return go.Scatter(
+        x=x_values,
+        y=y_values,
+        mode='lines+markers',
+        name=name,
+        line=dict(width=line_width, color=color),
+        marker=dict(size=marker_size, color=color),
+        opacity=opacity,
+        hovertemplate=hovertemplate
+    )
 
 def create_empty_plot():
     """创建空的绘图"""
@@ -369,6 +928,15 @@ def ensure_minimum_columns(min_cols: int = AppConstants.MIN_LAYOUT_COLUMNS):
     """确保布局至少有 min_cols 列"""
     return graph.layout_manager.ensure_minimum_columns(min_cols)
 
+def refresh_canvas():
+    """直接输出画布的回调（加载计算图、新建节点、增删列等）使用的全量重绘
+
+    同时发布 canvas_refreshed 事件：依赖画布变化的回调（箭头、依赖面板、删除列按钮等）
+    只监听 canvas-events 和 node-data，不把整个画布组件树上传到服务端。
+    """
+    dash.set_props("canvas-events", {"data": [create_canvas_event("canvas_refreshed")]})
+    return update_canvas()
+
 # 画布更新函数 - 使用新的布局管理器
 def update_canvas(node_data=None):
     """使用布局管理器渲染画布"""
@@ -435,147 +1003,16 @@ def update_canvas(node_data=None):
         return canvas_with_arrows
 
     print(f"🏗️ 渲染正常模式 - 有{len(graph.nodes)}个节点")
-    for col in range(graph.layout_manager.cols):
-        col_content = []
-        col_nodes = graph.layout_manager.get_column_nodes(col)
-
-        for node_id, row in sorted(col_nodes, key=lambda x: x[1]):
-            node = graph.nodes.get(node_id)
-            node_name = node.name if node else ""
-
-            if not node:
-                continue
-
-            param_rows = []
-            if hasattr(node, "parameters"):
-                for param_idx, param in enumerate(node.parameters):
-                    param_rows.append(
-                        html.Tr([
-                            html.Td(
-                                html.Div([
-                                    html.Div(
-                                        className="param-pin param-pin-style",
-                                        id=f"pin-{node_id}-{param_idx}"
-                                    ),
-                                    dbc.Tooltip(
-                                        f"类型: {param.param_type if hasattr(param, 'param_type') else '未知'}",
-                                        target={"type": "param-name", "node": node_id, "index": param_idx},
-                                        placement="top",
-                                        trigger="focus"
-                                    ),
-                                    dcc.Input(
-                                        id={"type": "param-name", "node": node_id, "index": param_idx},
-                                        value=param.name,
-                                        debounce=True,  # 只在失去焦点或按回车时触发callback
-                                        className="param-input param-name-input"
-                                    )
-                                ], className="param-row-container"),
-                                className="param-name-cell"
-                            ),
-                            html.Td(
-                                html.Div([
-                                    dbc.Tooltip(
-                                        f"类型: {param.param_type if hasattr(param, 'param_type') else '未知'}",
-                                        target={"type": "param-value", "node": node_id, "index": param_idx},
-                                        placement="top",
-                                        trigger="focus"
-                                    ),
-                                    html.Div([
-                                                                            dcc.Input(
-                                        id={"type": "param-value", "node": node_id, "index": param_idx},
-                                        value=str(param.value),
-                                        debounce=True,  # 只在失去焦点或按回车时触发callback
-                                        style={
-                                            "width": f"calc(100% - {AppConstants.PARAM_INPUT_UNLINK_OFFSET}px)" if (param.calculation_func and param.dependencies and getattr(param, 'unlinked', False)) else "100%", 
-                                            "background": "lightgreen" if f"{node_id}-{param_idx}" in graph.recently_updated_params else "transparent"
-                                        },
-                                        className="param-input param-value-input"
-                                    ),
-                                        html.Span(
-                                            param.unit,
-                                            className="param-unit"
-                                        ) if param.unit else None
-                                    ], className="param-value-container"),
-                                    html.Div(
-                                        "🔓",
-                                        id={"type": "unlink-icon", "node": node_id, "index": param_idx},
-                                        className="unlink-icon unlink-icon-style",
-                                        title="重新连接 (点击恢复自动计算)"
-                                    ) if (param.calculation_func and param.dependencies and getattr(param, 'unlinked', False)) else None
-                                ], className="param-value-container"),
-                                className="param-value-cell"
-                            ),
-                            html.Td(
-                                dbc.DropdownMenu(
-                                    children=[
-                                        dbc.DropdownMenuItem("编辑参数", id={"type": "edit-param", "node": node_id, "index": param_idx}, className="text-primary"),
-                                        dbc.DropdownMenuItem(divider=True),
-                                        dbc.DropdownMenuItem("删除参数", id={"type": "delete-param", "node": node_id, "index": param_idx}, className="text-danger"),
-                                        dbc.DropdownMenuItem(divider=True),
-                                        dbc.DropdownMenuItem("上移", id={"type": "move-param-up", "node": node_id, "index": param_idx}, disabled=param_idx==0),
-                                        dbc.DropdownMenuItem("下移", id={"type": "move-param-down", "node": node_id, "index": param_idx}, disabled=param_idx==len(node.parameters)-1),
-                                    ],
-                                    toggle_class_name="param-menu-btn",
-                                    label="",
-                                    size="sm",
-                                    direction="start"
-                                ),
-                                className="param-dropdown-cell"
-                            )
-                        ])
-                    )
-
-            param_table = html.Table(param_rows, className="param-table") if param_rows else None
-
-            node_div = html.Div(
-                [
-                    html.Div([
-                        html.Div([
-                            html.Span(f"{node_name}", className="node-name")
-                        ]),
-                        html.Div([
-                            html.Button(
-                                html.Span("➕"),
-                                id={"type": "add-param-header", "node": node_id},
-                                className="btn add-param-btn",
-                                title="添加参数"
-                            ),
-                            dbc.DropdownMenu(
-                                children=[
-                                    dbc.DropdownMenuItem("编辑节点", id={"type": "edit-node", "node": node_id}, className="text-warning"),
-                                    dbc.DropdownMenuItem(divider=True),
-                                    dbc.DropdownMenuItem("上移", id={"type": "move-node-up", "node": node_id}, className="text-primary"),
-                                    dbc.DropdownMenuItem("下移", id={"type": "move-node-down", "node": node_id}, className="text-primary"),
-                                    dbc.DropdownMenuItem(divider=True),
-                                    dbc.DropdownMenuItem("左移", id={"type": "move-node-left", "node": node_id}, className="text-info"),
-                                    dbc.DropdownMenuItem("右移", id={"type": "move-node-right", "node": node_id}, className="text-info"),
-                                    dbc.DropdownMenuItem(divider=True),
-                                    dbc.DropdownMenuItem("添加参数", id={"type": "add-param", "node": node_id}, className="text-success"),
-                                    dbc.DropdownMenuItem("删除节点", id={"type": "delete-node", "node": node_id}, className="text-danger"),
-                                ],
-                                toggle_class_name="node-menu-btn",
-                                label="",
-                                size="sm",
-                                direction="start"
-                            )
-                        ], className="node-header-controls")
-                    ], className="node-header"),
-                    param_table,
-                    html.Div(id=f"node-content-{node_id}", className="node-content")
-                ],
-                className="p-2 node-container node-entrance fade-in",
-                id=f"node-{node_id}",
-                **{"data-row": row, "data-col": col, "data-dash-id": json.dumps({"type": "node", "index": node_id})}
-            )
-            col_content.append(node_div)
-
-        # 计算列宽 - 优化布局，确保至少3列时有合理的宽度分布
-        total_cols = max(AppConstants.MIN_LAYOUT_COLUMNS, graph.layout_manager.cols)  # 至少按最小列数计算宽度
-        col_width = max(2, 12 // total_cols)  # 每列至少占2个Bootstrap列宽
-        canvas_content.append(dbc.Col(col_content, width=col_width))
+    lean = lean_render_mode()
+    RENDERED_LEAN_MODE[get_graph()] = lean
+    virtual = virtual_render_mode()
+    MATERIALIZED_NODES[get_graph()] = visible_node_ids() if virtual else None
+    canvas_content = [render_column(col, lean) for col in range(graph.layout_manager.cols)]
+    prune_node_render_cache()
 
     arrows = create_arrows()
 
+    # data-virtual 标记让客户端开始上报视口，见 clientside_callbacks.register_canvas_viewport_callback
     canvas_with_arrows = html.Div([
         dbc.Row(canvas_content),
         html.Div(
@@ -583,10 +1020,315 @@ def update_canvas(node_data=None):
             className="arrows-overlay",
             id="arrows-overlay"
         )
-    ], className="relative-container")
+    ], className="relative-container", **({"data-virtual": "true"} if virtual else {}))
 
     return canvas_with_arrows
 
+# 局部导数：计算图 -> {'inputs': [(标签, 求导时的值)], 'entries': {参数: (求导时的内容哈希, LocalDerivative)}}
+# 参数或其任一上游变化后内容哈希随之改变，画布不再显示过期的导数
+LOCAL_DERIVATIVES = weakref.WeakKeyDictionary()
+
+def param_derivative_display(param):
+    """参数的局部导数显示内容 (文本, 悬停提示)；没有导数或已过期时返回None"""
+    store = LOCAL_DERIVATIVES.get(get_graph())
+    entry = store['entries'].get(param) if store else None
+    if entry is None or entry[0] != param.content_hash:
+        return None
+    derivative = entry[1]
+    relation = "=" if derivative.method == "dual" else "≈"
+    texts, details = [], []
+    for (label, input_value), gradient in zip(store['inputs'], derivative.gradient):
+        texts.append(f"∂/∂{label.split('.', 1)[-1]} {relation} {gradient:.4g}")
+        # 弹性：输入变化1%时本参数变化的百分比
+        elasticity = f"{gradient * input_value / derivative.value:.3g}" if derivative.value else "-"
+        details.append(f"∂/∂{label} {relation} {gradient:.6g}（弹性 {elasticity}）")
+    method = "对偶数精确求导" if derivative.method == "dual" else "计算代码不支持对偶数，有限差分近似"
+    return "，".join(texts), "\n".join(details + [method])
+
+def node_derivative_key(node):
+    """节点各参数的局部导数显示内容，作为渲染缓存键的一部分"""
+    if not LOCAL_DERIVATIVES.get(get_graph()):
+        return ()
+    return tuple(param_derivative_display(param) for param in node.parameters)
+
+def param_value_style(node_id, param_idx, param):
+    """参数值输入框样式：有unlink图标时缩短宽度，最近更新的参数高亮"""
+    return {
+        "width": f"calc(100% - {AppConstants.PARAM_INPUT_UNLINK_OFFSET}px)" if (param.calculation_func and param.dependencies and getattr(param, 'unlinked', False)) else "100%",
+        "background": "lightgreen" if f"{node_id}-{param_idx}" in graph.recently_updated_params else "transparent"
+    }
+
+def render_param_value_cell(node_id, param_idx, param, lean=False):
+    """渲染参数值单元格；精简模式下不创建Tooltip，类型提示由画布共享的提示框显示"""
+    derivative = param_derivative_display(param)
+    return html.Td(
+        html.Div([
+            None if lean else dbc.Tooltip(
+                f"类型: {param.param_type if hasattr(param, 'param_type') else '未知'}",
+                target={"type": "param-value", "node": node_id, "index": param_idx},
+                placement="top",
+                trigger="focus"
+            ),
+            html.Div([
+                dcc.Input(
+                    id={"type": "param-value", "node": node_id, "index": param_idx},
+                    value=str(param.value),
+                    debounce=True,  # 只在失去焦点或按回车时触发callback
+                    style=param_value_style(node_id, param_idx, param),
+                    className="param-input param-value-input"
+                ),
+                html.Span(
+                    param.unit,
+                    className="param-unit"
+                ) if param.unit else None
+            ], className="param-value-container"),
+            html.Div(
+                "🔓",
+                id={"type": "unlink-icon", "node": node_id, "index": param_idx},
+                className="unlink-icon unlink-icon-style",
+                title="重新连接 (点击恢复自动计算)"
+            ) if (param.calculation_func and param.dependencies and getattr(param, 'unlinked', False)) else None,
+            # 放在最后，不影响局部更新按下标定位输入框
+            html.Div(derivative[0], className="param-derivative", title=derivative[1]) if derivative else None
+        ], className="param-value-container has-derivative" if derivative else "param-value-container"),
+        className="param-value-cell"
+    )
+
+def render_param_row(node, node_id, param_idx, param, lean=False):
+    """渲染节点中的一行参数"""
+    if lean:
+        return render_lean_param_row(node, node_id, param_idx, param)
+
+    return html.Tr([
+        html.Td(
+            html.Div([
+                html.Div(
+                    className="param-pin param-pin-style",
+                    id=f"pin-{node_id}-{param_idx}"
+                ),
+                dbc.Tooltip(
+                    f"类型: {param.param_type if hasattr(param, 'param_type') else '未知'}",
+                    target={"type": "param-name", "node": node_id, "index": param_idx},
+                    placement="top",
+                    trigger="focus"
+                ),
+                dcc.Input(
+                    id={"type": "param-name", "node": node_id, "index": param_idx},
+                    value=param.name,
+                    debounce=True,  # 只在失去焦点或按回车时触发callback
+                    className="param-input param-name-input"
+                )
+            ], className="param-row-container"),
+            className="param-name-cell"
+        ),
+        render_param_value_cell(node_id, param_idx, param),
+        html.Td(
+            dbc.DropdownMenu(
+                children=[
+                    dbc.DropdownMenuItem("编辑参数", id={"type": "edit-param", "node": node_id, "index": param_idx}, className="text-primary"),
+                    dbc.DropdownMenuItem(divider=True),
+                    dbc.DropdownMenuItem("删除参数", id={"type": "delete-param", "node": node_id, "index": param_idx}, className="text-danger"),
+                    dbc.DropdownMenuItem(divider=True),
+                    dbc.DropdownMenuItem("上移", id={"type": "move-param-up", "node": node_id, "index": param_idx}, disabled=param_idx==0),
+                    dbc.DropdownMenuItem("下移", id={"type": "move-param-down", "node": node_id, "index": param_idx}, disabled=param_idx==len(node.parameters)-1),
+                ],
+                toggle_class_name="param-menu-btn",
+                label="",
+                size="sm",
+                direction="start"
+            ),
+            className="param-dropdown-cell"
+        )
+    ])
+
+def render_lean_param_row(node, node_id, param_idx, param):
+    """精简模式的参数行
+
+    不创建 Tooltip 和 DropdownMenu，只保留输入框和 pin 点；参数信息写在行的
+    data-* 属性上，类型提示和操作菜单由画布共享的组件通过事件委托提供
+    （见 clientside_callbacks.register_shared_param_menu_callback）。
+    """
+    return html.Tr([
+        html.Td(
+            html.Div([
+                html.Div(
+                    className="param-pin param-pin-style",
+                    id=f"pin-{node_id}-{param_idx}"
+                ),
+                None,  # 与普通模式的Tooltip位置对齐，便于局部更新定位输入框
+                dcc.Input(
+                    id={"type": "param-name", "node": node_id, "index": param_idx},
+                    value=param.name,
+                    debounce=True,  # 只在失去焦点或按回车时触发callback
+                    className="param-input param-name-input"
+                )
+            ], className="param-row-container"),
+            className="param-name-cell"
+        ),
+        render_param_value_cell(node_id, param_idx, param, lean=True),
+        html.Td(
+            html.Button(className="btn btn-sm dropdown-toggle param-menu-btn lean-param-menu-btn", title="参数操作"),
+            className="param-dropdown-cell"
+        )
+    ], className="lean-param-row", **{
+        "data-node": node_id,
+        "data-index": param_idx,
+        "data-last": "true" if param_idx == len(node.parameters) - 1 else "false",
+        "data-type": param.param_type if hasattr(param, 'param_type') else '未知'
+    })
+
+def lean_render_mode():
+    """参数总数超过阈值时使用精简渲染模式"""
+    total_params = sum(len(node.parameters) for node in graph.nodes.values())
+    return total_params > PerformanceConstants.LEAN_RENDER_PARAM_THRESHOLD
+
+# 节点渲染缓存：计算图 -> {node_id: (缓存键, 组件)}；计算图被替换后随之回收
+NODE_RENDER_CACHE = weakref.WeakKeyDictionary()
+
+# 各计算图最近一次全量渲染是否使用精简模式；模式切换后局部更新需回退到全量渲染
+RENDERED_LEAN_MODE = weakref.WeakKeyDictionary()
+
+# 虚拟化画布：计算图 -> 当前实际渲染为节点的ID集合，其余节点只渲染占位块；未启用虚拟化时为None
+MATERIALIZED_NODES = weakref.WeakKeyDictionary()
+# 计算图 -> 客户端最近上报的视口 {"top", "bottom"}（画布坐标，像素）
+CANVAS_VIEWPORTS = weakref.WeakKeyDictionary()
+# 计算图 -> {node_id: (参数个数, 客户端实测高度)}，用于让占位块与节点等高
+NODE_HEIGHTS = weakref.WeakKeyDictionary()
+
+def virtual_render_mode():
+    """节点数超过阈值时画布只渲染视口附近的节点"""
+    return len(graph.nodes) > PerformanceConstants.VIRTUAL_CANVAS_NODE_THRESHOLD
+
+def node_height(node_id, node):
+    """节点在画布中占用的高度：优先使用客户端实测值，参数个数变化后退回估算值"""
+    measured = NODE_HEIGHTS.get(get_graph(), {}).get(node_id)
+    if measured is not None and measured[0] == len(node.parameters):
+        return measured[1]
+    return (PerformanceConstants.NODE_HEADER_HEIGHT_PX
+            + len(node.parameters) * PerformanceConstants.PARAM_ROW_HEIGHT_PX
+            + PerformanceConstants.NODE_MARGIN_PX)
+
+def visible_node_ids():
+    """按各列节点的累计高度，返回与视口（含预渲染边距）相交的节点ID集合"""
+    viewport = CANVAS_VIEWPORTS.get(get_graph()) or {}
+    top = viewport.get("top", 0) - PerformanceConstants.VIRTUAL_CANVAS_OVERSCAN_PX
+    bottom = viewport.get("bottom", PerformanceConstants.VIRTUAL_CANVAS_INITIAL_HEIGHT_PX) + PerformanceConstants.VIRTUAL_CANVAS_OVERSCAN_PX
+
+    visible = set()
+    for col in range(graph.layout_manager.cols):
+        y = 0
+        for node_id, _ in column_node_ids(col):
+            if y > bottom:
+                break
+            height = node_height(node_id, graph.nodes[node_id])
+            if y + height >= top:
+                visible.add(node_id)
+            y += height
+    return visible
+
+def render_node_placeholder(node_id, row, col):
+    """视口外节点的占位块，高度与节点一致以保持滚动位置和列布局"""
+    return html.Div(
+        className="node-placeholder",
+        id=f"node-{node_id}",
+        style={"height": f"{node_height(node_id, graph.nodes[node_id])}px"},
+        **{"data-row": row, "data-col": col}
+    )
+
+def render_node_slot(node_id, row, col, lean=False):
+    """渲染节点；虚拟化画布中未进入视口的节点渲染为占位块"""
+    materialized = MATERIALIZED_NODES.get(get_graph())
+    if materialized is not None and node_id not in materialized:
+        return render_node_placeholder(node_id, row, col)
+    return render_node(node_id, row, col, lean)
+
+def render_node(node_id, row, col, lean=False):
+    """渲染单个节点，节点状态、高亮和位置都未变化时直接复用缓存的组件"""
+    current_graph = get_graph()
+    node = current_graph.nodes[node_id]
+    highlighted = tuple(
+        param_idx for param_idx in range(len(node.parameters))
+        if f"{node_id}-{param_idx}" in current_graph.recently_updated_params
+    )
+    cache_key = (node.version_key(), highlighted, node_derivative_key(node), row, col, lean)
+
+    cache = NODE_RENDER_CACHE.setdefault(current_graph, {})
+    cached = cache.get(node_id)
+    if cached is not None and cached[0] == cache_key:
+        return cached[1]
+
+    component = build_node_component(node_id, node, row, col, lean)
+    cache[node_id] = (cache_key, component)
+    return component
+
+def prune_node_render_cache():
+    """移除已删除节点的渲染缓存"""
+    current_graph = get_graph()
+    cache = NODE_RENDER_CACHE.get(current_graph)
+    if cache:
+        for node_id in [node_id for node_id in cache if node_id not in current_graph.nodes]:
+            del cache[node_id]
+
+def build_node_component(node_id, node, row, col, lean=False):
+    """构建单个节点的组件树"""
+    param_rows = [render_param_row(node, node_id, param_idx, param, lean) for param_idx, param in enumerate(node.parameters)]
+    param_table = html.Table(param_rows, className="param-table") if param_rows else None
+
+    return html.Div(
+        [
+            html.Div([
+                html.Div([
+                    html.Span(f"{node.name}", className="node-name")
+                ]),
+                html.Div([
+                    html.Button(
+                        html.Span("➕"),
+                        id={"type": "add-param-header", "node": node_id},
+                        className="btn add-param-btn",
+                        title="添加参数"
+                    ),
+                    dbc.DropdownMenu(
+                        children=[
+                            dbc.DropdownMenuItem("编辑节点", id={"type": "edit-node", "node": node_id}, className="text-warning"),
+                            dbc.DropdownMenuItem(divider=True),
+                            dbc.DropdownMenuItem("上移", id={"type": "move-node-up", "node": node_id}, className="text-primary"),
+                            dbc.DropdownMenuItem("下移", id={"type": "move-node-down", "node": node_id}, className="text-primary"),
+                            dbc.DropdownMenuItem(divider=True),
+                            dbc.DropdownMenuItem("左移", id={"type": "move-node-left", "node": node_id}, className="text-info"),
+                            dbc.DropdownMenuItem("右移", id={"type": "move-node-right", "node": node_id}, className="text-info"),
+                            dbc.DropdownMenuItem(divider=True),
+                            dbc.DropdownMenuItem("添加参数", id={"type": "add-param", "node": node_id}, className="text-success"),
+                            dbc.DropdownMenuItem("删除节点", id={"type": "delete-node", "node": node_id}, className="text-danger"),
+                        ],
+                        toggle_class_name="node-menu-btn",
+                        label="",
+                        size="sm",
+                        direction="start"
+                    )
+                ], className="node-header-controls")
+            ], className="node-header"),
+            param_table,
+            html.Div(id=f"node-content-{node_id}", className="node-content")
+        ],
+        className="p-2 node-container node-entrance fade-in",
+        id=f"node-{node_id}",
+        **{"data-row": row, "data-col": col, "data-dash-id": json.dumps({"type": "node", "index": node_id})}
+    )
+
+def column_node_ids(col):
+    """返回某列中实际渲染的节点 [(node_id, row)]，顺序与画布中一致"""
+    col_nodes = graph.layout_manager.get_column_nodes(col)
+    return [(node_id, row) for node_id, row in sorted(col_nodes, key=lambda x: x[1]) if node_id in graph.nodes]
+
+def render_column(col, lean=False):
+    """渲染画布中的一列"""
+    col_content = [render_node_slot(node_id, row, col, lean) for node_id, row in column_node_ids(col)]
+
+    # 计算列宽 - 优化布局，确保至少3列时有合理的宽度分布
+    total_cols = max(AppConstants.MIN_LAYOUT_COLUMNS, graph.layout_manager.cols)  # 至少按最小列数计算宽度
+    col_width = max(2, 12 // total_cols)  # 每列至少占2个Bootstrap列宽
+    return dbc.Col(col_content, width=col_width)
+
 def create_arrows():
     return [
         html.Div(
@@ -599,17 +1341,14 @@ app.layout = app_layout
 app.index_string = app_index_string
 
 # 新的节点操作回调函数 - 使用布局管理器
-@callback(
-    Output("node-data", "data"),
-    Output("canvas-events", "data"),
-    Output("app-messages", "data", allow_duplicate=True),
-    Input({"type": "move-node-up", "node": ALL}, "n_clicks"),
-    Input({"type": "move-node-down", "node": ALL}, "n_clicks"),
-    Input({"type": "move-node-left", "node": ALL}, "n_clicks"),
-    Input({"type": "move-node-right", "node": ALL}, "n_clicks"),
-    Input({"type": "add-param", "node": ALL}, "n_clicks"),
-    Input({"type": "add-param-header", "node": ALL}, "n_clicks"),
-    Input({"type": "delete-node", "node": ALL}, "n_clicks"),
+@event_bus_callback(
+    Input({"type": "move-node-up", "node": MATCH}, "n_clicks"),
+    Input({"type": "move-node-down", "node": MATCH}, "n_clicks"),
+    Input({"type": "move-node-left", "node": MATCH}, "n_clicks"),
+    Input({"type": "move-node-right", "node": MATCH}, "n_clicks"),
+    Input({"type": "add-param", "node": MATCH}, "n_clicks"),
+    Input({"type": "add-param-header", "node": MATCH}, "n_clicks"),
+    Input({"type": "delete-node", "node": MATCH}, "n_clicks"),
     State("node-data", "data"),
     State("canvas-events", "data"),
     State("app-messages", "data"),
@@ -640,94 +1379,7 @@ def handle_node_operations(move_up_clicks, move_down_clicks,
                 return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
             node_name = node.name
 
-        if operation_type == "move-node-up":
-            success = graph.layout_manager.move_node_up(node_id)
-            result_message = f"节点 {node_name} 已上移" if success else f"节点 {node_name} 无法上移"
-            # 节点移动后检查并自动删除空的最后一列，但保持至少3列
-            if success:
-                auto_remove_result = auto_remove_empty_last_column()
-                if auto_remove_result:
-                    result_message += f"，{auto_remove_result}"
-            canvas_event = create_canvas_event("node_moved", {"node_id": node_id, "direction": operation_type})
-            message = create_message("node_operation", result_message, "success" if "已" in result_message else "warning")
-            return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
-
-        elif operation_type == "move-node-down":
-            success = graph.layout_manager.move_node_down(node_id)
-            result_message = f"节点 {node_name} 已下移" if success else f"节点 {node_name} 无法下移"
-            # 节点移动后检查并自动删除空的最后一列，但保持至少3列
-            if success:
-                auto_remove_result = auto_remove_empty_last_column()
-                if auto_remove_result:
-                    result_message += f"，{auto_remove_result}"
-            canvas_event = create_canvas_event("node_moved", {"node_id": node_id, "direction": operation_type})
-            message = create_message("node_operation", result_message, "success" if "已" in result_message else "warning")
-            return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
-
-        elif operation_type == "move-node-left":
-            success = graph.layout_manager.move_node_left(node_id)
-            result_message = f"节点 {node_name} 已左移" if success else f"节点 {node_name} 无法左移"
-            # 节点移动后检查并自动删除空的最后一列，但保持至少3列
-            if success:
-                auto_remove_result = auto_remove_empty_last_column()
-                if auto_remove_result:
-                    result_message += f"，{auto_remove_result}"
-            canvas_event = create_canvas_event("node_moved", {"node_id": node_id, "direction": operation_type})
-            message = create_message("node_operation", result_message, "success" if "已" in result_message else "warning")
-            return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
-
-        elif operation_type == "move-node-right":
-            # 右移前先检查是否需要自动扩展列
-            expand_result = graph.layout_manager.auto_expand_for_node_movement(node_id, "right")
-
-            success = graph.layout_manager.move_node_right(node_id)
-            result_message = f"节点 {node_name} 已右移" if success else f"节点 {node_name} 无法右移"
-
-            if success and expand_result:
-                result_message += f"，{expand_result}"
-            elif success:
-                # 节点移动后检查并自动删除空的最后一列，但保持至少3列
-                auto_remove_result = auto_remove_empty_last_column()
-                if auto_remove_result:
-                    result_message += f"，{auto_remove_result}"
-            canvas_event = create_canvas_event("node_moved", {"node_id": node_id, "direction": operation_type})
-            message = create_message("node_operation", result_message, "success" if "已" in result_message else "warning")
-            return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
-
-        elif operation_type == "add-param":
-            param = Parameter(
-                name="new_param", 
-                value=AppConstants.DEFAULT_PARAMETER_VALUE, 
-                unit="", 
-                description=f"新参数", 
-                param_type="float"
-            )
-
-            # 添加参数到节点
-            graph.add_parameter_to_node(node_id, param)
-
-            canvas_event = create_canvas_event("param_added", {"node_id": node_id})
-            message = create_message("param_operation", f"参数已添加到节点 {node_name}", "success")
-            return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
-
-        elif operation_type == "add-param-header":
-            # 标题栏加号按钮：添加参数功能，与下拉菜单中的"添加参数"功能相同
-            param = Parameter(
-                name="new_param", 
-                value=AppConstants.DEFAULT_PARAMETER_VALUE, 
-                unit="", 
-                description=f"新参数", 
-                param_type="float"
-            )
-
-            # 添加参数到节点
-            graph.add_parameter_to_node(node_id, param)
-
-            canvas_event = create_canvas_event("param_added", {"node_id": node_id})
-            message = create_message("param_operation", f"参数已添加到节点 {node_name}", "success")
-            return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
-
-        elif operation_type == "delete-node":
+        if operation_type == "delete-node":
             # 检查节点的参数是否被其他参数依赖
             has_dependents, dependent_info = check_node_has_dependents(node_id, graph)
 
@@ -748,45 +1400,140 @@ def handle_node_operations(move_up_clicks, move_down_clicks,
                 message = create_message("error", error_message, "error")
                 return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
 
-            # 从布局管理器移除节点
-            graph.layout_manager.remove_node(node_id)
-            # 从计算图移除节点
-            if node_id in graph.nodes:
-                del graph.nodes[node_id]
-            # 节点删除清理已完成
-
-            result_message = f"✅ 节点 {node_name} 已删除"
-            # 删除节点后检查并自动删除空的最后一列，但保持至少3列
-            auto_remove_result = auto_remove_empty_last_column()
-            if auto_remove_result:
-                result_message += f"，{auto_remove_result}"
-
-            canvas_event = create_canvas_event("node_moved", {"node_id": node_id, "direction": operation_type})
-            message = create_message("node_operation", result_message, "success" if "已" in result_message else "warning")
-            return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
+            label = f"删除节点 {node_name}"
+        else:
+            label = f"节点 {node_name} 操作"
 
-        return dash.no_update, dash.no_update, dash.no_update
-    
-    except Exception as e:
-        print(f"Error in handle_node_operations: {e}")
-        canvas_event = create_canvas_event("error", {"message": f"操作出错: {str(e)}"})
+        with graph.mutation(label):
+            # 记录操作前的位置和列数，供画布局部更新判断受影响的列
+            old_position = graph.layout_manager.get_node_position(node_id)
+            old_cols = graph.layout_manager.cols
+
+            if operation_type == "move-node-up":
+                success = graph.layout_manager.move_node_up(node_id)
+                result_message = f"节点 {node_name} 已上移" if success else f"节点 {node_name} 无法上移"
+                # 节点移动后检查并自动删除空的最后一列，但保持至少3列
+                if success:
+                    auto_remove_result = auto_remove_empty_last_column()
+                    if auto_remove_result:
+                        result_message += f"，{auto_remove_result}"
+                canvas_event = create_node_moved_event(node_id, operation_type, old_position, old_cols)
+                message = create_message("node_operation", result_message, "success" if "已" in result_message else "warning")
+                return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
+
+            elif operation_type == "move-node-down":
+                success = graph.layout_manager.move_node_down(node_id)
+                result_message = f"节点 {node_name} 已下移" if success else f"节点 {node_name} 无法下移"
+                # 节点移动后检查并自动删除空的最后一列，但保持至少3列
+                if success:
+                    auto_remove_result = auto_remove_empty_last_column()
+                    if auto_remove_result:
+                        result_message += f"，{auto_remove_result}"
+                canvas_event = create_node_moved_event(node_id, operation_type, old_position, old_cols)
+                message = create_message("node_operation", result_message, "success" if "已" in result_message else "warning")
+                return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
+
+            elif operation_type == "move-node-left":
+                success = graph.layout_manager.move_node_left(node_id)
+                result_message = f"节点 {node_name} 已左移" if success else f"节点 {node_name} 无法左移"
+                # 节点移动后检查并自动删除空的最后一列，但保持至少3列
+                if success:
+                    auto_remove_result = auto_remove_empty_last_column()
+                    if auto_remove_result:
+                        result_message += f"，{auto_remove_result}"
+                canvas_event = create_node_moved_event(node_id, operation_type, old_position, old_cols)
+                message = create_message("node_operation", result_message, "success" if "已" in result_message else "warning")
+                return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
+
+            elif operation_type == "move-node-right":
+                # 右移前先检查是否需要自动扩展列
+                expand_result = graph.layout_manager.auto_expand_for_node_movement(node_id, "right")
+
+                success = graph.layout_manager.move_node_right(node_id)
+                result_message = f"节点 {node_name} 已右移" if success else f"节点 {node_name} 无法右移"
+
+                if success and expand_result:
+                    result_message += f"，{expand_result}"
+                elif success:
+                    # 节点移动后检查并自动删除空的最后一列，但保持至少3列
+                    auto_remove_result = auto_remove_empty_last_column()
+                    if auto_remove_result:
+                        result_message += f"，{auto_remove_result}"
+                canvas_event = create_node_moved_event(node_id, operation_type, old_position, old_cols)
+                message = create_message("node_operation", result_message, "success" if "已" in result_message else "warning")
+                return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
+
+            elif operation_type == "add-param":
+                param = Parameter(
+                    name="new_param", 
+                    value=AppConstants.DEFAULT_PARAMETER_VALUE, 
+                    unit="", 
+                    description=f"新参数", 
+                    param_type="float"
+                )
+
+                # 添加参数到节点
+                graph.add_parameter_to_node(node_id, param)
+
+                canvas_event = create_canvas_event("param_added", {"node_id": node_id})
+                message = create_message("param_operation", f"参数已添加到节点 {node_name}", "success")
+                return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
+
+            elif operation_type == "add-param-header":
+                # 标题栏加号按钮：添加参数功能，与下拉菜单中的"添加参数"功能相同
+                param = Parameter(
+                    name="new_param", 
+                    value=AppConstants.DEFAULT_PARAMETER_VALUE, 
+                    unit="", 
+                    description=f"新参数", 
+                    param_type="float"
+                )
+
+                # 添加参数到节点
+                graph.add_parameter_to_node(node_id, param)
+
+                canvas_event = create_canvas_event("param_added", {"node_id": node_id})
+                message = create_message("param_operation", f"参数已添加到节点 {node_name}", "success")
+                return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
+
+            elif operation_type == "delete-node":
+                # 从布局管理器移除节点
+                graph.layout_manager.remove_node(node_id)
+                # 从计算图移除节点
+                if node_id in graph.nodes:
+                    del graph.nodes[node_id]
+                # 节点删除清理已完成
+
+                result_message = f"✅ 节点 {node_name} 已删除"
+                # 删除节点后检查并自动删除空的最后一列，但保持至少3列
+                auto_remove_result = auto_remove_empty_last_column()
+                if auto_remove_result:
+                    result_message += f"，{auto_remove_result}"
+
+                canvas_event = create_node_moved_event(node_id, operation_type, old_position, old_cols)
+                message = create_message("node_operation", result_message, "success" if "已" in result_message else "warning")
+                return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
+
+        return dash.no_update, dash.no_update, dash.no_update
+    
+    except Exception as e:
+        print(f"Error in handle_node_operations: {e}")
+        canvas_event = create_canvas_event("error", {"message": f"操作出错: {str(e)}"})
         message = create_message("error", f"❌ 操作出错: {str(e)}", "error")
         return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
 
 
 # 添加参数更新回调 - 使用debounce确保只在输入完成后更新
-@callback(
-    Output("node-data", "data", allow_duplicate=True),
-    Output("canvas-events", "data", allow_duplicate=True),
-    Output("app-messages", "data", allow_duplicate=True),
-    Input({"type": "param-name", "node": ALL, "index": ALL}, "value"),
-    Input({"type": "param-value", "node": ALL, "index": ALL}, "value"),
+@event_bus_callback(
+    Input({"type": "param-name", "node": MATCH, "index": MATCH}, "value"),
+    Input({"type": "param-value", "node": MATCH, "index": MATCH}, "value"),
     State("node-data", "data"),
     State("canvas-events", "data"),
     State("app-messages", "data"),
     prevent_initial_call=True
 )
-def update_parameter(param_names, param_values, node_data, current_events, current_messages):
+@interactive_priority
+def update_parameter(param_name, param_value, node_data, current_events, current_messages):
     if not ctx.triggered_id:
         return node_data, dash.no_update, dash.no_update
 
@@ -816,11 +1563,13 @@ def update_parameter(param_names, param_values, node_data, current_events, curre
 
         update_message = ""
         should_update_canvas = False
+        event_details = {"field": "name" if param_type == "param-name" else "value"}
 
         if param_type == "param-name":
             if new_value != current_param.name:
                 print(f"🔄 参数名更新: {current_param.name} → {new_value}")
-                current_param.name = new_value
+                with graph.mutation(f"重命名参数 {current_param.name}"):
+                    current_param.name = new_value
                 should_update_canvas = True
                 update_message = f"参数名已更新为: {new_value}"
             else:
@@ -872,24 +1621,29 @@ def update_parameter(param_names, param_values, node_data, current_events, curre
 
             print(f"🔄 参数值更新: {current_param.name}: {current_param.value} → {new_value}")
 
-            # 无论是否有计算函数，都要触发级联更新
-            graph.recently_updated_params.clear()
+            with graph.mutation(f"修改参数 {current_param.name}"):
+                # 记录更新前的高亮和unlink状态，供画布局部更新使用
+                previous_highlights = set(graph.recently_updated_params)
+                was_unlinked = current_param.unlinked
+
+                # 无论是否有计算函数，都要触发级联更新
+                graph.recently_updated_params.clear()
             
-            if current_param.calculation_func and current_param.dependencies:
-                # 对于有计算函数的参数，先手动设置值，然后触发级联更新
-                current_param.set_manual_value(new_value)
-                # 手动触发级联更新到依赖这个参数的其他参数
-                cascaded_updates = graph.propagate_updates(current_param)
-                update_result = {
-                    'primary_change': {'param': current_param, 'old_value': current_param.value, 'new_value': new_value},
-                    'cascaded_updates': cascaded_updates,
-                    'total_updated_params': 1 + len(cascaded_updates)
-                }
-                update_message = f"🔓 参数 {current_param.name} 已手动设置为 {new_value}（已断开自动计算）"
-            else:
-                # 对于普通参数，使用标准的级联更新流程
-                update_result = graph.set_parameter_value(current_param, new_value)
-                update_message = f"🔄 参数 {current_param.name} 已更新为 {new_value}"
+                if current_param.calculation_func and current_param.dependencies:
+                    # 对于有计算函数的参数，先手动设置值，然后触发级联更新
+                    current_param.set_manual_value(new_value)
+                    # 手动触发级联更新到依赖这个参数的其他参数
+                    cascaded_updates = graph.propagate_updates(current_param)
+                    update_result = {
+                        'primary_change': {'param': current_param, 'old_value': current_param.value, 'new_value': new_value},
+                        'cascaded_updates': cascaded_updates,
+                        'total_updated_params': 1 + len(cascaded_updates)
+                    }
+                    update_message = f"🔓 参数 {current_param.name} 已手动设置为 {new_value}（已断开自动计算）"
+                else:
+                    # 对于普通参数，使用标准的级联更新流程
+                    update_result = graph.set_parameter_value(current_param, new_value)
+                    update_message = f"🔄 参数 {current_param.name} 已更新为 {new_value}"
 
             should_update_canvas = True
             graph.recently_updated_params.add(f"{node_id}-{param_index}")
@@ -912,8 +1666,12 @@ def update_parameter(param_names, param_values, node_data, current_events, curre
 
             update_message += cascaded_info
 
+            event_details["updated"] = sorted(graph.recently_updated_params)
+            event_details["cleared"] = sorted(previous_highlights - graph.recently_updated_params)
+            event_details["relayout"] = [f"{node_id}-{param_index}"] if current_param.unlinked != was_unlinked else []
+
         if should_update_canvas:
-            canvas_event = create_canvas_event("param_updated", {"node_id": node_id, "param_index": param_index, "new_value": new_value})
+            canvas_event = create_canvas_event("param_updated", {"node_id": node_id, "param_index": param_index, "new_value": new_value, **event_details})
             message = create_message("param_update", update_message, "success")
             return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
         else:
@@ -923,13 +1681,10 @@ def update_parameter(param_names, param_values, node_data, current_events, curre
     return node_data, dash.no_update, dash.no_update
 
 # 添加参数操作回调 - 完全独立于节点菜单
-@callback(
-    Output("node-data", "data", allow_duplicate=True),
-    Output("canvas-events", "data", allow_duplicate=True),
-    Output("app-messages", "data", allow_duplicate=True),
-    Input({"type": "delete-param", "node": ALL, "index": ALL}, "n_clicks"),
-    Input({"type": "move-param-up", "node": ALL, "index": ALL}, "n_clicks"),
-    Input({"type": "move-param-down", "node": ALL, "index": ALL}, "n_clicks"),
+@event_bus_callback(
+    Input({"type": "delete-param", "node": MATCH, "index": MATCH}, "n_clicks"),
+    Input({"type": "move-param-up", "node": MATCH, "index": MATCH}, "n_clicks"),
+    Input({"type": "move-param-down", "node": MATCH, "index": MATCH}, "n_clicks"),
     State("node-data", "data"),
     State("canvas-events", "data"),
     State("app-messages", "data"),
@@ -955,6 +1710,10 @@ def handle_parameter_operations(delete_clicks, move_up_clicks, move_down_clicks,
         canvas_event = create_canvas_event("no_value", {})
         return node_data, add_canvas_event(current_events, canvas_event), dash.no_update
 
+    return apply_parameter_operation(operation_type, node_id, param_index, node_data, current_events, current_messages)
+
+def apply_parameter_operation(operation_type, node_id, param_index, node_data, current_events, current_messages):
+    """执行参数的删除/上移/下移操作，返回 (node_data, canvas_events, app_messages)"""
     if not node_id or param_index is None:
         canvas_event = create_canvas_event("invalid_params", {})
         return node_data, add_canvas_event(current_events, canvas_event), dash.no_update
@@ -986,7 +1745,8 @@ def handle_parameter_operations(delete_clicks, move_up_clicks, move_down_clicks,
             message = create_message("error", error_message, "error")
             return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
 
-        deleted_param = node.parameters.pop(param_index)
+        with graph.mutation(f"删除参数 {node_name}.{param_name}"):
+            deleted_param = node.parameters.pop(param_index)
         success_message = f"✅ 参数 {node_name}.{param_name} 已删除"
         canvas_event = create_canvas_event("param_deleted", {"node_id": node_id, "param_index": param_index})
         message = create_message("param_operation", success_message, "success")
@@ -994,8 +1754,9 @@ def handle_parameter_operations(delete_clicks, move_up_clicks, move_down_clicks,
 
     elif operation_type == "move-param-up":
         if param_index > 0:
-            node.parameters[param_index], node.parameters[param_index - 1] = \
-                node.parameters[param_index - 1], node.parameters[param_index]
+            with graph.mutation(f"上移参数 {node_name}.{param_name}"):
+                node.parameters[param_index], node.parameters[param_index - 1] = \
+                    node.parameters[param_index - 1], node.parameters[param_index]
             success_message = f"✅ 参数 {node_name}.{param_name} 已上移"
             canvas_event = create_canvas_event("param_moved", {"node_id": node_id, "param_index": param_index, "operation": operation_type})
             message = create_message("param_operation", success_message, "success")
@@ -1008,8 +1769,9 @@ def handle_parameter_operations(delete_clicks, move_up_clicks, move_down_clicks,
 
     elif operation_type == "move-param-down":
         if param_index < len(node.parameters) - 1:
-            node.parameters[param_index], node.parameters[param_index + 1] = \
-                node.parameters[param_index + 1], node.parameters[param_index]
+            with graph.mutation(f"下移参数 {node_name}.{param_name}"):
+                node.parameters[param_index], node.parameters[param_index + 1] = \
+                    node.parameters[param_index + 1], node.parameters[param_index]
             success_message = f"✅ 参数 {node_name}.{param_name} 已下移"
             canvas_event = create_canvas_event("param_moved", {"node_id": node_id, "param_index": param_index, "operation": operation_type})
             message = create_message("param_operation", success_message, "success")
@@ -1025,11 +1787,8 @@ def handle_parameter_operations(delete_clicks, move_up_clicks, move_down_clicks,
     return node_data, add_canvas_event(current_events, canvas_event), dash.no_update
 
 # 处理unlink图标点击的回调函数
-@callback(
-    Output("node-data", "data", allow_duplicate=True),
-    Output("canvas-events", "data", allow_duplicate=True),
-    Output("app-messages", "data", allow_duplicate=True),
-    Input({"type": "unlink-icon", "node": ALL, "index": ALL}, "n_clicks"),
+@event_bus_callback(
+    Input({"type": "unlink-icon", "node": MATCH, "index": MATCH}, "n_clicks"),
     State("node-data", "data"),
     State("canvas-events", "data"),
     State("app-messages", "data"),
@@ -1066,7 +1825,8 @@ def handle_unlink_toggle(unlink_clicks, node_data, current_events, current_messa
         return node_data, current_events, add_app_message(current_messages, message)
 
     try:
-        new_value = param.relink_and_calculate()
+        with graph.mutation(f"重新连接参数 {node_name}.{param.name}"):
+            new_value = param.relink_and_calculate()
         result_message = f"🔗 参数 {node_name}.{param.name} 已重新连接并计算，新值: {new_value}"
         canvas_event = create_canvas_event("param_relinked", {"node_id": node_id, "param_index": param_index, "new_value": new_value})
         message = create_message("param_relink", result_message, "success")
@@ -1077,22 +1837,10 @@ def handle_unlink_toggle(unlink_clicks, node_data, current_events, current_messa
         return node_data, current_events, add_app_message(current_messages, message)
 
 # 打开参数编辑模态窗口
-@callback(
-    Output("param-edit-modal", "is_open"),
-    Output("param-edit-title", "children"),
-    Output("param-edit-name", "value"),
-    Output("param-edit-type", "value"),
-    Output("param-edit-value-display", "children"),
-    Output("param-edit-unit", "value"),
-    Output("param-edit-description", "value"),
-    Output("param-edit-confidence-display", "children"),
-    Output("param-edit-calculation", "value"),
-    Output("dependency-selector-container", "children"),
-    Output("param-edit-data", "data"),
-    Output("param-edit-preview", "children", allow_duplicate=True),
-    Output("param-edit-preview", "color", allow_duplicate=True),
-    Input({"type": "edit-param", "node": ALL, "index": ALL}, "n_clicks"),
+@event_bus_callback(
+    Input({"type": "edit-param", "node": MATCH, "index": MATCH}, "n_clicks"),
     State("param-edit-modal", "is_open"),
+    outputs=PARAM_EDIT_MODAL_OUTPUTS,
     prevent_initial_call=True
 )
 def open_param_edit_modal(edit_clicks, is_open):
@@ -1105,49 +1853,91 @@ def open_param_edit_modal(edit_clicks, is_open):
 
     triggered_id = ctx.triggered_id
     if isinstance(triggered_id, dict) and triggered_id["type"] == "edit-param":
-        node_id = triggered_id["node"]
-        param_index = triggered_id["index"]
+        return build_param_edit_modal(triggered_id["node"], triggered_id["index"])
 
-        if node_id not in graph.nodes:
-            raise dash.exceptions.PreventUpdate
+    raise dash.exceptions.PreventUpdate
 
-        node = graph.nodes[node_id]
-        if param_index >= len(node.parameters):
-            raise dash.exceptions.PreventUpdate
+def build_param_edit_modal(node_id, param_index):
+    """生成打开参数编辑模态窗口所需的各项输出（顺序同 PARAM_EDIT_MODAL_OUTPUTS）"""
+    if node_id not in graph.nodes:
+        raise dash.exceptions.PreventUpdate
 
-        param = node.parameters[param_index]
-        node_name = node.name
+    node = graph.nodes[node_id]
+    if param_index >= len(node.parameters):
+        raise dash.exceptions.PreventUpdate
 
-        available_params = get_all_available_parameters(node_id, param.name)
+    param = node.parameters[param_index]
+    node_name = node.name
 
-        current_dependencies = []
-        for dep_param in param.dependencies:
-            # 找到依赖参数所在的节点名称
-            for check_node_id, check_node in graph.nodes.items():
-                if dep_param in check_node.parameters:
-                    current_dependencies.append(f"{check_node.name}.{dep_param.name}")
-                    break
+    available_params = get_all_available_parameters(node_id, param.name)
 
-        # 创建依赖复选框
-        dependency_checkboxes = create_dependency_checkboxes(available_params, current_dependencies)
+    current_dependencies = []
+    for dep_param in param.dependencies:
+        # 找到依赖参数所在的节点名称
+        for check_node_id, check_node in graph.nodes.items():
+            if dep_param in check_node.parameters:
+                current_dependencies.append(f"{check_node.name}.{dep_param.name}")
+                break
 
-        return (
-            True,  # 打开模态窗口
-            f"编辑参数: {node_name}.{param.name}",
-            param.name,
-            param.param_type if hasattr(param, 'param_type') else 'float',  # 参数类型，必须存在
-            f"{param.value} {param.unit}",  # 显示值和单位
-            param.unit,
-            param.description,
-            f"{param.confidence:.1%}",  # 显示百分比格式的置信度
-            param.calculation_func or "",
-            dependency_checkboxes,
-            {"node_id": node_id, "param_index": param_index},
-            "",  # 重置测试结果显示为空
-            "secondary"  # 重置测试结果颜色为默认
-        )
+    # 创建依赖复选框
+    dependency_checkboxes = create_dependency_checkboxes(available_params, current_dependencies)
+
+    return (
+        True,  # 打开模态窗口
+        f"编辑参数: {node_name}.{param.name}",
+        param.name,
+        param.param_type if hasattr(param, 'param_type') else 'float',  # 参数类型，必须存在
+        f"{param.value} {param.unit}",  # 显示值和单位
+        param.unit,
+        param.description,
+        f"{param.confidence:.1%}",  # 显示百分比格式的置信度
+        param.distribution,
+        param.calculation_func or "",
+        dependency_checkboxes,
+        {"node_id": node_id, "param_index": param_index},
+        "",  # 重置测试结果显示为空
+        "secondary"  # 重置测试结果颜色为默认
+    )
 
-    raise dash.exceptions.PreventUpdate
+# 精简渲染模式：共享参数菜单
+SHARED_PARAM_MENU_OPERATIONS = {
+    "param-menu-delete": "delete-param",
+    "param-menu-move-up": "move-param-up",
+    "param-menu-move-down": "move-param-down",
+}
+
+@event_bus_callback(
+    Input("param-menu-delete", "n_clicks"),
+    Input("param-menu-move-up", "n_clicks"),
+    Input("param-menu-move-down", "n_clicks"),
+    State("param-menu-target", "data"),
+    State("node-data", "data"),
+    State("canvas-events", "data"),
+    State("app-messages", "data"),
+    prevent_initial_call=True
+)
+def handle_shared_param_menu(delete_clicks, move_up_clicks, move_down_clicks, target, node_data, current_events, current_messages):
+    """处理共享参数菜单中的删除/移动操作，目标参数由客户端写入 param-menu-target"""
+    if not target or not ctx.triggered[0]["value"]:
+        raise dash.exceptions.PreventUpdate
+
+    operation_type = SHARED_PARAM_MENU_OPERATIONS.get(ctx.triggered_id)
+    if operation_type is None:
+        raise dash.exceptions.PreventUpdate
+
+    return apply_parameter_operation(operation_type, target.get("node"), target.get("index"), node_data, current_events, current_messages)
+
+@event_bus_callback(
+    Input("param-menu-edit", "n_clicks"),
+    State("param-menu-target", "data"),
+    outputs=PARAM_EDIT_MODAL_OUTPUTS,
+    prevent_initial_call=True
+)
+def open_param_edit_modal_from_shared_menu(edit_clicks, target):
+    """从共享参数菜单打开参数编辑模态窗口"""
+    if not edit_clicks or not target:
+        raise dash.exceptions.PreventUpdate
+    return build_param_edit_modal(target.get("node"), target.get("index"))
 
 # 关闭参数编辑模态窗口
 @callback(
@@ -1232,21 +2022,19 @@ def test_calculation(test_clicks, calculation_code, checkbox_values, checkbox_id
 
         current_param = node.parameters[param_index]
 
-        # 将计算函数临时设置到参数对象上进行测试
-        original_calc_func = current_param.calculation_func
-        original_dependencies = current_param.dependencies
-
-        current_param.calculation_func = calculation_code
-        current_param.dependencies = selected_deps
+        # 在计算图的私有副本上测试，避免影响实际图结构和参数值
+        memo = {}
+        graph.clone(include_layout=False, memo=memo)
+        preview_param = memo[current_param]
+        preview_param.calculation_func = calculation_code
+        preview_param.dependencies = [memo.get(dep, dep) for dep in selected_deps]
 
         # 执行计算
         try:
-            result = current_param.calculate()
-            # 成功后清除可能的旧回溯
-            current_param._calculation_traceback = None 
+            result = preview_param.calculate()
             return f"计算结果: {result}", "success"
         except Exception as e:
-            traceback_info = current_param._calculation_traceback or str(e)
+            traceback_info = preview_param._calculation_traceback or str(e)
             return html.Div([
                 html.P(f"计算错误: {str(e)}", className="mb-1"),
                 html.Details([
@@ -1254,10 +2042,6 @@ def test_calculation(test_clicks, calculation_code, checkbox_values, checkbox_id
                     html.Pre(traceback_info, className="code-display")
                 ])
             ]), "danger"
-        finally:
-            # 恢复原始的计算函数和依赖，避免影响实际图结构
-            current_param.calculation_func = original_calc_func
-            current_param.dependencies = original_dependencies
 
     except Exception as e:
         import traceback
@@ -1285,11 +2069,13 @@ def test_calculation(test_clicks, calculation_code, checkbox_values, checkbox_id
     State("param-edit-data", "data"),
     State("node-data", "data"),
     State("app-messages", "data"),
+    State("param-edit-distribution", "value"),
     prevent_initial_call=True
 )
+@interactive_priority
 def save_parameter_changes(save_clicks, param_name, param_type, param_unit, param_description, 
                           calculation_code, checkbox_values, checkbox_ids, 
-                          edit_data, node_data, current_messages):
+                          edit_data, node_data, current_messages, param_distribution=None):
     if not save_clicks:
         raise dash.exceptions.PreventUpdate
 
@@ -1350,41 +2136,44 @@ def save_parameter_changes(save_clicks, param_name, param_type, param_unit, para
                 error_msg = create_message("param_save_error", f"添加依赖 {dep_param.name} 会造成循环依赖", "error")
                 return True, dash.no_update, add_app_message(current_messages, error_msg)
 
-        # 更新参数基本信息
-        param.name = param_name.strip()
-        param.param_type = param_type if param_type else "float"  # 更新参数类型
-        param.unit = param_unit.strip() if param_unit else ""
-        param.description = param_description.strip() if param_description else ""
-
-        # 注意：参数值和置信度现在只显示，不允许编辑
-        # 如果需要修改值，应该在主界面通过参数输入框进行
-        cascaded_info = ""
+        with graph.mutation(f"编辑参数 {param.name}"):
+            # 更新参数基本信息
+            param.name = param_name.strip()
+            param.param_type = param_type if param_type else "float"  # 更新参数类型
+            param.unit = param_unit.strip() if param_unit else ""
+            param.description = param_description.strip() if param_description else ""
+            if param_distribution:
+                param.distribution = param_distribution
+
+            # 注意：参数值和置信度现在只显示，不允许编辑
+            # 如果需要修改值，应该在主界面通过参数输入框进行
+            cascaded_info = ""
 
-        # 更新计算函数
-        param.calculation_func = calculation_code.strip() if calculation_code else None
+            # 更新计算函数
+            param.calculation_func = calculation_code.strip() if calculation_code else None
 
-        # 清除旧的依赖关系
-        param.dependencies.clear()
+            # 清除旧的依赖关系（整体替换列表，使内容哈希失效）
+            param.dependencies = []
 
-        # 添加新的依赖关系
-        for dep_param in selected_deps:
-            param.add_dependency(dep_param)
+            # 添加新的依赖关系
+            for dep_param in selected_deps:
+                param.add_dependency(dep_param)
 
-        # 确保依赖关系更新到计算图
-        graph.update_parameter_dependencies(param)
+            # 确保依赖关系更新到计算图
+            graph.update_parameter_dependencies(param)
 
-        # 如果有计算函数，尝试执行计算
-        if param.calculation_func:
-            try:
-                result = param.calculate()
-                success_msg = f"参数 {param_name} 已保存并计算，结果: {result}{cascaded_info}"
-            except Exception as calc_error:
-                success_msg = f"参数 {param_name} 已保存，但计算失败: {str(calc_error)}"
-        else:
-            success_msg = f"参数 {param_name} 已保存{cascaded_info}"
+            # 如果有计算函数，尝试执行计算
+            if param.calculation_func:
+                try:
+                    result = param.calculate()
+                    success_msg = f"参数 {param_name} 已保存并计算，结果: {result}{cascaded_info}"
+                except Exception as calc_error:
+                    success_msg = f"参数 {param_name} 已保存，但计算失败: {str(calc_error)}"
+            else:
+                success_msg = f"参数 {param_name} 已保存{cascaded_info}"
 
         # 更新画布显示
-        updated_canvas = update_canvas()
+        updated_canvas = refresh_canvas()
         
         success_message = create_message("param_save_success", success_msg, "success")
         return False, updated_canvas, add_app_message(current_messages, success_message)
@@ -1395,6 +2184,38 @@ def save_parameter_changes(save_clicks, param_name, param_type, param_unit, para
 
 # 高亮功能简化：保持永久高亮，无需定时清除
 
+# 撤销/重做
+@callback(
+    Output("node-data", "data", allow_duplicate=True),
+    Output("canvas-events", "data", allow_duplicate=True),
+    Output("app-messages", "data", allow_duplicate=True),
+    Input("undo-button", "n_clicks"),
+    Input("redo-button", "n_clicks"),
+    State("node-data", "data"),
+    State("canvas-events", "data"),
+    State("app-messages", "data"),
+    prevent_initial_call=True
+)
+def handle_undo_redo(undo_clicks, redo_clicks, node_data, current_events, current_messages):
+    """撤销或重做最近一次对计算图的修改"""
+    if ctx.triggered_id not in ("undo-button", "redo-button"):
+        raise dash.exceptions.PreventUpdate
+
+    if ctx.triggered_id == "undo-button":
+        label = graph.undo()
+        action = "撤销"
+    else:
+        label = graph.redo()
+        action = "重做"
+
+    if label is None:
+        message = create_message("warning", f"⚠️ 没有可{action}的操作", "warning")
+        return node_data, dash.no_update, add_app_message(current_messages, message)
+
+    canvas_event = create_canvas_event("history_restored", {"action": action, "label": label})
+    message = create_message("history", f"↺ 已{action}: {label}", "success")
+    return node_data, add_canvas_event(current_events, canvas_event), add_app_message(current_messages, message)
+
 @callback(
     Output("download-graph", "data"),
     Output("app-messages", "data", allow_duplicate=True),
@@ -1445,10 +2266,12 @@ def load_example_soc_graph_callback(n_clicks, current_messages):
 
     try:
         # 创建示例计算图
+        previous_graph = get_graph()
         result = create_example_soc_graph()
+        result["graph"].inherit_history(previous_graph, "加载示例计算图")
 
         # 更新画布显示
-        updated_canvas = update_canvas()
+        updated_canvas = refresh_canvas()
 
         success_message = (
             f"已加载多核SoC示例计算图："
@@ -1506,11 +2329,12 @@ def load_calculation_graph(contents, filename, current_messages):
         new_graph = CalculationGraph.from_dict(data, new_layout)
 
         # 写入当前 session
+        new_graph.inherit_history(get_graph(), f"加载计算图 {filename}")
         set_graph(new_graph)
         graph = get_graph()
 
         # 更新画布显示
-        updated_canvas = update_canvas()
+        updated_canvas = refresh_canvas()
 
         loaded_nodes = len(new_graph.nodes)
         total_params = sum(len(node.parameters) for node in new_graph.nodes.values())
@@ -1526,18 +2350,26 @@ def load_calculation_graph(contents, filename, current_messages):
 # 更新箭头连接数据
 @callback(
     Output("arrow-connections-data", "data"),
-    Input("canvas-container", "children"),
+    Output("arrow-connections-version", "data"),
+    Input("canvas-events", "data"),
     Input("node-data", "data"),
+    State("arrow-connections-version", "data"),
     prevent_initial_call=False
 )
-def update_arrow_connections_data(canvas_children, node_data):
-    """更新箭头连接数据"""
+def update_arrow_connections_data(canvas_events, node_data, client_version):
+    """更新箭头连接数据：只发送客户端当前版本之后新增和删除的边
+
+    客户端已应用的版本单独存放在 arrow-connections-version（{index, version}），
+    请求中不必带上上一次下发的边数据。
+    """
     try:
-        connections = get_arrow_connections_data()
-        return connections
+        payload = edge_payload(get_graph(), client_version)
+        if payload is None:
+            return dash.no_update, dash.no_update
+        return payload, {"index": payload["index"], "version": payload["version"]}
     except Exception as e:
         print(f"⚠️ 更新箭头连接数据失败: {e}")
-        return []
+        return dash.no_update, dash.no_update
 
 
 # Pin悬停箭头显示系统已移动到 clientside_callbacks.py
@@ -1560,6 +2392,13 @@ def initialize_plot(container_id):
     Output("sensitivity-plot", "figure", allow_duplicate=True),
     Output("app-messages", "data", allow_duplicate=True),
     Output("cumulative-plot-data", "data", allow_duplicate=True),
+    Output("plot-trace-handles", "data", allow_duplicate=True),
+    Output("sweep-job", "data", allow_duplicate=True),
+    Output("sweep-job-interval", "disabled", allow_duplicate=True),
+    Output("sweep-progress-container", "style", allow_duplicate=True),
+    Output("sweep-progress", "value", allow_duplicate=True),
+    Output("sweep-progress", "label", allow_duplicate=True),
+    Output("cancel-sweep-btn", "disabled", allow_duplicate=True),
     Input("generate-plot-btn", "n_clicks"),
     State("selected-x-param", "data"),
     State("selected-y-param", "data"),
@@ -1570,20 +2409,44 @@ def initialize_plot(container_id):
     State("cumulative-plot-data", "data"),
     State("series-name-input", "value"),
     State("app-messages", "data"),
+    State("sweep-job", "data"),
+    State("plot-trace-handles", "data"),
+    State("adaptive-sampling-checkbox", "value"),
+    State("sensitivity-plot-width", "data"),
+    State("sweep-2d-checkbox", "value"),
+    State("selected-x2-param", "data"),
+    State("x2-start-value", "value"),
+    State("x2-end-value", "value"),
+    State("x2-step-value", "value"),
+    State("sweep-2d-render", "value"),
     prevent_initial_call=True
 )
-def generate_sensitivity_plot(n_clicks, x_param, y_param, x_start, x_end, x_step, cumulative_checkbox, cumulative_data, series_name, current_messages):
-    """生成参数敏感性分析图表"""
+def generate_sensitivity_plot(n_clicks, x_param, y_param, x_start, x_end, x_step, cumulative_checkbox, cumulative_data, series_name, current_messages,
+                              job_data=None, trace_handles=None, adaptive_checkbox=None, plot_width=None,
+                              grid_checkbox=None, x2_param=None, x2_start=None, x2_end=None, x2_step=None, grid_render=None):
+    """提交参数敏感性分析任务
+
+    扫描在后台线程中执行（见 jobs.py），由 poll_sensitivity_job 轮询进度、把已完成的点
+    追加到图表末尾的预览曲线中，并在完成后生成正式图表；同一会话提交新任务时，
+    仍在运行的旧任务会被取消，预览曲线由新任务接着使用。
+    勾选"二维扫描"时，X轴参数与第二输入参数组成网格，完成后显示为热力图或等高线图（没有预览曲线）。
+    """
     if not n_clicks:
         raise dash.exceptions.PreventUpdate
 
+    def fail(message, level="warning"):
+        # 图表被替换为空图，旧任务的预览曲线随之消失，旧任务也一并取消
+        if job_data:
+            get_job_runner().cancel(job_data.get("job_id"))
+        error_msg = create_message("plot_error", message, level)
+        return (create_empty_plot(), add_app_message(current_messages, error_msg), cumulative_data, [],
+                None, True, {"display": "none"}, 0, "", dash.no_update)
+
     if not x_param or not y_param:
-        error_msg = create_message("plot_error", "请选择X轴和Y轴参数", "warning")
-        return create_empty_plot(), add_app_message(current_messages, error_msg), cumulative_data
+        return fail("请选择X轴和Y轴参数")
 
     if x_param == y_param:
-        error_msg = create_message("plot_error", "X轴和Y轴参数不能相同", "warning")
-        return create_empty_plot(), add_app_message(current_messages, error_msg), cumulative_data
+        return fail("X轴和Y轴参数不能相同")
 
     # 验证输入值
     try:
@@ -1592,32 +2455,27 @@ def generate_sensitivity_plot(n_clicks, x_param, y_param, x_start, x_end, x_step
         x_step = float(x_step) if x_step is not None else 1
 
         if x_step <= 0:
-            error_msg = create_message("plot_error", "步长必须大于0", "warning")
-            return create_empty_plot(), add_app_message(current_messages, error_msg), cumulative_data
+            return fail("步长必须大于0")
 
         if x_start >= x_end:
-            error_msg = create_message("plot_error", "起始值必须小于结束值", "warning")
-            return create_empty_plot(), add_app_message(current_messages, error_msg), cumulative_data
+            return fail("起始值必须小于结束值")
 
     except (ValueError, TypeError):
-        error_msg = create_message("plot_error", "请输入有效的数值", "warning")
-        return create_empty_plot(), add_app_message(current_messages, error_msg), cumulative_data
+        return fail("请输入有效的数值")
 
     # 从参数值中解析节点ID和参数名
     try:
         x_node_id, x_param_name = x_param.split('|')
         y_node_id, y_param_name = y_param.split('|')
     except ValueError:
-        error_msg = create_message("plot_error", "参数格式错误，请重新选择", "warning")
-        return create_empty_plot(), add_app_message(current_messages, error_msg), cumulative_data
+        return fail("参数格式错误，请重新选择")
 
     # 从graph中获取节点和参数对象
     x_node = graph.nodes.get(x_node_id)
     y_node = graph.nodes.get(y_node_id)
 
     if not x_node or not y_node:
-        error_msg = create_message("plot_error", "参数所属节点不存在，请重新选择", "warning")
-        return create_empty_plot(), add_app_message(current_messages, error_msg), cumulative_data
+        return fail("参数所属节点不存在，请重新选择")
 
     # 构建参数信息字典
     x_param_info = {
@@ -1626,141 +2484,787 @@ def generate_sensitivity_plot(n_clicks, x_param, y_param, x_start, x_end, x_step
         'unit': next((p.unit for p in x_node.parameters if p.name == x_param_name), "")
     }
 
-    y_param_info = {
-        'value': y_param,
-        'label': f"{y_node.name}.{y_param_name}",
-        'unit': next((p.unit for p in y_node.parameters if p.name == y_param_name), "")
+    y_param_info = {
+        'value': y_param,
+        'label': f"{y_node.name}.{y_param_name}",
+        'unit': next((p.unit for p in y_node.parameters if p.name == y_param_name), "")
+    }
+
+    # 确定系列名称：优先使用用户自定义名称，否则使用默认名称
+    final_series_name = series_name.strip() if series_name and series_name.strip() else f"{y_param_info['label']}"
+    is_grid = "grid" in (grid_checkbox or [])
+
+    if is_grid:
+        if not x2_param:
+            return fail("请选择第二输入参数")
+
+        if x2_param in (x_param, y_param):
+            return fail("第二输入参数不能与X轴或Y轴参数相同")
+
+        try:
+            x2_start = float(x2_start) if x2_start is not None else 0
+            x2_end = float(x2_end) if x2_end is not None else 100
+            x2_step = float(x2_step) if x2_step is not None else 1
+
+            if x2_step <= 0:
+                return fail("第二输入参数的步长必须大于0")
+
+            if x2_start >= x2_end:
+                return fail("第二输入参数的起始值必须小于结束值")
+
+        except (ValueError, TypeError):
+            return fail("请输入有效的数值")
+
+        x2_param_obj = find_plot_parameter(x2_param)
+        if not x2_param_obj:
+            return fail("第二输入参数不存在，请重新选择")
+
+        x2_param_info = {
+            'value': x2_param,
+            'label': f"{graph.nodes[x2_param.split('|')[0]].name}.{x2_param_obj.name}",
+            'unit': x2_param_obj.unit
+        }
+
+        # 在计算图副本上准备二维扫描，网格计算交给后台任务
+        prepared = prepare_grid_sweep(
+            x_param_info, x2_param_info, y_param_info,
+            (x_start, x_end, x_step), (x2_start, x2_end, x2_step)
+        )
+
+        meta = {
+            'x_param': x_param,
+            'x2_param': x2_param,
+            'y_param': y_param,
+            'is_cumulative': False,
+            'series_name': final_series_name,
+            'grid': True,
+            'render': grid_render or 'heatmap',
+        }
+    else:
+        # 在计算图副本上准备扫描，扫描本身交给后台任务
+        prepared = prepare_sensitivity_analysis(
+            x_param_info, y_param_info, 
+            x_start, x_end, x_step,
+            adaptive="adaptive" in (adaptive_checkbox or [])
+        )
+
+        meta = {
+            'x_param': x_param,
+            'y_param': y_param,
+            'is_cumulative': "cumulative" in (cumulative_checkbox or []),
+            'series_name': final_series_name,
+        }
+
+    if not prepared['success']:
+        return fail(prepared['message'], "error")
+
+    runner = get_job_runner()
+
+    # 缓存命中：直接生成图表，不再提交后台任务
+    if prepared['cached'] is not None:
+        if job_data:
+            runner.cancel(job_data.get("job_id"))
+        fig, new_cumulative_data, new_trace_handles, message = render_sensitivity_result(
+            prepared['cached'], meta, cumulative_data, trace_handles, plot_width
+        )
+        success_msg = create_message("plot_success", message, "success")
+        return (fig, add_app_message(current_messages, success_msg), new_cumulative_data, new_trace_handles,
+                None, True, {"display": "none"}, 0, "", dash.no_update)
+
+    try:
+        job = runner.submit(session_owner("sensitivity"), prepared['run'], meta=meta)
+    except JobRejected as e:
+        return fail(str(e))
+
+    # 工作线程都忙时告知排队位置
+    position = runner.queue_position(job)
+    messages = dash.no_update
+    label = "0%"
+    if position:
+        queued_msg = create_message("plot_queued", f"计算任务已加入队列，排在第 {position} 位", "info")
+        messages = add_app_message(current_messages, queued_msg)
+        label = f"排队中（第 {position} 位）"
+
+    if is_grid:
+        # 二维扫描没有预览曲线，删除旧任务留下的预览曲线
+        return (drop_preview_trace(job_data), messages, dash.no_update, dash.no_update,
+                {"job_id": job.id, "preview_trace": None, "sent": 0}, False, {"display": "block"}, 0, label, False)
+
+    # 在图表末尾添加（或复用旧任务的）预览曲线，计算过程中的点通过 extendData 追加进来
+    preview_index = job_data.get("preview_trace") if job_data else None
+    figure_patch = dash.Patch()
+    preview_trace = go.Scattergl(
+        x=[], y=[],
+        mode='markers',
+        name=f"{final_series_name} (计算中)",
+        marker=dict(size=4, color='#1f77b4'),
+        hovertemplate='X: %{x}<br>Y: %{y}<extra></extra>'
+    ).to_plotly_json()
+    if preview_index is None:
+        preview_index = len(trace_handles or [])
+        figure_patch["data"].append(preview_trace)
+    else:
+        figure_patch["data"][preview_index] = preview_trace
+
+    return (figure_patch, messages, dash.no_update, dash.no_update,
+            {"job_id": job.id, "preview_trace": preview_index, "sent": 0}, False, {"display": "block"}, 0, label, False)
+
+def render_sensitivity_result(result, meta, cumulative_data, trace_handles, plot_width):
+    """把扫描结果保存到曲线存储并生成图表
+
+    Returns:
+        (图表, 累计曲线句柄, 图表中各曲线的句柄, 消息文本)
+    """
+    x_param = meta['x_param']
+    y_param = meta['y_param']
+    is_cumulative = meta['is_cumulative']
+    final_series_name = meta['series_name']
+
+    # 曲线数据保存在服务端，浏览器中只保留句柄；当前曲线也保存一份全分辨率数据，供缩放重采样和导出
+    trace_store = get_trace_store()
+    handle = trace_store.add(
+        result['x_values'], result['y_values'],
+        trace_name=final_series_name,
+        x_label=result['x_label'],
+        y_label=result['y_label'],
+        x_param=x_param,
+        y_param=y_param,
+        timestamp=datetime.now().isoformat()
+    )
+
+    # 更新累计数据（曲线句柄）
+    new_cumulative_data = []
+    if is_cumulative:
+        history_handles = [h for h in (cumulative_data or []) if trace_store.get(h) is not None]
+        new_cumulative_data = history_handles + [handle]
+        # 超过叠加上限时释放最早的曲线
+        overflow = len(new_cumulative_data) - AppConstants.PLOT_MAX_CUMULATIVE_TRACES
+        if overflow > 0:
+            trace_store.discard(new_cumulative_data[:overflow])
+            new_cumulative_data = new_cumulative_data[overflow:]
+    elif cumulative_data:
+        trace_store.discard(cumulative_data)
+
+    # 释放上一张图中不再显示的曲线
+    new_trace_handles = new_cumulative_data if is_cumulative else [handle]
+    trace_store.discard(h for h in (trace_handles or []) if h not in new_trace_handles)
+
+    history = trace_store.get_many(new_trace_handles[:-1])
+    target_points = plot_target_points(plot_width)
+
+    # 创建Plotly图表
+    fig = go.Figure()
+
+    # 如果启用累计绘图，先添加历史数据
+    if history:
+        for i, trace_data in enumerate(history):
+            # 为历史曲线使用不同的颜色和透明度
+            color_alpha = max(0.3, 1.0 - i * 0.1)  # 历史曲线逐渐变淡
+            colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f']
+            color = colors[i % len(colors)]
+
+            fig.add_trace(create_sensitivity_trace(
+                trace_data.x, trace_data.y,
+                name=f"{trace_data.trace_name}",
+                color=color,
+                line_width=1.5,
+                marker_size=4,
+                opacity=color_alpha,
+                target_points=target_points
+            ))
+
+    # 添加当前数据曲线
+    fig.add_trace(create_sensitivity_trace(
+        result['x_values'], result['y_values'],
+        name=f"{final_series_name} (当前)",
+        color='#1f77b4',
+        line_width=2,
+        marker_size=6,
+        target_points=target_points
+    ))
+
+    fig.update_layout(
+        title=dict(
+            text=f"参数敏感性分析{'（累计模式）' if is_cumulative else ''}",
+            x=0.5,
+            font=dict(size=16)
+        ),
+        xaxis_title=result['x_label'],
+        yaxis_title=result['y_label'],
+        hovermode='x unified',
+        # 重采样只替换曲线数据，保持用户的缩放范围
+        uirevision=handle,
+        template="plotly_white",
+        showlegend=True,  # 始终显示图例
+        margin=dict(
+            l=AppConstants.CHART_MARGIN_LEFT, 
+            r=AppConstants.CHART_MARGIN_RIGHT, 
+            t=AppConstants.CHART_MARGIN_TOP, 
+            b=AppConstants.CHART_MARGIN_BOTTOM
+        ),
+        height=AppConstants.CHART_DEFAULT_HEIGHT,
+        legend=dict(
+            orientation="v",
+            yanchor="top",
+            y=1,
+            xanchor="left",
+            x=1.02
+        ),
+        annotations=[
+            dict(
+                text="powered by ArchDash",
+                xref="paper",
+                yref="paper",
+                x=1.0,
+                y=0.02,
+                xanchor="right",
+                yanchor="bottom",
+                showarrow=False,
+                font=dict(
+                    family="Arial",
+                    size=10,
+                    color="rgba(150, 150, 150, 0.7)"
+                )
+            )
+        ]
+    )
+
+    # 添加网格线和样式优化
+    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.3)')
+    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.3)')
+
+    message = result['message']
+    if is_cumulative:
+        message += f" (累计: {len(new_cumulative_data)} 条曲线)"
+    
+    return fig, new_cumulative_data, new_trace_handles, message
+
+def render_grid_result(result, meta, cumulative_data, trace_handles):
+    """把二维扫描结果保存到曲线存储并生成热力图或等高线图
+
+    二维图表不与曲线叠加，之前的累计曲线和图中曲线都被释放。
+
+    Returns:
+        同 render_sensitivity_result
+    """
+    trace_store = get_trace_store()
+    trace_store.discard(list(cumulative_data or []) + list(trace_handles or []))
+    handle = trace_store.add_grid(
+        result['x_values'], result['x2_values'], result['z_values'],
+        trace_name=meta['series_name'],
+        x_label=result['x_label'],
+        x2_label=result['x2_label'],
+        z_label=result['z_label'],
+        x_param=meta['x_param'],
+        x2_param=meta['x2_param'],
+        z_param=meta['y_param'],
+        timestamp=datetime.now().isoformat()
+    )
+
+    grid_trace = dict(
+        x=result['x_values'],
+        y=result['x2_values'],
+        z=result['z_values'],
+        name=meta['series_name'],
+        colorscale='Viridis',
+        colorbar=dict(title=dict(text=result['z_label'], side='right')),
+        hovertemplate=(f"{result['x_label']}: %{{x}}<br>" +
+                       f"{result['x2_label']}: %{{y}}<br>" +
+                       f"{result['z_label']}: %{{z}}<extra></extra>")
+    )
+    fig = go.Figure()
+    if meta['render'] == 'contour':
+        fig.add_trace(go.Contour(contours=dict(showlabels=True), **grid_trace))
+    else:
+        fig.add_trace(go.Heatmap(**grid_trace))
+
+    fig.update_layout(
+        title=dict(
+            text=f"二维参数扫描：{meta['series_name']}",
+            x=0.5,
+            font=dict(size=16)
+        ),
+        xaxis_title=result['x_label'],
+        yaxis_title=result['x2_label'],
+        uirevision=handle,
+        template="plotly_white",
+        margin=dict(
+            l=AppConstants.CHART_MARGIN_LEFT,
+            r=AppConstants.CHART_MARGIN_RIGHT,
+            t=AppConstants.CHART_MARGIN_TOP,
+            b=AppConstants.CHART_MARGIN_BOTTOM
+        ),
+        height=AppConstants.CHART_DEFAULT_HEIGHT,
+        annotations=[
+            dict(
+                text="powered by ArchDash",
+                xref="paper",
+                yref="paper",
+                x=1.0,
+                y=0.02,
+                xanchor="right",
+                yanchor="bottom",
+                showarrow=False,
+                font=dict(
+                    family="Arial",
+                    size=10,
+                    color="rgba(150, 150, 150, 0.7)"
+                )
+            )
+        ]
+    )
+
+    return fig, [], [handle], result['message']
+
+def render_monte_carlo_result(result, meta, cumulative_data, trace_handles):
+    """生成蒙特卡洛分析的输出分布直方图，标出均值和分位数
+
+    直方图不与曲线叠加，之前的累计曲线和图中曲线都被释放。
+
+    Returns:
+        同 render_sensitivity_result
+    """
+    get_trace_store().discard(list(cumulative_data or []) + list(trace_handles or []))
+    stats = result['stats']
+    edges = stats['histogram_edges']
+
+    fig = go.Figure()
+    # 直方图只有几十个分箱，用普通列表传给浏览器，导出CSV时可直接读取图表数据
+    fig.add_trace(go.Bar(
+        x=((edges[:-1] + edges[1:]) / 2).tolist(),
+        y=stats['histogram_counts'].tolist(),
+        width=np.diff(edges).tolist(),
+        name=meta['series_name'],
+        marker=dict(color='#1f77b4', line=dict(width=0)),
+        opacity=0.8,
+        hovertemplate='%{x}<br>样本数: %{y}<extra></extra>'
+    ))
+
+    # 均值和两端、中位数分位线
+    percentiles = stats['percentiles']
+    markers = [(stats['mean'], "均值", "solid")]
+    low, high = min(percentiles), max(percentiles)
+    markers += [(percentiles[low], f"P{low}", "dash"), (percentiles[high], f"P{high}", "dash")]
+    if 50 in percentiles:
+        markers.append((percentiles[50], "P50", "dot"))
+    for value, text, dash_style in markers:
+        fig.add_vline(
+            x=value,
+            line=dict(color="#d62728", width=1.5, dash=dash_style),
+            annotation=dict(text=text, font=dict(size=10)),
+            annotation_position="top"
+        )
+
+    fig.update_layout(
+        title=dict(
+            text=f"蒙特卡洛不确定性分析：{meta['series_name']}",
+            x=0.5,
+            font=dict(size=16)
+        ),
+        xaxis_title=result['x_label'],
+        yaxis_title="样本数",
+        bargap=0,
+        template="plotly_white",
+        showlegend=False,
+        margin=dict(
+            l=AppConstants.CHART_MARGIN_LEFT,
+            r=AppConstants.CHART_MARGIN_RIGHT,
+            t=AppConstants.CHART_MARGIN_TOP,
+            b=AppConstants.CHART_MARGIN_BOTTOM
+        ),
+        height=AppConstants.CHART_DEFAULT_HEIGHT
+    )
+    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.3)')
+    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.3)')
+
+    # 直方图没有对应的服务端数据，句柄占位使句柄列表与图中曲线一一对应
+    return fig, [], [None], result['message']
+
+def render_tornado_result(result, meta, cumulative_data, trace_handles):
+    """生成龙卷风图：每个输入一行，两段横条分别是下调、上调该输入时输出相对基准的变化
+
+    按影响从大到小排列，最多显示 TORNADO_MAX_BARS 个输入。
+
+    Returns:
+        同 render_sensitivity_result
+    """
+    get_trace_store().discard(list(cumulative_data or []) + list(trace_handles or []))
+    baseline = result['baseline']
+    rows = result['rows'][:AppConstants.TORNADO_MAX_BARS]
+    labels = [row['label'] for row in rows]
+    perturbation = result['perturbation']
+
+    fig = go.Figure()
+    for key, name, color in (('low', f"-{perturbation:g}%", '#ff7f0e'), ('high', f"+{perturbation:g}%", '#1f77b4')):
+        outputs = [row[key] for row in rows]
+        fig.add_trace(go.Bar(
+            y=labels,
+            x=[value - baseline for value in outputs],
+            base=baseline,
+            customdata=outputs,
+            orientation='h',
+            name=name,
+            marker=dict(color=color),
+            hovertemplate='%{y}<br>' + name + ': %{customdata:.4g}<extra></extra>'
+        ))
+    fig.add_vline(x=baseline, line=dict(color="#333333", width=1))
+
+    fig.update_layout(
+        title=dict(
+            text=f"龙卷风图：{meta['series_name']}（±{perturbation:g}%）",
+            x=0.5,
+            font=dict(size=16)
+        ),
+        xaxis_title=result['x_label'],
+        barmode='overlay',
+        # 影响最大的输入排在最上方
+        yaxis=dict(autorange="reversed", automargin=True),
+        template="plotly_white",
+        showlegend=True,
+        margin=dict(
+            l=AppConstants.CHART_MARGIN_LEFT,
+            r=AppConstants.CHART_MARGIN_RIGHT,
+            t=AppConstants.CHART_MARGIN_TOP,
+            b=AppConstants.CHART_MARGIN_BOTTOM
+        ),
+        height=AppConstants.CHART_DEFAULT_HEIGHT,
+        legend=dict(
+            orientation="v",
+            yanchor="top",
+            y=1,
+            xanchor="left",
+            x=1.02
+        )
+    )
+    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.3)')
+
+    message = result['message']
+    if len(result['rows']) > len(rows):
+        message += f"（图中显示影响最大的 {len(rows)} 个）"
+    return fig, [], [None, None], message
+
+def drop_preview_trace(job_data):
+    """删除旧任务留在图表末尾的预览曲线（没有预览曲线时不修改图表）"""
+    preview_index = job_data.get("preview_trace") if job_data else None
+    if preview_index is None:
+        return dash.no_update
+    figure_patch = dash.Patch()
+    del figure_patch["data"][preview_index]
+    return figure_patch
+
+# 蒙特卡洛不确定性分析
+@callback(
+    Output("sensitivity-plot", "figure", allow_duplicate=True),
+    Output("app-messages", "data", allow_duplicate=True),
+    Output("cumulative-plot-data", "data", allow_duplicate=True),
+    Output("plot-trace-handles", "data", allow_duplicate=True),
+    Output("sweep-job", "data", allow_duplicate=True),
+    Output("sweep-job-interval", "disabled", allow_duplicate=True),
+    Output("sweep-progress-container", "style", allow_duplicate=True),
+    Output("sweep-progress", "value", allow_duplicate=True),
+    Output("sweep-progress", "label", allow_duplicate=True),
+    Output("cancel-sweep-btn", "disabled", allow_duplicate=True),
+    Input("monte-carlo-btn", "n_clicks"),
+    State("selected-y-param", "data"),
+    State("series-name-input", "value"),
+    State("app-messages", "data"),
+    State("sweep-job", "data"),
+    prevent_initial_call=True
+)
+def generate_monte_carlo(n_clicks, y_param, series_name, current_messages, job_data=None):
+    """提交Y轴参数的蒙特卡洛不确定性分析任务，完成后生成输出分布直方图"""
+    if not n_clicks:
+        raise dash.exceptions.PreventUpdate
+
+    if not y_param:
+        return analysis_job_error("请选择Y轴参数作为蒙特卡洛分析的输出", current_messages)
+
+    y_param_info = plot_param_info(y_param)
+    if not y_param_info:
+        return analysis_job_error("参数所属节点不存在，请重新选择", current_messages)
+
+    prepared = prepare_monte_carlo(y_param_info)
+    if not prepared['success']:
+        return analysis_job_error(prepared['message'], current_messages, "error")
+
+    meta = {
+        'y_param': y_param,
+        'is_cumulative': False,
+        'series_name': series_name.strip() if series_name and series_name.strip() else y_param_info['label'],
+        'monte_carlo': True,
+    }
+    return submit_analysis_job(prepared['run'], meta, job_data, current_messages)
+
+# 龙卷风图
+@callback(
+    Output("sensitivity-plot", "figure", allow_duplicate=True),
+    Output("app-messages", "data", allow_duplicate=True),
+    Output("cumulative-plot-data", "data", allow_duplicate=True),
+    Output("plot-trace-handles", "data", allow_duplicate=True),
+    Output("sweep-job", "data", allow_duplicate=True),
+    Output("sweep-job-interval", "disabled", allow_duplicate=True),
+    Output("sweep-progress-container", "style", allow_duplicate=True),
+    Output("sweep-progress", "value", allow_duplicate=True),
+    Output("sweep-progress", "label", allow_duplicate=True),
+    Output("cancel-sweep-btn", "disabled", allow_duplicate=True),
+    Input("tornado-btn", "n_clicks"),
+    State("selected-y-param", "data"),
+    State("tornado-perturbation-input", "value"),
+    State("series-name-input", "value"),
+    State("app-messages", "data"),
+    State("sweep-job", "data"),
+    prevent_initial_call=True
+)
+def generate_tornado(n_clicks, y_param, perturbation, series_name, current_messages, job_data=None):
+    """提交Y轴参数的龙卷风图分析任务：上游每个输入分别扰动 ±perturbation%，按输出变化幅度排序"""
+    if not n_clicks:
+        raise dash.exceptions.PreventUpdate
+
+    if not y_param:
+        return analysis_job_error("请选择Y轴参数作为龙卷风图的输出", current_messages)
+
+    try:
+        perturbation = float(perturbation) if perturbation is not None else AppConstants.TORNADO_DEFAULT_PERTURBATION
+    except (ValueError, TypeError):
+        return analysis_job_error("请输入有效的扰动幅度", current_messages)
+    if not 0 < perturbation < 100:
+        return analysis_job_error("扰动幅度必须在0到100%之间", current_messages)
+
+    y_param_info = plot_param_info(y_param)
+    if not y_param_info:
+        return analysis_job_error("参数所属节点不存在，请重新选择", current_messages)
+
+    prepared = prepare_tornado(y_param_info, perturbation)
+    if not prepared['success']:
+        return analysis_job_error(prepared['message'], current_messages, "error")
+
+    meta = {
+        'y_param': y_param,
+        'is_cumulative': False,
+        'series_name': series_name.strip() if series_name and series_name.strip() else y_param_info['label'],
+        'tornado': True,
     }
+    return submit_analysis_job(prepared['run'], meta, job_data, current_messages)
 
-    # 执行敏感性分析
-    result = perform_sensitivity_analysis(
-        x_param_info, y_param_info, 
-        x_start, x_end, x_step
-    )
+# 局部导数
+@callback(
+    Output("canvas-container", "children", allow_duplicate=True),
+    Output("app-messages", "data", allow_duplicate=True),
+    Input("local-derivative-btn", "n_clicks"),
+    State("selected-x-param", "data"),
+    State("sweep-2d-checkbox", "value"),
+    State("selected-x2-param", "data"),
+    State("app-messages", "data"),
+    prevent_initial_call=True
+)
+def show_local_derivatives(n_clicks, x_param, grid_checkbox, x2_param, current_messages):
+    """以X轴参数（勾选二维扫描时还有第二输入参数）为输入，求所有下游参数的局部导数并显示在画布中"""
+    if not n_clicks:
+        raise dash.exceptions.PreventUpdate
 
-    if not result['success']:
-        error_msg = create_message("plot_error", result['message'], "error")
-        return create_empty_plot(), add_app_message(current_messages, error_msg), cumulative_data
+    input_values = [x_param] + ([x2_param] if "grid" in (grid_checkbox or []) and x2_param else [])
+    result = compute_local_derivatives(input_values)
+    message = create_message("local_derivatives", result['message'], result['level'])
+    return (update_canvas() if result['success'] else dash.no_update), add_app_message(current_messages, message)
 
-    # 检查是否启用累计绘图
-    is_cumulative = "cumulative" in (cumulative_checkbox or [])
+def compute_local_derivatives(input_values):
+    """在当前会话计算图的副本上以对偶数求下游参数对各输入的偏导数，结果保存到 LOCAL_DERIVATIVES
 
-    # 确定系列名称：优先使用用户自定义名称，否则使用默认名称
-    final_series_name = series_name.strip() if series_name and series_name.strip() else f"{y_param_info['label']}"
+    Args:
+        input_values: 输入参数的 "节点ID|参数名" 列表
+    Returns:
+        {'success', 'message', 'level'}
+    """
+    if not input_values or not input_values[0]:
+        return {'success': False, 'message': "请选择X轴参数作为求导的输入", 'level': "warning"}
+    if len(set(input_values)) < len(input_values):
+        return {'success': False, 'message': "两个输入参数不能相同", 'level': "warning"}
+
+    inputs = []
+    for param_value in input_values:
+        param_info = plot_param_info(param_value)
+        if not param_info:
+            return {'success': False, 'message': "参数所属节点不存在，请重新选择", 'level': "warning"}
+        param = find_plot_parameter(param_value)
+        value = param.value
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            return {'success': False, 'message': f"{param_info['label']} 的值不是有限数值，无法求导", 'level': "warning"}
+        inputs.append((param, param_info['label']))
+
+    labels = "、".join(label for _, label in inputs)
+    try:
+        memo = {}
+        cloned = graph.clone(include_layout=False, memo=memo)
+        cloned_inputs = [memo[param] for param, _ in inputs]
+        # 只统计当前值为数值的下游参数（字符串等参数没有导数）
+        downstream_count = sum(
+            1 for param in downstream_order(cloned, cloned_inputs)
+            if isinstance(param.value, (int, float)) and not isinstance(param.value, bool)
+        )
+        if not downstream_count:
+            return {'success': False, 'message': f"{labels} 没有会自动计算的数值下游参数", 'level': "warning"}
+        results = forward_derivatives(cloned, cloned_inputs)
+    except Exception as e:
+        return {'success': False, 'message': f"求导失败: {str(e)}", 'level': "error"}
 
-    # 创建当前分析的数据项
-    current_trace_data = {
-        'x_values': result['x_values'],
-        'y_values': result['y_values'],
-        'x_label': result['x_label'],
-        'y_label': result['y_label'],
-        'trace_name': final_series_name,
-        'x_param': x_param,
-        'y_param': y_param,
-        'timestamp': datetime.now().isoformat()
+    originals = {clone: param for param, clone in memo.items()}
+    LOCAL_DERIVATIVES[get_graph()] = {
+        'inputs': [(label, float(param.value)) for param, label in inputs],
+        'entries': {originals[clone]: (originals[clone].content_hash, derivative) for clone, derivative in results.items()},
     }
 
-    # 创建Plotly图表
-    fig = go.Figure()
+    dual_count = sum(1 for derivative in results.values() if derivative.method == "dual")
+    details = [f"对偶数 {dual_count} 个"]
+    if len(results) > dual_count:
+        details.append(f"有限差分 {len(results) - dual_count} 个")
+    if downstream_count > len(results):
+        details.append(f"计算失败 {downstream_count - len(results)} 个")
+    return {
+        'success': True,
+        'message': f"已求出 {len(results)} 个下游参数对 {labels} 的局部导数（{'，'.join(details)}），显示在画布中",
+        'level': "success" if downstream_count == len(results) else "warning",
+    }
 
-    # 如果启用累计绘图，先添加历史数据
-    if is_cumulative and cumulative_data:
-        for i, trace_data in enumerate(cumulative_data):
-            # 为历史曲线使用不同的颜色和透明度
-            color_alpha = max(0.3, 1.0 - i * 0.1)  # 历史曲线逐渐变淡
-            colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f']
-            color = colors[i % len(colors)]
+def plot_param_info(param_value):
+    """绘图参数的信息字典 {'value', 'label', 'unit'}；参数不存在时返回None"""
+    param = find_plot_parameter(param_value)
+    if not param:
+        return None
+    return {
+        'value': param_value,
+        'label': f"{graph.nodes[param_value.split('|')[0]].name}.{param.name}",
+        'unit': param.unit
+    }
 
-            fig.add_trace(go.Scatter(
-                x=trace_data['x_values'],
-                y=trace_data['y_values'],
-                mode='lines+markers',
-                name=f"{trace_data['trace_name']}",
-                line=dict(width=1.5, color=color),
-                marker=dict(size=4, color=color),
-                opacity=color_alpha,
-                hovertemplate='<b>%{fullData.name}</b><br>' +
-                              'X: %{x}<br>' +
-                              'Y: %{y}<br>' +
-                              '<extra></extra>'
-            ))
+def analysis_job_error(message, current_messages, level="warning"):
+    """分析任务提交失败时的输出（顺序同 generate_monte_carlo），只显示消息，不改动图表和正在运行的任务"""
+    error_msg = create_message("plot_error", message, level)
+    return (dash.no_update, add_app_message(current_messages, error_msg), dash.no_update, dash.no_update,
+            dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update)
 
-    # 添加当前数据曲线
-    fig.add_trace(go.Scatter(
-        x=result['x_values'],
-        y=result['y_values'],
-        mode='lines+markers',
-        name=f"{final_series_name} (当前)",
-        line=dict(width=2, color='#1f77b4'),
-        marker=dict(size=6, color='#1f77b4'),
-        hovertemplate='<b>%{fullData.name}</b><br>' +
-                      'X: %{x}<br>' +
-                      'Y: %{y}<br>' +
-                      '<extra></extra>'
-    ))
+def submit_analysis_job(run, meta, job_data, current_messages):
+    """提交没有预览曲线的分析任务（蒙特卡洛、龙卷风图）
 
-    # 更新累计数据
-    new_cumulative_data = cumulative_data.copy() if is_cumulative else []
-    if is_cumulative:
-        new_cumulative_data.append(current_trace_data)
-        # 限制最大存储数量，避免内存溢出
-        if len(new_cumulative_data) > 10:
-            new_cumulative_data = new_cumulative_data[-10:]
+    与敏感性分析共用后台任务、进度条和图表（同一会话提交新任务时取消旧任务），
+    完成后由 poll_sensitivity_job 按 meta 生成图表。返回值顺序同 generate_monte_carlo。
+    """
+    runner = get_job_runner()
+    try:
+        job = runner.submit(session_owner("sensitivity"), run, meta=meta)
+    except JobRejected as e:
+        return analysis_job_error(str(e), current_messages)
+
+    position = runner.queue_position(job)
+    messages = dash.no_update
+    label = "0%"
+    if position:
+        queued_msg = create_message("plot_queued", f"计算任务已加入队列，排在第 {position} 位", "info")
+        messages = add_app_message(current_messages, queued_msg)
+        label = f"排队中（第 {position} 位）"
+
+    return (drop_preview_trace(job_data), messages, dash.no_update, dash.no_update,
+            {"job_id": job.id, "preview_trace": None, "sent": 0}, False, {"display": "block"}, 0, label, False)
+
+# 轮询后台敏感性分析任务
+@callback(
+    Output("sensitivity-plot", "figure", allow_duplicate=True),
+    Output("app-messages", "data", allow_duplicate=True),
+    Output("cumulative-plot-data", "data", allow_duplicate=True),
+    Output("plot-trace-handles", "data", allow_duplicate=True),
+    Output("sweep-job", "data", allow_duplicate=True),
+    Output("sweep-job-interval", "disabled", allow_duplicate=True),
+    Output("sweep-progress-container", "style", allow_duplicate=True),
+    Output("sweep-progress", "value", allow_duplicate=True),
+    Output("sweep-progress", "label", allow_duplicate=True),
+    Output("sensitivity-plot", "extendData"),
+    Input("sweep-job-interval", "n_intervals"),
+    State("sweep-job", "data"),
+    State("cumulative-plot-data", "data"),
+    State("plot-trace-handles", "data"),
+    State("sensitivity-plot-width", "data"),
+    State("app-messages", "data"),
+    prevent_initial_call=True
+)
+def poll_sensitivity_job(n_intervals, job_data, cumulative_data, trace_handles, plot_width, current_messages):
+    """更新进度条并把新完成的点追加到预览曲线；任务结束后生成图表并停止轮询"""
+    runner = get_job_runner()
+    job_data = job_data or {}
+    job = runner.get(job_data.get("job_id"))
+    finished = (None, True, {"display": "none"}, 0, "", dash.no_update)
+    preview_index = job_data.get("preview_trace")
+
+    if job is None:
+        # 任务已不存在（如服务重启），停止轮询
+        return (drop_preview_trace(job_data), dash.no_update, dash.no_update, dash.no_update) + finished
+
+    if not runner.is_current(job):
+        # 已被同一会话新提交的任务取代（旧任务显示为已取消）：预览曲线、轮询状态和进度条
+        # 都已属于新任务，不做任何修改
+        runner.collect(job.id)
+        raise dash.exceptions.PreventUpdate
 
-    fig.update_layout(
-        title=dict(
-            text=f"参数敏感性分析{'（累计模式）' if is_cumulative else ''}",
-            x=0.5,
-            font=dict(size=16)
-        ),
-        xaxis_title=result['x_label'],
-        yaxis_title=result['y_label'],
-        hovermode='x unified',
-        template="plotly_white",
-        showlegend=True,  # 始终显示图例
-        margin=dict(
-            l=AppConstants.CHART_MARGIN_LEFT, 
-            r=AppConstants.CHART_MARGIN_RIGHT, 
-            t=AppConstants.CHART_MARGIN_TOP, 
-            b=AppConstants.CHART_MARGIN_BOTTOM
-        ),
-        height=AppConstants.CHART_DEFAULT_HEIGHT,
-        legend=dict(
-            orientation="v",
-            yanchor="top",
-            y=1,
-            xanchor="left",
-            x=1.02
-        ),
-        annotations=[
-            dict(
-                text="powered by ArchDash",
-                xref="paper",
-                yref="paper",
-                x=1.0,
-                y=0.02,
-                xanchor="right",
-                yanchor="bottom",
-                showarrow=False,
-                font=dict(
-                    family="Arial",
-                    size=10,
-                    color="rgba(150, 150, 150, 0.7)"
-                )
-            )
-        ]
-    )
+    if not job.finished:
+        position = runner.queue_position(job)
+        percent = int(job.progress * 100)
+        label = f"排队中（第 {position} 位）" if position else f"{percent}%"
+
+        # 增量推送中间结果，每次最多 SWEEP_STREAM_CHUNK_POINTS 个点
+        sent = job_data.get("sent", 0)
+        chunk = job.partial_since(sent)[:PerformanceConstants.SWEEP_STREAM_CHUNK_POINTS]
+        if not chunk or preview_index is None:
+            return (dash.no_update, dash.no_update, dash.no_update, dash.no_update,
+                    dash.no_update, dash.no_update, dash.no_update, percent, label, dash.no_update)
+        x_chunk, y_chunk = zip(*chunk)
+        extend_data = (dict(x=[list(x_chunk)], y=[list(y_chunk)]), [preview_index])
+        return (dash.no_update, dash.no_update, dash.no_update, dash.no_update,
+                dict(job_data, sent=sent + len(chunk)), dash.no_update, dash.no_update, percent, label, extend_data)
+
+    runner.collect(job.id)
+    result = job.result if job.status == Job.DONE else None
+
+    if job.status == Job.CANCELLED:
+        message = create_message("plot_cancelled", "敏感性分析已取消", "info")
+        return (drop_preview_trace(job_data), add_app_message(current_messages, message), dash.no_update, dash.no_update) + finished
+
+    if result is None or not result['success']:
+        error_text = result['message'] if result else f"分析失败: {job.error}"
+        error_msg = create_message("plot_error", error_text, "error")
+        return (create_empty_plot(), add_app_message(current_messages, error_msg), cumulative_data, []) + finished
+
+    # 完成后用正式图表替换预览
+    if job.meta.get('grid'):
+        fig, new_cumulative_data, new_trace_handles, message = render_grid_result(
+            result, job.meta, cumulative_data, trace_handles
+        )
+    elif job.meta.get('monte_carlo'):
+        fig, new_cumulative_data, new_trace_handles, message = render_monte_carlo_result(
+            result, job.meta, cumulative_data, trace_handles
+        )
+    elif job.meta.get('tornado'):
+        fig, new_cumulative_data, new_trace_handles, message = render_tornado_result(
+            result, job.meta, cumulative_data, trace_handles
+        )
+    else:
+        fig, new_cumulative_data, new_trace_handles, message = render_sensitivity_result(
+            result, job.meta, cumulative_data, trace_handles, plot_width
+        )
+    success_msg = create_message("plot_success", message, "success")
+    return (fig, add_app_message(current_messages, success_msg), new_cumulative_data, new_trace_handles) + finished
 
-    # 添加网格线和样式优化
-    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.3)')
-    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.3)')
+# 取消后台敏感性分析任务
+@callback(
+    Output("cancel-sweep-btn", "disabled", allow_duplicate=True),
+    Input("cancel-sweep-btn", "n_clicks"),
+    State("sweep-job", "data"),
+    prevent_initial_call=True
+)
+def cancel_sensitivity_job(n_clicks, job_data):
+    """请求取消任务，任务结束后由 poll_sensitivity_job 收尾"""
+    if not n_clicks or not job_data:
+        raise dash.exceptions.PreventUpdate
+    get_job_runner().cancel(job_data.get("job_id"))
+    return True
 
-    message = result['message']
-    if is_cumulative:
-        message += f" (累计: {len(new_cumulative_data)} 条曲线)"
-    
-    success_msg = create_message("plot_success", message, "success")
-    return fig, add_app_message(current_messages, success_msg), new_cumulative_data
 
 # 清除图表
 @callback(
@@ -1769,16 +3273,87 @@ def generate_sensitivity_plot(n_clicks, x_param, y_param, x_start, x_end, x_step
     Output("selected-y-param", "data", allow_duplicate=True),
     Output("x-param-display", "value", allow_duplicate=True),
     Output("y-param-display", "value", allow_duplicate=True),
+    Output("selected-x2-param", "data", allow_duplicate=True),
+    Output("x2-param-display", "value", allow_duplicate=True),
     Output("cumulative-plot-data", "data", allow_duplicate=True),
+    Output("plot-trace-handles", "data", allow_duplicate=True),
+    Output("sweep-job", "data", allow_duplicate=True),
+    Output("sweep-job-interval", "disabled", allow_duplicate=True),
+    Output("sweep-progress-container", "style", allow_duplicate=True),
     Input("clear-plot-btn", "n_clicks"),
+    State("cumulative-plot-data", "data"),
+    State("plot-trace-handles", "data"),
+    State("sweep-job", "data"),
     prevent_initial_call=True
 )
-def clear_plot(n_clicks):
-    """清除图表、选择器和累计数据"""
+def clear_plot(n_clicks, cumulative_data, trace_handles=None, job_data=None):
+    """清除图表、选择器和累计数据，并取消正在运行的分析任务"""
     if not n_clicks:
         raise dash.exceptions.PreventUpdate
 
-    return create_empty_plot(), None, None, "", "", []
+    if job_data:
+        get_job_runner().cancel(job_data.get("job_id"))
+    get_trace_store().discard(list(cumulative_data or []) + list(trace_handles or []))
+    return create_empty_plot(), None, None, "", "", None, "", [], [], None, True, {"display": "none"}
+
+# 清除图表时一并清除画布中的局部导数
+@callback(
+    Output("canvas-container", "children", allow_duplicate=True),
+    Input("clear-plot-btn", "n_clicks"),
+    prevent_initial_call=True
+)
+def clear_local_derivatives(n_clicks):
+    """清除画布中显示的局部导数"""
+    if not n_clicks or LOCAL_DERIVATIVES.pop(get_graph(), None) is None:
+        raise dash.exceptions.PreventUpdate
+    return update_canvas()
+
+# 缩放或图表宽度变化时按可见范围重新降采样
+@callback(
+    Output("sensitivity-plot", "figure", allow_duplicate=True),
+    Input("sensitivity-plot", "relayoutData"),
+    Input("sensitivity-plot-width", "data"),
+    State("plot-trace-handles", "data"),
+    prevent_initial_call=True
+)
+def resample_sensitivity_plot(relayout_data, plot_width, trace_handles):
+    """用服务端的全分辨率数据对可见X范围重新降采样，只替换降采样曲线的 x/y"""
+    if not trace_handles:
+        raise dash.exceptions.PreventUpdate
+
+    relayout_data = relayout_data or {}
+    if 'xaxis.range[0]' in relayout_data and 'xaxis.range[1]' in relayout_data:
+        x_range = (relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]'])
+    elif isinstance(relayout_data.get('xaxis.range'), list) and len(relayout_data['xaxis.range']) == 2:
+        x_range = tuple(relayout_data['xaxis.range'])
+    elif relayout_data.get('xaxis.autorange') or ctx.triggered_id == "sensitivity-plot-width":
+        x_range = (None, None)
+    else:
+        # 与X范围无关的布局变化（如只缩放Y轴、自适应尺寸）
+        raise dash.exceptions.PreventUpdate
+
+    try:
+        x_min = float(x_range[0]) if x_range[0] is not None else None
+        x_max = float(x_range[1]) if x_range[1] is not None else None
+    except (TypeError, ValueError):
+        raise dash.exceptions.PreventUpdate
+
+    target_points = plot_target_points(plot_width)
+    trace_store = get_trace_store()
+    patch = dash.Patch()
+    changed = False
+    for index, handle in enumerate(trace_handles):
+        trace_data = trace_store.get(handle)
+        if trace_data is None or isinstance(trace_data, PlotGrid) or len(trace_data.x) <= AppConstants.PLOT_WEBGL_THRESHOLD:
+            continue
+        x_sampled, y_sampled = downsample_range(trace_data.x, trace_data.y, x_min, x_max, target_points)
+        patch["data"][index]["x"] = x_sampled.tolist()
+        patch["data"][index]["y"] = y_sampled.tolist()
+        changed = True
+
+    if not changed:
+        raise dash.exceptions.PreventUpdate
+    return patch
 
 # 导出绘图数据
 @callback(
@@ -1787,13 +3362,18 @@ def clear_plot(n_clicks):
     State("sensitivity-plot", "figure"),
     State("selected-x-param", "data"),
     State("selected-y-param", "data"),
+    State("plot-trace-handles", "data"),
     prevent_initial_call=True
 )
-def export_plot_data(n_clicks, figure, x_param, y_param):
-    """导出绘图数据为CSV文件"""
+def export_plot_data(n_clicks, figure, x_param, y_param, trace_handles=None):
+    """导出绘图数据为CSV文件；二维扫描结果导出为 numpy 的 npz 数组文件"""
     if not n_clicks or not figure:
         raise dash.exceptions.PreventUpdate
 
+    full_data = get_trace_store().get(trace_handles[0]) if trace_handles else None
+    if isinstance(full_data, PlotGrid):
+        return export_grid_data(full_data)
+
     try:
         # 检查图表是否有数据
         if not figure.get('data') or len(figure['data']) == 0:
@@ -1837,9 +3417,13 @@ def export_plot_data(n_clicks, figure, x_param, y_param):
         y_title = figure['layout'].get('yaxis', {}).get('title', {}).get('text', 'Y')
         csv_lines.append(f"{x_title},{y_title}")
 
-        # 添加数据行
-        x_values = trace_data['x']
-        y_values = trace_data['y']
+        # 添加数据行：优先使用服务端的全分辨率数据（图表中可能是降采样后的曲线）
+        if full_data is not None:
+            x_values = full_data.x.tolist()
+            y_values = full_data.y.tolist()
+        else:
+            x_values = trace_data['x']
+            y_values = trace_data['y']
 
         for x_val, y_val in zip(x_values, y_values):
             csv_lines.append(f"{x_val},{y_val}")
@@ -1862,6 +3446,24 @@ def export_plot_data(n_clicks, figure, x_param, y_param):
         print(f"导出数据失败: {e}")
         raise dash.exceptions.PreventUpdate
 
+def export_grid_data(grid):
+    """把二维扫描结果网格打包为 npz 文件下载
+
+    文件中 x、x2 为两个输入参数的取值，z[i, j] 为输入 (x[j], x2[i]) 时的输出值（计算失败为 NaN），
+    *_label、*_param 为轴标签和参数标识，可用 ``numpy.load`` 直接读取。
+    """
+    def write(buffer):
+        np.savez_compressed(
+            buffer,
+            x=grid.x, x2=grid.x2, z=grid.z,
+            x_label=np.array(grid.x_label), x2_label=np.array(grid.x2_label), z_label=np.array(grid.z_label),
+            x_param=np.array(grid.x_param), x2_param=np.array(grid.x2_param), z_param=np.array(grid.z_param),
+            generated_at=np.array(datetime.now().isoformat())
+        )
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return dcc.send_bytes(write, f"sensitivity_grid_{timestamp}.npz")
+
 # 自动更新系列名称输入框的默认值
 @callback(
     Output("series-name-input", "value"),
@@ -1898,6 +3500,31 @@ def auto_update_series_name(y_param):
 )
 def auto_update_range(x_param):
     """当选择X轴参数时，自动设置合理的范围值"""
+    return default_sweep_range(x_param)
+
+# 勾选二维扫描时显示第二输入参数的设置
+@callback(
+    Output("sweep-2d-collapse", "is_open"),
+    Input("sweep-2d-checkbox", "value"),
+    prevent_initial_call=True
+)
+def toggle_grid_sweep_options(grid_checkbox):
+    """二维扫描选项的展开和折叠"""
+    return "grid" in (grid_checkbox or [])
+
+# 自动更新第二输入参数的范围值
+@callback(
+    Output("x2-start-value", "value"),
+    Output("x2-end-value", "value"),
+    Input("selected-x2-param", "data"),
+    prevent_initial_call=True
+)
+def auto_update_x2_range(x2_param):
+    """当选择第二输入参数时，自动设置合理的范围值"""
+    return default_sweep_range(x2_param)
+
+def default_sweep_range(x_param):
+    """按参数当前值给出默认扫描范围 (起始值, 结束值)"""
     if not x_param:
         raise dash.exceptions.PreventUpdate
 
@@ -1935,276 +3562,341 @@ def auto_update_range(x_param):
         # 如果转换失败，返回默认值
         return AppConstants.SENSITIVITY_DEFAULT_START, AppConstants.SENSITIVITY_DEFAULT_END
 
-def get_all_parameter_dependencies():
-    """获取计算图中所有参数的依赖关系，包括计算过程和历史"""
-    if not graph.nodes:
-        return []
-
-    dependencies_info = []
+def parameter_locations():
+    """返回 {参数: (节点ID, 节点)}，用于从参数对象反查所在节点"""
+    return {
+        param: (node_id, node)
+        for node_id, node in graph.nodes.items()
+        for param in node.parameters
+    }
 
-    # 遍历所有节点和参数
-    for node_id, node in graph.nodes.items():
-        node_name = node.name
+def get_parameter_dependency_info(node_id, node, param, locations):
+    """获取单个参数的依赖关系，包括计算过程；被依赖关系从计算图的依赖关系映射中查询"""
+    param_info = {
+        'node_id': node_id,
+        'node_name': node.name,
+        'param_name': param.name,
+        'param_value': param.value,
+        'param_unit': param.unit,
+        'param_description': param.description,
+        'param_confidence': getattr(param, 'confidence', 1.0),
+        'has_calculation': bool(param.calculation_func),
+        'calculation_func': param.calculation_func,
+        'dependencies': [],
+        'dependents': [],
+        'calculation_chain': [],  # 完整的计算链条
+        'execution_time': None,   # 计算执行时间
+        'calculation_error': None # 计算错误信息
+    }
 
-        for param_idx, param in enumerate(node.parameters):
-
-            param_info = {
-                'node_id': node_id,
-                'node_name': node_name,
-                'param_name': param.name,
-                'param_value': param.value,
-                'param_unit': param.unit,
-                'param_description': param.description,
-                'param_confidence': getattr(param, 'confidence', 1.0),
-                'has_calculation': bool(param.calculation_func),
-                'calculation_func': param.calculation_func,
-                'dependencies': [],
-                'dependents': [],
-                'calculation_chain': [],  # 完整的计算链条
-                'execution_time': None,   # 计算执行时间
-                'calculation_error': None # 计算错误信息
-            }
+    for dep_param in param.dependencies:
+        dep_node_id, dep_node = locations.get(dep_param, (None, None))
 
-            for dep_param in param.dependencies:
-                # 找到依赖参数所在的节点
-                dep_node_id = None
-                dep_node_name = None
-                for search_node_id, search_node in graph.nodes.items():
-                    if dep_param in search_node.parameters:
-                        dep_node_id = search_node_id
-                        dep_node_name = search_node.name
-                        break
-
-                # 计算依赖强度（基于参数类型）
-                dep_strength = "正常"
-                if dep_param.calculation_func:
-                    dep_strength = "计算参数"
-                else:
-                    dep_strength = "输入参数"
-
-                param_info['dependencies'].append({
-                    'node_id': dep_node_id,
-                    'node_name': dep_node_name,
-                    'param_name': dep_param.name,
-                    'param_value': dep_param.value,
-                    'param_unit': dep_param.unit,
-                    'param_obj': dep_param,
-                    'dependency_strength': dep_strength
-                })
+        # 计算依赖强度（基于参数类型）
+        if dep_param.calculation_func:
+            dep_strength = "计算参数"
+        else:
+            dep_strength = "输入参数"
+
+        param_info['dependencies'].append({
+            'node_id': dep_node_id,
+            'node_name': dep_node.name if dep_node else None,
+            'param_name': dep_param.name,
+            'param_value': dep_param.value,
+            'param_unit': dep_param.unit,
+            'param_obj': dep_param,
+            'dependency_strength': dep_strength
+        })
+
+    for dependent in get_graph().get_parameter_dependents(param):
+        location = locations.get(dependent)
+        if location is None:
+            continue  # 已从计算图中删除的参数
+        param_info['dependents'].append({
+            'node_id': location[0],
+            'node_name': location[1].name,
+            'param_name': dependent.name,
+            'param_value': dependent.value,
+            'param_unit': dependent.unit,
+            'param_obj': dependent,
+            'has_calculation': bool(dependent.calculation_func)
+        })
+
+    # 构建完整的计算链条（如果存在计算函数）
+    if param.calculation_func and param.dependencies:
+        try:
+            calculation_chain = []
+            for i, dep_param in enumerate(param.dependencies):
+                calculation_chain.append(f"dependencies[{i}] = {dep_param.name} = {dep_param.value}")
 
-            for search_node_id, search_node in graph.nodes.items():
-                for search_param in search_node.parameters:
-                    if param in search_param.dependencies:
-                        search_node_name = search_node.name
-                        param_info['dependents'].append({
-                            'node_id': search_node_id,
-                            'node_name': search_node_name,
-                            'param_name': search_param.name,
-                            'param_value': search_param.value,
-                            'param_unit': search_param.unit,
-                            'param_obj': search_param,
-                            'has_calculation': bool(search_param.calculation_func)
-                        })
-
-            # 构建完整的计算链条（如果存在计算函数）
-            if param.calculation_func and param.dependencies:
-                try:
-                    calculation_chain = []
-                    for i, dep_param in enumerate(param.dependencies):
-                        dep_name = dep_param.name
-                        dep_value = dep_param.value
-                        calculation_chain.append(f"dependencies[{i}] = {dep_name} = {dep_value}")
+            # 添加计算过程
+            calculation_chain.append("↓ 执行计算函数 ↓")
+            calculation_chain.append(f"result = {param.value}")
 
-                    # 添加计算过程
-                    calculation_chain.append("↓ 执行计算函数 ↓")
-                    calculation_chain.append(f"result = {param.value}")
+            param_info['calculation_chain'] = calculation_chain
+        except Exception as e:
+            param_info['calculation_error'] = str(e)
 
-                    param_info['calculation_chain'] = calculation_chain
-                except Exception as e:
-                    param_info['calculation_error'] = str(e)
+    return param_info
 
-            dependencies_info.append(param_info)
+def get_dependency_statistics():
+    """统计计算图的参数数量、依赖参数、计算参数和计算出错的参数"""
+    stats = {'total_params': 0, 'params_with_deps': 0, 'params_with_calc': 0, 'calculation_errors': 0}
+    for node in graph.nodes.values():
+        for param in node.parameters:
+            stats['total_params'] += 1
+            stats['params_with_deps'] += bool(param.dependencies)
+            stats['params_with_calc'] += bool(param.calculation_func)
+            stats['calculation_errors'] += bool(getattr(param, '_calculation_traceback', None))
+    return stats
+
+def format_dependency_statistics(stats):
+    """格式化计算图统计信息"""
+    return dbc.Alert([
+        html.H6("📊 计算图统计分析", className="mb-3"),
+        dbc.Row([
+            dbc.Col([
+                html.P(f"📈 总参数数量: {stats['total_params']}", className="mb-1"),
+                html.P(f"🔗 依赖参数: {stats['params_with_deps']}", className="mb-1"),
+                html.P(f"⚙️ 计算参数: {stats['params_with_calc']}", className="mb-0"),
+            ], width=6),
+            dbc.Col([
+                html.P(f"❌ 计算错误: {stats['calculation_errors']}", className="mb-1"),
+            ], width=6),
+        ]),
+
+    ], color="info", className="mb-3")
+
+def format_param_dependency_card(param_info):
+    """格式化单个参数的依赖关系卡片，包括计算过程和结果"""
+    param_card_items = []
+
+    # 参数基本信息（增强版）
+    confidence_color = "success" if param_info['param_confidence'] >= AppConstants.CONFIDENCE_HIGH_THRESHOLD else "warning" if param_info['param_confidence'] >= AppConstants.CONFIDENCE_MEDIUM_THRESHOLD else "danger"
+    param_card_items.append(
+        html.Div([
+            html.Div([
+                html.Strong(f"{param_info['param_name']}", className="me-2"),
+
+                dbc.Badge(f"置信度 {param_info['param_confidence']:.1%}", 
+                        color=confidence_color, className="me-2"),
+            ], className="d-flex align-items-center mb-2"),
+            html.P([
+                html.Code(f"{param_info['param_value']} {param_info['param_unit']}", className="me-2"),
+                html.Small(param_info['param_description'], className="text-muted")
+            ], className="mb-2")
+        ])
+    )
 
-    return dependencies_info
+    # 计算过程展示
+    if param_info['has_calculation']:
+        calc_details = []
+
+        # 计算函数代码
+        calc_details.append(
+            dbc.Accordion([
+                dbc.AccordionItem([
+                    html.Pre(param_info['calculation_func'] or "无计算函数", 
+                           className="code-block")
+                ], title="📝 计算函数代码")
+            ], start_collapsed=True, className="mb-2")
+        )
 
-def format_dependencies_display(dependencies_info):
-    """格式化依赖关系显示，包括计算过程和结果"""
-    if not dependencies_info:
-        return [html.P("暂无参数依赖关系", className="text-muted")]
+        # 计算链条展示
+        if param_info['calculation_chain']:
+            chain_items = []
+            for step in param_info['calculation_chain']:
+                if "dependencies[" in step:
+                    chain_items.append(html.Li(step, className="text-info"))
+                elif "执行计算函数" in step:
+                    chain_items.append(html.Li(step, className="text-warning fw-bold"))
+                else:
+                    chain_items.append(html.Li(step, className="text-success fw-bold"))
 
-    display_components = []
-
-    # 增强的统计信息
-    total_params = len(dependencies_info)
-    params_with_deps = sum(1 for p in dependencies_info if p['dependencies'])
-    params_with_calc = sum(1 for p in dependencies_info if p['has_calculation'])
-    calculation_errors = sum(1 for p in dependencies_info if p['calculation_error'])
-
-    display_components.append(
-        dbc.Alert([
-            html.H6("📊 计算图统计分析", className="mb-3"),
-            dbc.Row([
-                dbc.Col([
-                    html.P(f"📈 总参数数量: {total_params}", className="mb-1"),
-                    html.P(f"🔗 依赖参数: {params_with_deps}", className="mb-1"),
-                    html.P(f"⚙️ 计算参数: {params_with_calc}", className="mb-0"),
-                ], width=6),
-                dbc.Col([
-                    html.P(f"❌ 计算错误: {calculation_errors}", className="mb-1"),
-                ], width=6),
-            ]),
-
-        ], color="info", className="mb-3")
-    )
+            calc_details.append(
+                html.Div([
+                    html.H6("🔄 计算执行链条", className="mb-2"),
+                    html.Ol(chain_items, className="mb-2")
+                ])
+            )
 
-    # 按节点分组显示，增加更多细节
-    nodes_dict = {}
-    for param_info in dependencies_info:
-        node_name = param_info['node_name']
-        if node_name not in nodes_dict:
-            nodes_dict[node_name] = []
-        nodes_dict[node_name].append(param_info)
+        # 计算错误展示
+        if param_info['calculation_error']:
+            calc_details.append(
+                dbc.Alert([
+                    html.H6("❌ 计算错误", className="mb-2"),
+                    html.Code(param_info['calculation_error'])
+                ], color="danger", className="mb-2")
+            )
 
-    for node_name, params in nodes_dict.items():
-        node_card_content = []
+        param_card_items.append(
+            dbc.Card([
+                dbc.CardHeader("⚙️ 计算详情"),
+                dbc.CardBody(calc_details)
+            ], className="mb-2", outline=True, color="light")
+        )
 
-        for param_info in params:
-            param_card_items = []
+    # 依赖关系展示（增强版）
+    if param_info['dependencies']:
+        deps_details = []
+        for dep in param_info['dependencies']:
+            strength_color = {
+                "计算参数": "success",
+                "输入参数": "secondary", 
+                "正常": "info"
+            }.get(dep['dependency_strength'], "info")
+
+            deps_details.append(
+                html.Li([
+                    html.Strong(f"{dep['node_name']}.{dep['param_name']}"),
+                    f" = {dep['param_value']} {dep['param_unit']} ",
+                    dbc.Badge(dep['dependency_strength'], color=strength_color, className="ms-2")
+                ], className="mb-2")
+            )
 
-            # 参数基本信息（增强版）
-            confidence_color = "success" if param_info['param_confidence'] >= AppConstants.CONFIDENCE_HIGH_THRESHOLD else "warning" if param_info['param_confidence'] >= AppConstants.CONFIDENCE_MEDIUM_THRESHOLD else "danger"
-            param_card_items.append(
-                html.Div([
-                    html.Div([
-                        html.Strong(f"{param_info['param_name']}", className="me-2"),
+        param_card_items.append(
+            html.Div([
+                html.H6("⬅️ 输入依赖", className="mb-2 text-danger"),
+                html.Ul(deps_details)
+            ], className="mb-2")
+        )
 
-                        dbc.Badge(f"置信度 {param_info['param_confidence']:.1%}", 
-                                color=confidence_color, className="me-2"),
-                    ], className="d-flex align-items-center mb-2"),
-                    html.P([
-                        html.Code(f"{param_info['param_value']} {param_info['param_unit']}", className="me-2"),
-                        html.Small(param_info['param_description'], className="text-muted")
-                    ], className="mb-2")
-                ])
+    # 被依赖关系展示（增强版）
+    if param_info['dependents']:
+        dependents_details = []
+        for dep in param_info['dependents']:
+            calc_badge = dbc.Badge("计算", color="success") if dep['has_calculation'] else dbc.Badge("直接", color="secondary")
+            dependents_details.append(
+                html.Li([
+                    html.Strong(f"{dep['node_name']}.{dep['param_name']}"),
+                    f" = {dep['param_value']} {dep['param_unit']} ",
+                    calc_badge
+                ], className="mb-1")
             )
 
-            # 计算过程展示（新增）
-            if param_info['has_calculation']:
-                calc_details = []
-
-                # 计算函数代码
-                calc_details.append(
-                    dbc.Accordion([
-                        dbc.AccordionItem([
-                            html.Pre(param_info['calculation_func'] or "无计算函数", 
-                                   className="code-block")
-                        ], title="📝 计算函数代码")
-                    ], start_collapsed=True, className="mb-2")
-                )
-
-                # 计算链条展示
-                if param_info['calculation_chain']:
-                    chain_items = []
-                    for step in param_info['calculation_chain']:
-                        if "dependencies[" in step:
-                            chain_items.append(html.Li(step, className="text-info"))
-                        elif "执行计算函数" in step:
-                            chain_items.append(html.Li(step, className="text-warning fw-bold"))
-                        else:
-                            chain_items.append(html.Li(step, className="text-success fw-bold"))
-
-                    calc_details.append(
-                        html.Div([
-                            html.H6("🔄 计算执行链条", className="mb-2"),
-                            html.Ol(chain_items, className="mb-2")
-                        ])
-                    )
+        param_card_items.append(
+            html.Div([
+                html.H6("➡️ 输出影响", className="mb-2 text-success"),
+                html.Ul(dependents_details)
+            ], className="mb-2")
+        )
 
-                # 计算错误展示
-                if param_info['calculation_error']:
-                    calc_details.append(
-                        dbc.Alert([
-                            html.H6("❌ 计算错误", className="mb-2"),
-                            html.Code(param_info['calculation_error'])
-                        ], color="danger", className="mb-2")
-                    )
+    # 独立参数标识
+    if not param_info['dependencies'] and not param_info['dependents']:
+        param_card_items.append(
+            dbc.Alert("🔸 独立参数（无依赖关系）", color="light", className="mb-2")
+        )
 
-                param_card_items.append(
-                    dbc.Card([
-                        dbc.CardHeader("⚙️ 计算详情"),
-                        dbc.CardBody(calc_details)
-                    ], className="mb-2", outline=True, color="light")
-                )
+    return html.Div(param_card_items, className="border-start border-4 border-primary ps-3 mb-4 param-card-container")
 
-            # 依赖关系展示（增强版）
-            if param_info['dependencies']:
-                deps_details = []
-                for dep in param_info['dependencies']:
-                    strength_color = {
-                        "计算参数": "success",
-                        "输入参数": "secondary", 
-                        "正常": "info"
-                    }.get(dep['dependency_strength'], "info")
-
-                    deps_details.append(
-                        html.Li([
-                            html.Strong(f"{dep['node_name']}.{dep['param_name']}"),
-                            f" = {dep['param_value']} {dep['param_unit']} ",
-                            dbc.Badge(dep['dependency_strength'], color=strength_color, className="ms-2")
-                        ], className="mb-2")
-                    )
+def format_node_dependency_page(node_id, page):
+    """格式化一个节点的一页参数依赖关系（页码从1开始）"""
+    node = graph.nodes.get(node_id)
+    if node is None:
+        return [html.P("节点不存在", className="text-muted")]
 
-                param_card_items.append(
-                    html.Div([
-                        html.H6("⬅️ 输入依赖", className="mb-2 text-danger"),
-                        html.Ul(deps_details)
-                    ], className="mb-2")
-                )
+    page_size = AppConstants.DEPENDENCY_PANEL_PAGE_SIZE
+    start = (max(page or 1, 1) - 1) * page_size
+    locations = parameter_locations()
+    return [
+        format_param_dependency_card(get_parameter_dependency_info(node_id, node, param, locations))
+        for param in node.parameters[start:start + page_size]
+    ]
 
-            # 被依赖关系展示（增强版）
-            if param_info['dependents']:
-                dependents_details = []
-                for dep in param_info['dependents']:
-                    calc_badge = dbc.Badge("计算", color="success") if dep['has_calculation'] else dbc.Badge("直接", color="secondary")
-                    dependents_details.append(
-                        html.Li([
-                            html.Strong(f"{dep['node_name']}.{dep['param_name']}"),
-                            f" = {dep['param_value']} {dep['param_unit']} ",
-                            calc_badge
-                        ], className="mb-1")
-                    )
+def format_dependencies_panel(is_open, expanded=None):
+    """格式化依赖关系面板
 
-                param_card_items.append(
-                    html.Div([
-                        html.H6("➡️ 输出影响", className="mb-2 text-success"),
-                        html.Ul(dependents_details)
-                    ], className="mb-2")
-                )
+    面板折叠时只渲染统计信息；展开后每个节点只渲染标题栏，节点的参数详情
+    在点击展开时按页获取（见 toggle_dependency_node_section）。
 
-            # 独立参数标识
-            if not param_info['dependencies'] and not param_info['dependents']:
-                param_card_items.append(
-                    dbc.Alert("🔸 独立参数（无依赖关系）", color="light", className="mb-2")
-                )
+    Args:
+        expanded: 重新渲染前已展开的节点 {node_id: 当前页}，这些节点保持展开并直接渲染当前页
+    """
+    expanded = expanded or {}
+    if not graph.nodes:
+        return [html.P("暂无参数依赖关系", className="text-muted")]
 
-            node_card_content.append(
-                html.Div(param_card_items, className="border-start border-4 border-primary ps-3 mb-4 param-card-container")
-            )
+    display_components = [format_dependency_statistics(get_dependency_statistics())]
+    if not is_open:
+        return display_components
 
+    page_size = AppConstants.DEPENDENCY_PANEL_PAGE_SIZE
+    for node_id, node in graph.nodes.items():
+        if not node.parameters:
+            continue
+        page_count = (len(node.parameters) + page_size - 1) // page_size
+        node_open = node_id in expanded
+        active_page = min(max(expanded.get(node_id) or 1, 1), page_count)
         display_components.append(
             dbc.Card([
-                dbc.CardHeader([
-                    html.H5([
-                        "📦 ", node_name,
-                        dbc.Badge(f"{len(params)} 参数", color="info", className="ms-2")
-                    ], className="mb-0")
-                ]),
-                dbc.CardBody(node_card_content)
+                dbc.CardHeader(
+                    html.Div(
+                        html.H5([
+                            "📦 ", node.name,
+                            dbc.Badge(f"{len(node.parameters)} 参数", color="info", className="ms-2")
+                        ], className="mb-0"),
+                        id={"type": "dependency-node-toggle", "node": node_id},
+                        n_clicks=0,
+                        className="dependency-node-header",
+                        title="展开/折叠"
+                    )
+                ),
+                dbc.Collapse(
+                    dbc.CardBody([
+                        html.Div(
+                            format_node_dependency_page(node_id, active_page) if node_open else None,
+                            id={"type": "dependency-node-content", "node": node_id}
+                        ),
+                        dbc.Pagination(
+                            id={"type": "dependency-node-page", "node": node_id},
+                            max_value=page_count,
+                            active_page=active_page,
+                            size="sm",
+                            fully_expanded=False,
+                            className="mb-0",
+                            style={} if page_count > 1 else {"display": "none"}
+                        )
+                    ]),
+                    id={"type": "dependency-node-collapse", "node": node_id},
+                    is_open=node_open
+                )
             ], className="mb-3")
         )
 
     return display_components
 
+# 各计算图依赖关系面板最近一次渲染时的 (计算图版本, 面板是否展开)，未变化时不重复渲染
+DEPENDENCY_PANEL_RENDERED = weakref.WeakKeyDictionary()
+
+# 重新渲染依赖关系面板的回调都带上各节点的展开状态和页码（每个节点只上传一个布尔值和页码）
+DEPENDENCY_NODE_STATES = (
+    State({"type": "dependency-node-collapse", "node": ALL}, "is_open"),
+    State({"type": "dependency-node-page", "node": ALL}, "active_page"),
+)
+
+def expanded_dependency_nodes():
+    """从当前回调的 DEPENDENCY_NODE_STATES 中取出已展开的节点 {node_id: 当前页}"""
+    open_nodes, pages = set(), {}
+    for entry in ctx.states_list:
+        if not isinstance(entry, list):
+            continue
+        for item in entry:
+            kind = item["id"].get("type")
+            if kind == "dependency-node-collapse" and item.get("value"):
+                open_nodes.add(item["id"]["node"])
+            elif kind == "dependency-node-page":
+                pages[item["id"]["node"]] = item.get("value")
+    return {node_id: pages.get(node_id) for node_id in open_nodes}
+
+def update_dependencies_panel(is_open, force=False):
+    """重新渲染依赖关系面板，保持已展开节点的状态；计算图和面板状态都未变化时返回 no_update"""
+    current_graph = get_graph()
+    key = (current_graph.version, bool(is_open))
+    if not force and DEPENDENCY_PANEL_RENDERED.get(current_graph) == key:
+        return dash.no_update
+    DEPENDENCY_PANEL_RENDERED[current_graph] = key
+    return format_dependencies_panel(is_open, expanded_dependency_nodes())
+
 
 
 # =============== 增强的依赖关系和计算流程显示回调函数 ===============
@@ -2212,14 +3904,16 @@ def format_dependencies_display(dependencies_info):
 # 初始化依赖关系显示
 @callback(
     Output("dependencies-display", "children"),
-    Input("canvas-container", "children"),
+    Input("canvas-events", "data"),
+    State("dependencies-collapse", "is_open"),
+    *DEPENDENCY_NODE_STATES,
     prevent_initial_call=False
 )
-def initialize_dependencies_display(canvas_children):
+def initialize_dependencies_display(canvas_events, is_open, *node_states):
     """初始化依赖关系显示"""
     try:
-        dependencies_info = get_all_parameter_dependencies()
-        return format_dependencies_display(dependencies_info)
+        # 页面加载时的首次调用必须渲染，之后画布事件只在计算图变化后重新渲染
+        return update_dependencies_panel(is_open, force=ctx.triggered_id is None)
     except Exception as e:
         return [
             dbc.Alert([
@@ -2234,20 +3928,17 @@ def initialize_dependencies_display(canvas_children):
 @callback(
     Output("dependencies-display", "children", allow_duplicate=True),
     Input("refresh-dependencies-btn", "n_clicks"),
+    State("dependencies-collapse", "is_open"),
+    *DEPENDENCY_NODE_STATES,
     prevent_initial_call=True
 )
-def refresh_dependencies_display(n_clicks):
+def refresh_dependencies_display(n_clicks, is_open, *node_states):
     """手动刷新依赖关系显示面板"""
     if not n_clicks:
         raise dash.exceptions.PreventUpdate
 
     try:
-        dependencies_info = get_all_parameter_dependencies()
-
-        # 刷新依赖关系显示
-        deps_display = format_dependencies_display(dependencies_info)
-
-        return deps_display
+        return update_dependencies_panel(is_open, force=True)
 
     except Exception as e:
         error_alert = [
@@ -2262,17 +3953,14 @@ def refresh_dependencies_display(n_clicks):
 @callback(
     Output("dependencies-display", "children", allow_duplicate=True),
     Input("node-data", "data"),
+    State("dependencies-collapse", "is_open"),
+    *DEPENDENCY_NODE_STATES,
     prevent_initial_call=True
 )
-def auto_update_dependencies_display_on_change(node_data):
+def auto_update_dependencies_display_on_change(node_data, is_open, *node_states):
     """当节点或参数发生变化时自动更新依赖关系显示"""
     try:
-        dependencies_info = get_all_parameter_dependencies()
-
-        # 更新依赖关系显示
-        deps_display = format_dependencies_display(dependencies_info)
-
-        return deps_display
+        return update_dependencies_panel(is_open)
 
     except Exception as e:
         error_alert = [
@@ -2283,45 +3971,38 @@ def auto_update_dependencies_display_on_change(node_data):
         ]
         return error_alert
 
-def get_arrow_connections_data():
-    """获取用于绘制箭头的连接数据"""
-    connections = []
-
-    if not graph.nodes:
-        return connections
+# 展开/折叠依赖关系面板时切换完整视图和仅统计视图
+@callback(
+    Output("dependencies-display", "children", allow_duplicate=True),
+    Input("dependencies-collapse", "is_open"),
+    prevent_initial_call=True
+)
+def render_dependencies_display_on_toggle(is_open):
+    """面板展开时渲染各节点标题栏，折叠时只保留统计信息"""
+    return update_dependencies_panel(is_open)
 
-    # 遍历所有节点和参数，生成连接数据
-    for node_id, node in graph.nodes.items():
-        for param_idx, param in enumerate(node.parameters):
-            # 为每个有依赖的参数创建连接
-            for dep_param in param.dependencies:
-                # 找到依赖参数所在的节点和索引
-                source_node_id = None
-                source_param_idx = None
-
-                for search_node_id, search_node in graph.nodes.items():
-                    for search_param_idx, search_param in enumerate(search_node.parameters):
-                        if search_param is dep_param:
-                            source_node_id = search_node_id
-                            source_param_idx = search_param_idx
-                            break
-                    if source_node_id:
-                        break
-
-                if source_node_id is not None and source_param_idx is not None:
-                    connection = {
-                        'source_pin_id': f"pin-{source_node_id}-{source_param_idx}",
-                        'target_pin_id': f"pin-{node_id}-{param_idx}",
-                        'source_node_id': source_node_id,
-                        'target_node_id': node_id,
-                        'source_param_name': dep_param.name,
-                        'target_param_name': param.name,
-                        'source_node_name': graph.nodes[source_node_id].name,
-                        'target_node_name': graph.nodes[node_id].name
-                    }
-                    connections.append(connection)
+# 依赖关系面板中节点的展开和翻页：只在展开时获取该节点当前页的参数详情
+@callback(
+    Output({"type": "dependency-node-collapse", "node": MATCH}, "is_open"),
+    Output({"type": "dependency-node-content", "node": MATCH}, "children"),
+    Input({"type": "dependency-node-toggle", "node": MATCH}, "n_clicks"),
+    Input({"type": "dependency-node-page", "node": MATCH}, "active_page"),
+    State({"type": "dependency-node-collapse", "node": MATCH}, "is_open"),
+    prevent_initial_call=True
+)
+def toggle_dependency_node_section(n_clicks, active_page, is_open):
+    """展开节点时渲染当前页，折叠时丢弃已渲染的详情"""
+    node_id = ctx.triggered_id["node"]
+    if ctx.triggered_id["type"] == "dependency-node-toggle":
+        if not n_clicks:
+            raise dash.exceptions.PreventUpdate
+        if is_open:
+            return False, []
+        return True, format_node_dependency_page(node_id, active_page)
 
-    return connections
+    if not is_open:
+        raise dash.exceptions.PreventUpdate
+    return dash.no_update, format_node_dependency_page(node_id, active_page)
 
 # 下拉菜单z-index管理已移动到 clientside_callbacks.py
 
@@ -2443,14 +4124,10 @@ def toggle_theme(n_clicks):
 # 节点编辑相关回调函数
 
 # 打开节点编辑模态窗口
-@callback(
-    Output("node-edit-modal", "is_open"),
-    Output("node-edit-title", "children"),
-    Output("node-edit-name", "value"),
-    Output("node-edit-description", "value"),
-    Output("node-edit-data", "data"),
-    Input({"type": "edit-node", "node": ALL}, "n_clicks"),
+@event_bus_callback(
+    Input({"type": "edit-node", "node": MATCH}, "n_clicks"),
     State("node-edit-modal", "is_open"),
+    outputs=NODE_EDIT_MODAL_OUTPUTS,
     prevent_initial_call=True
 )
 def open_node_edit_modal(edit_clicks, is_open):
@@ -2529,13 +4206,14 @@ def save_node_changes(save_clicks, node_name, node_description, edit_data, curre
                 return True, dash.no_update, add_app_message(current_messages, error_msg)
 
         # 更新节点信息
-        node.name = node_name.strip()
-        node.description = node_description or ""
+        with graph.mutation(f"编辑节点 {old_name}"):
+            node.name = node_name.strip()
+            node.description = node_description or ""
 
         # 关闭模态窗口并更新界面
         success_message = f"节点 '{old_name}' 已更新为 '{node.name}'"
         success_msg = create_message("node_save_success", success_message, "success")
-        return False, update_canvas(), add_app_message(current_messages, success_msg)
+        return False, refresh_canvas(), add_app_message(current_messages, success_msg)
 
     except Exception as e:
         error_msg = create_message("node_save_error", f"错误: {str(e)}", "error")
@@ -2595,25 +4273,26 @@ def create_new_node(save_clicks, node_name, node_description, current_messages):
                 error_msg = create_message("node_create_error", f"节点名称 '{node_name}' 已存在，请使用不同的名称", "error")
                 return True, dash.no_update, add_app_message(current_messages, error_msg)
 
-        # 创建新节点
-        from models import Node
-        node_id = graph.get_next_node_id()
-        node = Node(
-            id=node_id,
-            name=node_name,
-            description=node_description or f"节点 {node_name}"
-        )
+        with graph.mutation(f"创建节点 {node_name}"):
+            # 创建新节点
+            from .models import Node
+            node_id = graph.get_next_node_id()
+            node = Node(
+                id=node_id,
+                name=node_name,
+                description=node_description or f"节点 {node_name}"
+            )
 
-        # 添加到计算图
-        graph.add_node(node)
+            # 添加到计算图
+            graph.add_node(node)
 
-        # 使用布局管理器放置节点
-        position = graph.layout_manager.place_node(node.id)
+            # 使用布局管理器放置节点
+            position = graph.layout_manager.place_node(node.id)
 
         # 关闭模态窗口并更新界面
         success_message = f"节点 '{node_name}' 已创建并添加到位置 ({position.row}, {position.col})"
         success_msg = create_message("node_create_success", success_message, "success")
-        return False, update_canvas(), add_app_message(current_messages, success_msg)
+        return False, refresh_canvas(), add_app_message(current_messages, success_msg)
 
     except Exception as e:
         error_msg = create_message("node_create_error", f"错误: {str(e)}", "error")
@@ -2626,11 +4305,10 @@ def create_new_node(save_clicks, node_name, node_description, current_messages):
     Output("remove-column-btn", "disabled"),
     Input("add-column-btn", "n_clicks"),
     Input("remove-column-btn", "n_clicks"),
-    State("canvas-container", "children"),  # 添加状态以获取当前列信息
     State("app-messages", "data"),
     prevent_initial_call=True
 )
-def handle_column_management(add_clicks, remove_clicks, canvas_children, current_messages):
+def handle_column_management(add_clicks, remove_clicks, current_messages):
     """处理手动添加/删除列操作"""
     ctx = dash.callback_context
     if not ctx.triggered:
@@ -2648,16 +4326,18 @@ def handle_column_management(add_clicks, remove_clicks, canvas_children, current
             error_msg = create_message("column_add_error", add_msg, "error")
             return dash.no_update, add_app_message(current_messages, error_msg), not can_remove
 
-        graph.layout_manager.add_column()
+        with graph.mutation("添加列"):
+            graph.layout_manager.add_column()
         success_msg = create_message("column_add_success", f"已添加新列 (当前 {graph.layout_manager.cols} 列)", "success")
-        return update_canvas(), add_app_message(current_messages, success_msg), False
+        return refresh_canvas(), add_app_message(current_messages, success_msg), False
 
     if button_id == "remove-column-btn" and remove_clicks:
         if not can_remove:
             error_msg = create_message("column_remove_error", remove_msg, "error")
             return dash.no_update, add_app_message(current_messages, error_msg), True
 
-        success = graph.layout_manager.remove_column()
+        with graph.mutation("删除列"):
+            success = graph.layout_manager.remove_column()
         if success:
             msg = f"已删除最后一列 (当前 {graph.layout_manager.cols} 列)"
             msg_obj = create_message("column_remove_success", msg, "success")
@@ -2667,17 +4347,17 @@ def handle_column_management(add_clicks, remove_clicks, canvas_children, current
 
         # 再次检查是否还能继续删除
         can_remove_after, _ = graph.layout_manager.can_remove_column()
-        return update_canvas(), add_app_message(current_messages, msg_obj), not can_remove_after
+        return refresh_canvas(), add_app_message(current_messages, msg_obj), not can_remove_after
 
     raise dash.exceptions.PreventUpdate
 
 # 初始化删除按钮状态
 @callback(
     Output("remove-column-btn", "disabled", allow_duplicate=True),
-    Input("canvas-container", "children"),
-    prevent_initial_call=True
+    Input("canvas-events", "data"),
+    prevent_initial_call="initial_duplicate"
 )
-def update_remove_button_status(canvas_children):
+def update_remove_button_status(canvas_events):
     """更新删除列按钮的禁用状态"""
     # 检查是否可以删除列
     can_remove, _ = graph.layout_manager.can_remove_column()
@@ -2787,6 +4467,7 @@ def clear_calculation_graph(n_clicks, current_messages):
             initial_cols=AppConstants.MIN_LAYOUT_COLUMNS, 
             initial_rows=AppConstants.DEFAULT_INITIAL_ROWS
         ))
+        new_graph.inherit_history(get_graph(), "清空计算图")
         set_graph(new_graph)
         graph = get_graph()
 
@@ -2794,7 +4475,7 @@ def clear_calculation_graph(n_clicks, current_messages):
         graph.recently_updated_params.clear()
 
         # 更新画布显示
-        updated_canvas = update_canvas()
+        updated_canvas = refresh_canvas()
 
         success_msg = create_message("clear_graph_success", "计算图已清空，可以重新开始构建", "success")
         return updated_canvas, add_app_message(current_messages, success_msg)
@@ -2811,11 +4492,12 @@ def clear_calculation_graph(n_clicks, current_messages):
     Output("current-param-type", "data"),
     Input("x-param-select-btn", "n_clicks"),
     Input("y-param-select-btn", "n_clicks"),
+    Input("x2-param-select-btn", "n_clicks"),
     Input("param-select-cancel", "n_clicks"),
     State("param-select-modal", "is_open"),
     prevent_initial_call=True
 )
-def toggle_param_select_modal(x_clicks, y_clicks, cancel_clicks, is_open):
+def toggle_param_select_modal(x_clicks, y_clicks, x2_clicks, cancel_clicks, is_open):
     """控制参数选择弹窗的打开和关闭"""
     button_id = ctx.triggered[0]['prop_id'].split('.')[0] if ctx.triggered else None
 
@@ -2823,6 +4505,8 @@ def toggle_param_select_modal(x_clicks, y_clicks, cancel_clicks, is_open):
         return True, "x"
     elif button_id == "y-param-select-btn":
         return True, "y"
+    elif button_id == "x2-param-select-btn":
+        return True, "x2"
     elif button_id == "param-select-cancel":
         return False, dash.no_update
 
@@ -2840,28 +4524,39 @@ def update_param_type_display(current_type):
         return "🔸 选择 X 轴参数"
     elif current_type == "y":
         return "🔹 选择 Y 轴参数"
+    elif current_type == "x2":
+        return "🔸 选择第二输入参数"
     else:
         return "📊 选择绘图参数"
 
 # 更新参数列表
 @callback(
     Output("param-list-container", "children"),
+    Output("param-search-page", "max_value"),
+    Output("param-search-page", "active_page"),
     Input("param-search", "value"),
-    Input("canvas-container", "children"),
+    Input("param-search-page", "active_page"),
+    Input("param-select-modal", "is_open"),
+    Input("node-data", "data"),
     State("selected-x-param", "data"),
     State("selected-y-param", "data"),
     State("current-param-type", "data"),
+    State("selected-x2-param", "data"),
     prevent_initial_call=False
 )
-def update_param_list(search_value, canvas_children, current_x, current_y, param_type):
-    """更新参数列表显示"""
-    try:
-        params = get_plotting_parameters()
+def update_param_list(search_value, active_page, is_open, node_data, current_x, current_y, param_type, current_x2=None):
+    """更新参数列表显示：从搜索索引中查询并按得分排序，每次只渲染一页
+
+    选择器打开时按计算图的当前状态查询；打开期间节点数据变化（node-data）时刷新。
+    """
+    if not is_open:
+        raise dash.exceptions.PreventUpdate  # 选择器关闭时无需响应计算图变化
 
-        # 过滤搜索结果
-        if search_value:
-            search_lower = search_value.lower()
-            params = [p for p in params if search_lower in p['label'].lower()]
+    try:
+        # 搜索条件变化或重新打开选择器时回到第一页
+        if ctx.triggered_id != "param-search-page":
+            active_page = 1
+        params = search_index_for(get_graph()).search(search_value)
 
         if not params:
             return [
@@ -2870,10 +4565,15 @@ def update_param_list(search_value, canvas_children, current_x, current_y, param
                     color="info",
                     className="text-center"
                 )
-            ]
+            ], 1, 1
+
+        page_size = AppConstants.PARAM_SEARCH_PAGE_SIZE
+        page_count = (len(params) + page_size - 1) // page_size
+        active_page = min(max(active_page or 1, 1), page_count)
+        params = params[(active_page - 1) * page_size:active_page * page_size]
 
         # 确定当前应该高亮的参数
-        currently_selected = current_x if param_type == "x" else current_y
+        currently_selected = {"x": current_x, "x2": current_x2}.get(param_type, current_y)
 
         # 创建参数选择项
         param_items = []
@@ -2916,7 +4616,7 @@ def update_param_list(search_value, canvas_children, current_x, current_y, param
                 ], color=card_color, className="mb-2 param-card-clickable")
             )
 
-        return param_items
+        return param_items, page_count, active_page
 
     except Exception as e:
         return [
@@ -2924,7 +4624,7 @@ def update_param_list(search_value, canvas_children, current_x, current_y, param
                 f"加载参数失败: {str(e)}",
                 color="danger"
             )
-        ]
+        ], dash.no_update, dash.no_update
 
 # 处理参数选择
 @callback(
@@ -2932,6 +4632,8 @@ def update_param_list(search_value, canvas_children, current_x, current_y, param
     Output("selected-y-param", "data"),
     Output("x-param-display", "value"),
     Output("y-param-display", "value"),
+    Output("selected-x2-param", "data"),
+    Output("x2-param-display", "value"),
     Output("param-select-modal", "is_open", allow_duplicate=True),
     Input({"type": "param-item-btn", "index": ALL}, "n_clicks"),
     State("current-param-type", "data"),
@@ -2951,22 +4653,23 @@ def handle_param_selection(clicks_list, param_type, current_x, current_y):
         selected_param_value = button_info['index']
         
         try:
-            params = get_plotting_parameters()
-            selected_param = next((p for p in params if p['value'] == selected_param_value), None)
+            selected_param = search_index_for(get_graph()).get(selected_param_value)
 
             if not selected_param:
                 raise dash.exceptions.PreventUpdate
 
             # 直接更新参数选择并关闭模态框
             if param_type == "x":
-                return selected_param_value, current_y, selected_param['label'], dash.no_update, False
+                return selected_param_value, current_y, selected_param['label'], dash.no_update, dash.no_update, dash.no_update, False
+            elif param_type == "x2":
+                return dash.no_update, dash.no_update, dash.no_update, dash.no_update, selected_param_value, selected_param['label'], False
             else:
-                return current_x, selected_param_value, dash.no_update, selected_param['label'], False
+                return current_x, selected_param_value, dash.no_update, selected_param['label'], dash.no_update, dash.no_update, False
 
         except Exception:
             raise dash.exceptions.PreventUpdate
 
-    return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
+    return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
 
 
 # 教程模态窗口回调函数
@@ -2998,10 +4701,12 @@ def tutorial_load_example(n_clicks, current_messages):
     
     try:
         # 创建示例计算图
+        previous_graph = get_graph()
         result = create_example_soc_graph()
+        result["graph"].inherit_history(previous_graph, "加载示例计算图")
         
         # 更新画布显示
-        updated_canvas = update_canvas()
+        updated_canvas = refresh_canvas()
         
         success_message = (
             f"已从教程加载多核SoC示例计算图："
@@ -3030,6 +4735,7 @@ def main():
     parser.add_argument('--debug', action='store_true', help='启用调试模式(会有定时重载检查)')
     args = parser.parse_args()
 
+    start_autosave()
     app.run(debug=args.debug, host="0.0.0.0", port=args.port)
 
 if __name__ == "__main__":
@@ -13,8 +13,8 @@ class AppConstants:
     MAX_RECENT_MESSAGES = 19        # 保持最近消息数量
     
     # ============ 数据处理限制 ============
-    MAX_DATA_POINTS = 1000          # 敏感性分析最大数据点数
-    MAX_CHART_DATA_POINTS = 1000    # 图表显示最大数据点数
+    MAX_DATA_POINTS = 50000         # 敏感性分析最大数据点数
+    MAX_CHART_DATA_POINTS = 1000    # 图表显示最大数据点数（未知图表宽度时的降采样目标）
     
     # ============ 布局管理 ============
     DEFAULT_INITIAL_COLUMNS = 4     # 默认初始列数
@@ -30,6 +30,23 @@ class AppConstants:
     SENSITIVITY_END_MULTIPLIER = 1.5     # 敏感性分析结束值倍数
     SENSITIVITY_DEFAULT_START = 0        # 敏感性分析默认起始值
     SENSITIVITY_DEFAULT_END = 100        # 敏感性分析默认结束值
+    SENSITIVITY_ADAPTIVE_INITIAL_POINTS = 33    # 自适应采样初始均匀网格点数
+    SENSITIVITY_ADAPTIVE_TOLERANCE = 0.002      # 自适应采样误差阈值（相对于Y值范围）
+    SENSITIVITY_ADAPTIVE_BUDGET_RATIO = 0.25    # 自适应采样计算次数上限占均匀采样点数的比例
+
+    # ============ 蒙特卡洛分析 ============
+    MONTE_CARLO_SAMPLES = 100000                 # 蒙特卡洛分析的样本数
+    MONTE_CARLO_CONFIDENCE_SPREAD = 0.5          # 置信度为0时输入分布的相对标准差（随置信度线性减小）
+    MONTE_CARLO_HISTOGRAM_BINS = 60              # 输出分布直方图的分箱数
+    MONTE_CARLO_PERCENTILES = (5, 25, 50, 75, 95)  # 报告的输出分位数
+
+    # ============ 龙卷风图 ============
+    TORNADO_DEFAULT_PERTURBATION = 10    # 默认扰动幅度（±%）
+    TORNADO_MAX_BARS = 30                # 龙卷风图最多显示的输入数（按影响从大到小）
+    
+    # ============ 局部导数 ============
+    DERIVATIVE_FD_RELATIVE_STEP = 1e-6   # 有限差分回退的相对步长（参数值为0时为绝对步长）
+    DERIVATIVE_FD_QUANTIZED_RELATIVE_STEP = 1e-2  # 计算结果为整数时有限差分的相对步长
     
     # ============ 置信度阈值 ============
     CONFIDENCE_HIGH_THRESHOLD = 0.8      # 高置信度阈值
@@ -41,6 +58,10 @@ class AppConstants:
     CHART_MARGIN_RIGHT = 40              # 图表右边距
     CHART_MARGIN_TOP = 60                # 图表上边距
     CHART_MARGIN_BOTTOM = 40             # 图表下边距
+    PLOT_MAX_CUMULATIVE_TRACES = 50      # 累计绘图最多叠加的曲线数
+    PLOT_MAX_STORED_TRACES = 100         # 每个会话在服务端保存的曲线数上限
+    PLOT_WEBGL_THRESHOLD = 2000          # 曲线点数超过该值时改用 WebGL(Scattergl) 并降采样
+    PLOT_POINTS_PER_PIXEL = 2            # 降采样时每像素宽度保留的点数
     
     # ============ 参数Pin点样式数值 ============
     PARAM_PIN_SIZE = 8                   # 参数连接点大小(px)
@@ -54,6 +75,13 @@ class AppConstants:
     # ============ 空状态容器配置 ============
     EMPTY_STATE_MIN_HEIGHT = 400         # 空状态容器最小高度(px)
     
+    # ============ 依赖关系面板 ============
+    DEPENDENCY_PANEL_PAGE_SIZE = 10      # 依赖关系面板中每个节点每页显示的参数数量
+    
+    # ============ 参数搜索 ============
+    PARAM_SEARCH_PAGE_SIZE = 20          # 绘图参数选择器每页显示的参数数量
+    PARAM_SEARCH_FUZZY_MIN_LENGTH = 3    # 查询词至少多长时才启用近似匹配
+    
     # ============ Z-Index 层级 ============
     ARROWS_OVERLAY_Z_INDEX = 10          # 箭头覆盖层z-index
     DROPDOWN_MENU_Z_INDEX = 99999        # 下拉菜单z-index
@@ -85,4 +113,34 @@ class PerformanceConstants:
     
     # ============ 动画时间 ============
     PARAM_HIGHLIGHT_DURATION_S = 2       # 参数高亮持续时间(秒)
-    TRANSITION_DURATION_MS = 300         # 通用过渡动画时间(毫秒)
\ No newline at end of file
+    TRANSITION_DURATION_MS = 300         # 通用过渡动画时间(毫秒)
+    
+    # ============ 渲染 ============
+    LEAN_RENDER_PARAM_THRESHOLD = 300    # 参数总数超过该值时画布使用精简渲染模式
+    VIRTUAL_CANVAS_NODE_THRESHOLD = 150  # 节点数超过该值时画布只渲染视口附近的节点
+    VIRTUAL_CANVAS_OVERSCAN_PX = 800     # 视口上下额外预渲染的高度(像素)
+    VIRTUAL_CANVAS_INITIAL_HEIGHT_PX = 1200  # 尚未收到客户端视口时假定的视口高度(像素)
+    NODE_HEADER_HEIGHT_PX = 48           # 估算占位块高度：节点标题栏高度(像素)
+    PARAM_ROW_HEIGHT_PX = 34             # 估算占位块高度：每行参数高度(像素)
+    NODE_MARGIN_PX = 16                  # 估算占位块高度：节点上下外边距之和(像素)
+    EDGE_LOG_SIZE = 64                   # 箭头边模型保留的变更版本数，落后更多的客户端收到完整数据
+    
+    # ============ 后台任务 ============
+    JOB_WORKERS = 2                      # 后台任务工作线程数（同时运行的任务数上限）
+    JOB_MAX_QUEUED = 32                  # 全局排队任务数上限，超过时拒绝提交
+    JOB_MAX_QUEUED_PER_SESSION = 4       # 单个会话排队任务数上限
+    JOB_INTERACTIVE_WAIT_S = 5           # 交互操作进行时后台任务在检查点最长暂停时间(秒)
+    SWEEP_COARSE_POINTS = 64             # 渐进扫描第一轮（最粗网格）的点数
+    SWEEP_STREAM_CHUNK_POINTS = 5000     # 每次轮询最多推送到图表的中间结果点数
+    SWEEP_CACHE_MAX_ENTRIES = 64         # 扫描结果缓存的条目数上限（所有会话共享）
+    SWEEP_CACHE_MAX_POINTS = 2000000     # 扫描结果缓存保存的数据点总数上限
+    BATCH_PARALLEL_WORKERS = 4           # 批量计算（二维扫描）不能向量化时并行计算的进程数上限
+    BATCH_PARALLEL_MIN_POINTS = 2000     # 批量计算的点数达到此值才使用多进程并行
+    BATCH_PARALLEL_CHUNK_POINTS = 500    # 多进程并行时每块的点数
+    JOB_POLL_INTERVAL_MS = 300           # 浏览器轮询后台任务进度的间隔(毫秒)
+    JOB_RESULT_RETENTION_S = 600         # 已结束但未被取走的任务保留时间(秒)
+    
+    # ============ 持久化 ============
+    JOURNAL_COMPACT_THRESHOLD = 200      # 会话日志追加多少行后压缩为快照
+    AUTOSAVE_INTERVAL_S = 2              # 自动保存线程轮询间隔(秒)
+    AUTOSAVE_DEBOUNCE_S = 5              # 计算图停止修改多久后才自动保存(秒)
\ No newline at end of file
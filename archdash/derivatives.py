@@ -0,0 +1,318 @@
+"""前向模式自动微分（对偶数）
+
+把选定输入参数的值换成对偶数 ``Dual(值, 导数向量)``（第 i 个输入的导数向量为第 i 个
+单位向量），按拓扑顺序把下游参数的计算代码各执行一次，每个下游参数就同时得到值和
+对全部选定输入的精确偏导数，不需要像有限差分那样为每个输入多算两遍。
+
+对偶数支持四则运算、乘方、``abs``、比较（按值比较）等；计算代码调用 ``math`` 函数
+（``float()`` 转换会抛出 TypeError）或结果不是对偶数时，该参数退回中心差分：对它
+依赖的各对偶数参数分别求偏导，再按链式法则乘上依赖参数的导数向量。
+"""
+from __future__ import annotations
+
+import numbers
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .constants import AppConstants
+from .models import CalculationGraph, Parameter
+
+
+class Dual:
+    """对偶数：值 val 与对各输入的导数向量 der"""
+
+    __slots__ = ("val", "der")
+    # 让 numpy 标量与对偶数运算时交给对偶数的反向运算符处理；numpy 函数（如 np.sqrt）则直接报错
+    __array_ufunc__ = None
+
+    def __init__(self, val: float, der: np.ndarray):
+        self.val = val
+        self.der = der
+
+    def _lift(self, other) -> "Dual":
+        if isinstance(other, Dual):
+            return other
+        if isinstance(other, numbers.Real):
+            return Dual(other, np.zeros_like(self.der))
+        return NotImplemented
+
+    def __add__(self, other):
+        other = self._lift(other)
+        if other is NotImplemented:
+            return other
+        return Dual(self.val + other.val, self.der + other.der)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = self._lift(other)
+        if other is NotImplemented:
+            return other
+        return Dual(self.val - other.val, self.der - other.der)
+
+    def __rsub__(self, other):
+        other = self._lift(other)
+        if other is NotImplemented:
+            return other
+        return other - self
+
+    def __mul__(self, other):
+        other = self._lift(other)
+        if other is NotImplemented:
+            return other
+        return Dual(self.val * other.val, self.der * other.val + other.der * self.val)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = self._lift(other)
+        if other is NotImplemented:
+            return other
+        return Dual(self.val / other.val, (self.der * other.val - other.der * self.val) / other.val ** 2)
+
+    def __rtruediv__(self, other):
+        other = self._lift(other)
+        if other is NotImplemented:
+            return other
+        return other / self
+
+    def __floordiv__(self, other):
+        # 分段常数，导数处处为0（间断点除外）
+        other = self._lift(other)
+        if other is NotImplemented:
+            return other
+        return Dual(self.val // other.val, np.zeros_like(self.der))
+
+    def __rfloordiv__(self, other):
+        other = self._lift(other)
+        if other is NotImplemented:
+            return other
+        return other // self
+
+    def __mod__(self, other):
+        # a % b = a - b * floor(a / b)
+        other = self._lift(other)
+        if other is NotImplemented:
+            return other
+        return Dual(self.val % other.val, self.der - other.der * (self.val // other.val))
+
+    def __rmod__(self, other):
+        other = self._lift(other)
+        if other is NotImplemented:
+            return other
+        return other % self
+
+    def __pow__(self, other):
+        if isinstance(other, Dual):
+            value = self.val ** other.val
+            der = other.val * self.val ** (other.val - 1) * self.der if other.val != 0 else np.zeros_like(self.der)
+            if other.der.any():
+                # d(a^b)/db = a^b·ln(a)，a ≤ 0 时没有定义
+                if self.val <= 0:
+                    raise ValueError("底数非正时无法对指数求导")
+                der = der + value * np.log(self.val) * other.der
+            return Dual(value, der)
+        if isinstance(other, numbers.Real):
+            if other == 0:
+                return Dual(self.val ** 0, np.zeros_like(self.der))
+            return Dual(self.val ** other, other * self.val ** (other - 1) * self.der)
+        return NotImplemented
+
+    def __rpow__(self, other):
+        other = self._lift(other)
+        if other is NotImplemented:
+            return other
+        return other ** self
+
+    def __neg__(self):
+        return Dual(-self.val, -self.der)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return -self if self.val < 0 else self
+
+    def _value_of(self, other):
+        return other.val if isinstance(other, Dual) else other
+
+    # 比较按值进行，条件分支选中的那一段照常求导
+    def __eq__(self, other):
+        return self.val == self._value_of(other)
+
+    def __ne__(self, other):
+        return self.val != self._value_of(other)
+
+    def __lt__(self, other):
+        return self.val < self._value_of(other)
+
+    def __le__(self, other):
+        return self.val <= self._value_of(other)
+
+    def __gt__(self, other):
+        return self.val > self._value_of(other)
+
+    def __ge__(self, other):
+        return self.val >= self._value_of(other)
+
+    def __hash__(self):
+        return hash(self.val)
+
+    def __bool__(self):
+        return bool(self.val)
+
+    def __float__(self):
+        # 让 math 函数等需要浮点数的代码失败，由调用方退回有限差分
+        raise TypeError("对偶数不能转换为浮点数")
+
+    def __int__(self):
+        return int(self.val)
+
+    def __round__(self, ndigits=None):
+        return round(self.val, ndigits)
+
+    def __format__(self, format_spec):
+        return format(self.val, format_spec)
+
+    def __repr__(self):
+        return f"Dual({self.val!r}, {self.der!r})"
+
+
+@dataclass
+class LocalDerivative:
+    """参数在当前取值处的值和对各选定输入的偏导数"""
+    value: float
+    gradient: np.ndarray
+    method: str  # "dual"：对偶数精确求导；"finite_difference"：有限差分近似
+
+
+def downstream_order(graph: CalculationGraph, inputs: Sequence[Parameter]) -> List[Parameter]:
+    """依赖选定输入（直接或间接）且会自动计算的参数，依赖在前（拓扑顺序）
+
+    没有计算函数或已断开计算的参数的值不随输入变化，不继续向下游传递。
+    """
+    affected = set()
+    stack = list(inputs)
+    while stack:
+        for dependent in graph._dependents_map.get(stack.pop(), ()):
+            if dependent in affected or dependent in inputs:
+                continue
+            if not dependent.calculation_func or dependent.unlinked:
+                continue
+            affected.add(dependent)
+            stack.append(dependent)
+
+    order: List[Parameter] = []
+    visited = set()
+
+    def visit(param: Parameter) -> None:
+        if param in visited:
+            return
+        visited.add(param)
+        for dep in param.dependencies:
+            if dep in affected:
+                visit(dep)
+        order.append(param)
+
+    for param in affected:
+        visit(param)
+    return order
+
+
+def _run_calculation(param: Parameter):
+    """执行参数的计算代码，失败时返回None
+
+    计算函数是可调用对象时 ``Parameter.calculate`` 不抛出异常而是保留旧值，靠回溯判断是否失败。
+    """
+    try:
+        result = param.calculate()
+    except Exception:
+        return None
+    if callable(param.calculation_func) and param._calculation_traceback is not None:
+        return None
+    return result
+
+
+def _is_finite_number(value) -> bool:
+    return isinstance(value, numbers.Real) and not isinstance(value, bool) and bool(np.isfinite(value))
+
+
+def _dual_evaluate(param: Parameter) -> Optional[Dual]:
+    """以对偶数执行计算代码；不支持对偶数或结果不是有限对偶数时返回None"""
+    with np.errstate(all="ignore"):
+        result = _run_calculation(param)
+    if not isinstance(result, Dual):
+        return None
+    if not _is_finite_number(result.val) or not np.isfinite(result.der).all():
+        return None
+    return result
+
+
+def _finite_difference_step(x: float, quantized: bool) -> float:
+    """差分步长；结果为整数（取整后的量）时用较大步长，避免微小步长恰好跨过取整边界得到极大的差商"""
+    relative = AppConstants.DERIVATIVE_FD_QUANTIZED_RELATIVE_STEP if quantized else AppConstants.DERIVATIVE_FD_RELATIVE_STEP
+    return relative * (abs(x) if x != 0 else 1.0)
+
+
+def _finite_difference(param: Parameter) -> Optional[Dual]:
+    """对偶数计算失败时，用中心差分求参数对各依赖的偏导数，再按链式法则组合成对偶数
+
+    计算期间把依赖参数的对偶数值临时换成普通数值，结束后恢复。
+    """
+    saved = {dep: dep._value for dep in param.dependencies if isinstance(dep._value, Dual)}
+    try:
+        for dep, dual in saved.items():
+            dep._value = dual.val
+        base = _run_calculation(param)
+        if not _is_finite_number(base):
+            return None
+
+        gradient = np.zeros_like(next(iter(saved.values())).der)
+        for dep, dual in saved.items():
+            if not dual.der.any():
+                continue
+            step = _finite_difference_step(dual.val, isinstance(base, numbers.Integral))
+            dep._value = dual.val + step
+            upper = _run_calculation(param)
+            dep._value = dual.val - step
+            lower = _run_calculation(param)
+            dep._value = dual.val
+            if not _is_finite_number(upper) or not _is_finite_number(lower):
+                return None
+            gradient = gradient + (float(upper) - float(lower)) / (2 * step) * dual.der
+        return Dual(float(base), gradient)
+    finally:
+        for dep, dual in saved.items():
+            dep._value = dual
+
+
+def forward_derivatives(graph: CalculationGraph, inputs: Sequence[Parameter]) -> Dict[Parameter, LocalDerivative]:
+    """一次遍历求出所有下游参数对各输入的偏导数
+
+    直接修改参数的值，应在计算图副本上调用。输入参数的值须为有限数值。
+
+    Returns:
+        {下游参数: LocalDerivative}；计算失败的参数及其下游不在结果中
+    """
+    for i, param in enumerate(inputs):
+        seed = np.zeros(len(inputs))
+        seed[i] = 1.0
+        param._value = Dual(float(param._value), seed)
+
+    results: Dict[Parameter, LocalDerivative] = {}
+    failed = set()
+    for param in downstream_order(graph, inputs):
+        if any(dep in failed for dep in param.dependencies):
+            failed.add(param)
+            continue
+        result, method = _dual_evaluate(param), "dual"
+        if result is None:
+            result, method = _finite_difference(param), "finite_difference"
+        if result is None:
+            failed.add(param)
+            continue
+        param._value = result
+        results[param] = LocalDerivative(float(result.val), result.der, method)
+    return results
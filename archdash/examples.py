@@ -1,17 +1,57 @@
+import threading
+from typing import Any, Dict, Optional
+
 from .models import CalculationGraph, Node, Parameter, CanvasLayoutManager, GridPosition
 
+# 进程级共享的示例图模板：只构建一次，各会话拿到的是它的轻量副本
+_EXAMPLE_TEMPLATE: Optional[CalculationGraph] = None
+_EXAMPLE_TEMPLATE_LOCK = threading.Lock()
+
+
+def get_example_template() -> CalculationGraph:
+    """获取示例计算图模板（首次调用时构建）
+
+    模板在所有会话之间共享，只能读取、不可修改；
+    需要可编辑的图时请使用 create_example_soc_graph()。
+    """
+    global _EXAMPLE_TEMPLATE
+    with _EXAMPLE_TEMPLATE_LOCK:
+        if _EXAMPLE_TEMPLATE is None:
+            template = CalculationGraph()
+            template.set_layout_manager(CanvasLayoutManager(initial_cols=3, initial_rows=12))
+            _populate_example_soc_graph(template)
+            _EXAMPLE_TEMPLATE = template
+        return _EXAMPLE_TEMPLATE
+
+
+def _example_graph_stats(graph: CalculationGraph) -> Dict[str, Any]:
+    """统计示例图的节点和参数数量"""
+    nodes_created = len(graph.nodes)
+    total_params = sum(len(node.parameters) for node in graph.nodes.values())
+    calculated_params = sum(
+        sum(1 for param in node.parameters if param.calculation_func)
+        for node in graph.nodes.values()
+    )
+
+    return {
+        "graph": graph,
+        "nodes_created": nodes_created,
+        "total_params": total_params,
+        "calculated_params": calculated_params
+    }
+
+
 def create_example_soc_graph(graph=None):
-    """创建多核SoC示例计算图"""
-    from .session_graph import set_graph, get_graph
-    
+    """创建多核SoC示例计算图
+
+    未传入 graph 时，从共享模板复制一份并设为当前会话的图；
+    传入 graph 时，在该图上重新构建示例内容。
+    """
+    from .session_graph import set_graph
+
     if graph is None:
-        # 新建独立 CalculationGraph 并初始化布局
-        graph = CalculationGraph()  # 每个实例有自己的ID计数器
-        layout_manager = CanvasLayoutManager(initial_cols=3, initial_rows=12)  # 设置为3列布局
-        # 确保布局管理器是干净的
-        layout_manager.reset()
-        graph.set_layout_manager(layout_manager)
-        
+        graph = get_example_template().clone()
+
         # 更新当前会话的图
         set_graph(graph)
     else:
@@ -20,9 +60,13 @@ def create_example_soc_graph(graph=None):
             layout_manager = CanvasLayoutManager(initial_cols=3, initial_rows=12)
             graph.set_layout_manager(layout_manager)
         graph.layout_manager.reset()
+        _populate_example_soc_graph(graph)
 
-    from models import Node, Parameter, GridPosition
-    
+    return _example_graph_stats(graph)
+
+
+def _populate_example_soc_graph(graph: CalculationGraph) -> None:
+    """在给定的计算图上构建多核SoC示例的节点与参数"""
     # 1. 工艺节点 - 基础参数
     process_node = Node(name="工艺技术", description="半导体工艺技术参数")
     process_node.add_parameter(Parameter("工艺节点", 7, "nm", description="制程工艺节点大小", confidence=0.95, param_type="int"))
@@ -382,18 +426,3 @@ self.confidence = dependencies[0].confidence * 0.95
     
     graph.add_node(efficiency_node, auto_place=False)
     graph.layout_manager.place_node(efficiency_node.id, GridPosition(2, 2))
-    
-    # 返回创建结果统计
-    nodes_created = len(graph.nodes)
-    total_params = sum(len(node.parameters) for node in graph.nodes.values())
-    calculated_params = sum(
-        sum(1 for param in node.parameters if param.calculation_func)
-        for node in graph.nodes.values()
-    )
-    
-    return {
-        "graph": graph,
-        "nodes_created": nodes_created,
-        "total_params": total_params,
-        "calculated_params": calculated_params
-    }
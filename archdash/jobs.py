@@ -0,0 +1,347 @@
+"""后台计算任务
+
+耗时的计算（如敏感性分析扫描）由进程内的全局调度器在固定数量的工作线程中执行，
+回调只负责提交任务和轮询进度：
+
+- 任务函数接收 Job 对象，用 ``job.report(done, total)`` 上报进度，
+  并定期调用 ``job.checkpoint()`` 响应取消、给交互操作让路；
+  ``job.publish(item)`` 发布的中间结果可由轮询方用 ``job.partial_since(offset)`` 增量读取
+- 每个会话的同一类任务同时只保留一个：提交新任务时取消仍在运行或排队的旧任务
+- 工作线程都忙时任务排队；出队按会话公平轮转：优先选择正在运行任务最少、
+  最久未被服务的会话，单个会话提交再多任务也不会饿死其他会话
+- 排队任务超过上限（全局或单个会话）时拒绝提交（JobRejected）
+- 交互操作（参数编辑引起的级联计算，见 ``interactive_priority``）进行期间，
+  后台任务在检查点暂停，优先保证界面响应
+- 已结束的任务保留到结果被取走，或超过保留时间后清除
+"""
+from __future__ import annotations
+
+import functools
+import itertools
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .constants import PerformanceConstants
+from .session_graph import current_session_id
+
+# 任务所有者：(会话sid, 任务类型)
+JobOwner = Tuple[str, str]
+
+# 工作线程数，可通过环境变量 ARCHDASH_JOB_WORKERS 覆盖
+JOB_WORKERS = int(os.environ.get("ARCHDASH_JOB_WORKERS", PerformanceConstants.JOB_WORKERS))
+
+
+class JobCancelled(Exception):
+    """任务已被取消"""
+
+
+class JobRejected(Exception):
+    """排队任务已满，拒绝提交"""
+
+
+class Job:
+    """一个后台任务的状态"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, job_id: str, owner: JobOwner, func: Callable[["Job"], Any], meta: Optional[Dict[str, Any]] = None,
+                 pause: Optional[Callable[[], None]] = None):
+        self.id = job_id
+        self.owner = owner
+        self.func = func
+        self.meta = meta or {}
+        self.status = Job.PENDING
+        self.done = 0
+        self.total = 0
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.finished_at: Optional[float] = None
+        self._partial: List[Any] = []
+        self._cancel_event = threading.Event()
+        self._pause = pause
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (Job.DONE, Job.FAILED, Job.CANCELLED)
+
+    @property
+    def progress(self) -> float:
+        """完成比例（0~1）"""
+        if self.status == Job.DONE:
+            return 1.0
+        return self.done / self.total if self.total else 0.0
+
+    def report(self, done: int, total: int) -> None:
+        self.done = done
+        self.total = total
+
+    def publish(self, item: Any) -> None:
+        """追加一条中间结果"""
+        self._partial.append(item)
+
+    def partial_since(self, offset: int) -> List[Any]:
+        """返回第 offset 条之后发布的中间结果"""
+        return self._partial[offset:]
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def checkpoint(self) -> None:
+        """任务检查点：响应取消，交互操作进行时暂停等待"""
+        self.raise_if_cancelled()
+        if self._pause is not None:
+            self._pause()
+            self.raise_if_cancelled()
+
+
+class JobRunner:
+    """公平调度的后台任务执行器"""
+
+    def __init__(self, max_workers: int = JOB_WORKERS,
+                 retention: float = PerformanceConstants.JOB_RESULT_RETENTION_S,
+                 max_queued: int = PerformanceConstants.JOB_MAX_QUEUED,
+                 max_queued_per_session: int = PerformanceConstants.JOB_MAX_QUEUED_PER_SESSION):
+        self.max_workers = max(1, max_workers)
+        self.retention = retention
+        self.max_queued = max_queued
+        self.max_queued_per_session = max_queued_per_session
+        self._jobs: Dict[str, Job] = {}
+        self._active: Dict[JobOwner, Job] = {}
+        # sid -> 排队中的任务
+        self._queues: Dict[str, Deque[Job]] = {}
+        # sid -> 正在运行的任务数
+        self._running: Dict[str, int] = {}
+        # sid -> 最近一次出队的序号，越小表示越久未被服务
+        self._served: Dict[str, int] = {}
+        self._serve_ticks = itertools.count(1)
+        self._lock = threading.Lock()
+        self._work_available = threading.Condition(self._lock)
+        self._workers: List[threading.Thread] = []
+        # 交互操作计数，为0时 _interactive_idle 置位
+        self._interactive = 0
+        self._interactive_idle = threading.Event()
+        self._interactive_idle.set()
+
+    # ---------- 提交与查询 ----------
+
+    def submit(self, owner: JobOwner, func: Callable[[Job], Any], meta: Optional[Dict[str, Any]] = None) -> Job:
+        """提交任务；同一所有者仍在运行或排队的任务会被取消
+
+        Raises:
+            JobRejected: 排队任务已达上限
+        """
+        sid = owner[0]
+        with self._lock:
+            self._prune()
+            previous = self._active.get(owner)
+            if previous is not None and previous.finished:
+                previous = None
+
+            # 先检查上限再取消旧任务，被拒绝时旧任务照常运行；旧任务若在排队，它让出的位置不计入
+            replaced = 1 if previous is not None and previous.status == Job.PENDING else 0
+            queued = len(self._queues.get(sid, ())) - replaced
+            if queued >= self.max_queued_per_session:
+                raise JobRejected(f"当前会话已有 {queued} 个任务在排队，请稍后再试")
+            if sum(len(q) for q in self._queues.values()) - replaced >= self.max_queued:
+                raise JobRejected("服务器繁忙，后台任务队列已满，请稍后再试")
+
+            if previous is not None:
+                self._cancel_locked(previous)
+
+            job = Job(uuid.uuid4().hex, owner, func, meta, pause=self.wait_for_interactive)
+            self._jobs[job.id] = job
+            self._active[owner] = job
+            self._queues.setdefault(sid, deque()).append(job)
+            self._ensure_workers()
+            self._work_available.notify()
+        return job
+
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: Optional[str]) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and not job.finished:
+                self._cancel_locked(job)
+            return job
+
+    def is_current(self, job: Job) -> bool:
+        """任务是否仍是其所有者最近提交的任务（未被新任务取代）"""
+        with self._lock:
+            return self._active.get(job.owner) is job
+
+    def collect(self, job_id: Optional[str]) -> Optional[Job]:
+        """取走已结束的任务（之后不再保留）；任务不存在或未结束时返回None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.finished:
+                return None
+            del self._jobs[job_id]
+            if self._active.get(job.owner) is job:
+                del self._active[job.owner]
+            return job
+
+    def queue_position(self, job: Job) -> int:
+        """任务在队列中的位置（1表示下一个运行）；不在排队或有空闲工作线程马上就能运行时返回0"""
+        with self._lock:
+            if job.status != Job.PENDING:
+                return 0
+            free_workers = self.max_workers - sum(self._running.values())
+            running = dict(self._running)
+            served = dict(self._served)
+            queues = {sid: deque(queue) for sid, queue in self._queues.items() if queue}
+            position = 0
+            while queues:
+                sid = self._pick_session(queues, running, served)
+                candidate = queues[sid].popleft()
+                if not queues[sid]:
+                    del queues[sid]
+                position += 1
+                if candidate is job:
+                    return max(position - free_workers, 0)
+                running[sid] = running.get(sid, 0) + 1
+                served[sid] = float("inf")
+            return 0
+
+    # ---------- 交互优先 ----------
+
+    @contextmanager
+    def interactive(self):
+        """标记一次交互操作，期间后台任务在检查点暂停"""
+        with self._lock:
+            self._interactive += 1
+            self._interactive_idle.clear()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._interactive -= 1
+                if self._interactive == 0:
+                    self._interactive_idle.set()
+
+    def wait_for_interactive(self) -> None:
+        """有交互操作进行时等待其结束（最长 JOB_INTERACTIVE_WAIT_S 秒，避免后台任务被无限期挂起）"""
+        self._interactive_idle.wait(PerformanceConstants.JOB_INTERACTIVE_WAIT_S)
+
+    # ---------- 调度 ----------
+
+    @staticmethod
+    def _pick_session(queues: Dict[str, Deque[Job]], running: Dict[str, int], served: Dict[str, Any]) -> str:
+        """公平份额：正在运行任务最少的会话优先，其次是最久未被服务的会话"""
+        return min(queues, key=lambda sid: (running.get(sid, 0), served.get(sid, 0)))
+
+    def _cancel_locked(self, job: Job) -> None:
+        job.cancel()
+        if job.status == Job.PENDING:
+            queue = self._queues.get(job.owner[0])
+            if queue is not None and job in queue:
+                queue.remove(job)
+                if not queue:
+                    del self._queues[job.owner[0]]
+            self._finish(job, Job.CANCELLED)
+
+    def _ensure_workers(self) -> None:
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self._work, name=f"archdash-job-{len(self._workers) + 1}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _next_job(self) -> Job:
+        """取出下一个要运行的任务（调用方持有锁，没有任务时等待）"""
+        while not self._queues:
+            self._work_available.wait()
+        sid = self._pick_session(self._queues, self._running, self._served)
+        queue = self._queues[sid]
+        job = queue.popleft()
+        if not queue:
+            del self._queues[sid]
+        self._running[sid] = self._running.get(sid, 0) + 1
+        self._served[sid] = next(self._serve_ticks)
+        job.status = Job.RUNNING
+        return job
+
+    def _work(self) -> None:
+        while True:
+            with self._lock:
+                job = self._next_job()
+            try:
+                self._run(job)
+            finally:
+                with self._lock:
+                    sid = job.owner[0]
+                    self._running[sid] -= 1
+                    if not self._running[sid]:
+                        del self._running[sid]
+
+    def _run(self, job: Job) -> None:
+        try:
+            job.checkpoint()
+            result = job.func(job)
+        except JobCancelled:
+            self._finish(job, Job.CANCELLED)
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, Job.FAILED)
+        else:
+            job.result = result
+            self._finish(job, Job.CANCELLED if job.cancelled else Job.DONE)
+
+    @staticmethod
+    def _finish(job: Job, status: str) -> None:
+        job.finished_at = time.monotonic()
+        job.status = status
+
+    def _prune(self) -> None:
+        """清除结束后长时间无人取走的任务（调用方持有锁）"""
+        now = time.monotonic()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and now - job.finished_at > self.retention:
+                del self._jobs[job_id]
+                if self._active.get(job.owner) is job:
+                    del self._active[job.owner]
+
+
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """获取进程内共享的任务执行器"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
+
+
+def session_owner(kind: str) -> JobOwner:
+    """当前会话的某类任务的所有者标识"""
+    return (current_session_id(), kind)
+
+
+def interactive_priority(func):
+    """装饰交互回调：回调执行期间后台任务暂停，优先保证交互响应"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with get_job_runner().interactive():
+            return func(*args, **kwargs)
+    return wrapper
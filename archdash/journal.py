@@ -0,0 +1,340 @@
+"""会话计算图的追加式变更日志（崩溃恢复）
+
+每个会话一个 ``<sid>.journal`` 文件，每行一个 JSON 数组：
+
+- 首行 ``["s", state]``：完整快照
+- 之后每行是一次请求产生的变更记录列表，记录格式：
+    - ``["v", key, value, unlinked, confidence]``  参数值变更（含级联计算带来的置信度变化）
+    - ``["n", node_state]``            节点新增或结构变更（整节点覆盖）
+    - ``["d", node_id]``               删除节点
+    - ``["l", layout]``                布局变更
+    - ``["m", next_node_id]``          节点ID计数器变更
+
+参数在日志中以整数 key 标识，依赖关系记录为 key 列表，因此参数移动、
+重命名不会使其他节点的依赖引用失效。变更记录超过阈值后压缩为新快照。
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import replace
+from typing import Any, Dict, List, Optional
+
+from .models import (
+    CalculationGraph, CanvasLayoutManager, GraphSnapshot, GridPosition,
+    Node, NodeState, Parameter, ParameterState
+)
+from .constants import PerformanceConstants
+
+# 日志目录，可通过环境变量 ARCHDASH_JOURNAL_DIR 覆盖；设为空字符串则关闭日志
+JOURNAL_DIR = os.environ.get(
+    "ARCHDASH_JOURNAL_DIR",
+    os.path.join(os.path.expanduser("~"), ".archdash", "journal")
+)
+
+_lock = threading.Lock()
+
+
+def _json_default(value: Any):
+    """把 numpy 标量等非标准类型转换为可序列化的值"""
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+class SessionJournal:
+    """单个会话的变更日志"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.graph: Optional[CalculationGraph] = None
+        self.snapshot: Optional[GraphSnapshot] = None
+        self.version: Optional[int] = None  # 上次记录时计算图的 version，未变化时跳过快照比较
+        self.records = 0
+        self._keys: Dict[Parameter, int] = {}
+        self._next_key = 0
+        self._lock = threading.Lock()
+
+    # ---------- 编码 ----------
+
+    def _key(self, param: Parameter) -> int:
+        key = self._keys.get(param)
+        if key is None:
+            key = self._next_key
+            self._next_key += 1
+            self._keys[param] = key
+        return key
+
+    def _encode_param(self, state: ParameterState) -> Dict[str, Any]:
+        return {
+            "k": self._key(state.param),
+            "name": state.name,
+            "value": state.value,
+            "unit": state.unit,
+            "description": state.description,
+            "confidence": state.confidence,
+            "calculation_func": state.calculation_func,
+            "dependencies": [self._key(dep) for dep in state.dependencies],
+            "unlinked": state.unlinked,
+            "param_type": state.param_type,
+            "distribution": state.distribution,
+        }
+
+    def _encode_node(self, state: NodeState) -> Dict[str, Any]:
+        return {
+            "id": state.node_id,
+            "name": state.name,
+            "description": state.description,
+            "node_type": state.node_type,
+            "parameters": [self._encode_param(p) for p in state.parameters],
+        }
+
+    @staticmethod
+    def _encode_layout(snapshot: GraphSnapshot):
+        if snapshot.layout is None:
+            return None
+        cols, rows, positions = snapshot.layout
+        return {"cols": cols, "rows": rows, "positions": [list(p) for p in positions]}
+
+    def _encode_state(self, snapshot: GraphSnapshot) -> Dict[str, Any]:
+        return {
+            "nodes": [self._encode_node(n) for n in snapshot.nodes],
+            "layout": self._encode_layout(snapshot),
+            "next_node_id": snapshot.next_node_id,
+        }
+
+    def _diff(self, previous: GraphSnapshot, current: GraphSnapshot) -> List[list]:
+        """计算两个快照之间的变更记录"""
+        ops: List[list] = []
+        previous_nodes = {state.node_id: state for state in previous.nodes}
+
+        for state in current.nodes:
+            old = previous_nodes.pop(state.node_id, None)
+            if old is state:
+                continue
+
+            value_ops = None
+            if (old is not None and old.node is state.node and old.name == state.name
+                    and old.description == state.description and old.node_type == state.node_type
+                    and len(old.parameters) == len(state.parameters)):
+                value_ops = []
+                for old_param, new_param in zip(old.parameters, state.parameters):
+                    if old_param is new_param:
+                        continue
+                    if old_param.param is not new_param.param or old_param != replace(
+                            new_param, value=old_param.value, unlinked=old_param.unlinked,
+                            confidence=old_param.confidence):
+                        value_ops = None
+                        break
+                    value_ops.append(["v", self._key(new_param.param), new_param.value,
+                                      new_param.unlinked, new_param.confidence])
+
+            if value_ops is None:
+                ops.append(["n", self._encode_node(state)])
+            else:
+                ops.extend(value_ops)
+
+        for node_id in previous_nodes:
+            ops.append(["d", node_id])
+
+        if current.layout != previous.layout:
+            ops.append(["l", self._encode_layout(current)])
+        if current.next_node_id != previous.next_node_id:
+            ops.append(["m", current.next_node_id])
+        return ops
+
+    # ---------- 写入 ----------
+
+    def _write_snapshot(self, snapshot: GraphSnapshot) -> None:
+        """以快照重写日志文件（原子替换）"""
+        self._keys = {}
+        self._next_key = 0
+        line = json.dumps(["s", self._encode_state(snapshot)], ensure_ascii=False, default=_json_default)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.records = 0
+
+    def flush(self, graph: CalculationGraph) -> None:
+        """把计算图自上次记录以来的变更追加到日志
+
+        计算图的修改都在 mutation() 中进行，完成后才递增 version：version 未变化时无需
+        采集快照，进度轮询等不修改计算图的请求因此不必遍历全部参数。修改进行中（或采集
+        期间开始了新的修改）时不记录，留给该修改所在请求结束时的 flush。
+        """
+        with self._lock:
+            version = graph.version
+            if graph.mutating or (graph is self.graph and version == self.version):
+                return
+            replaced = graph is not self.graph or self.snapshot is None
+            snapshot = GraphSnapshot.capture(graph, None if replaced else self.snapshot)
+            if graph.mutating or graph.version != version:
+                return
+            self.version = version
+            if replaced:
+                # 整图被替换（加载文件、清空等），直接写新快照
+                if graph.nodes or os.path.exists(self.path):
+                    self._write_snapshot(snapshot)
+                self.graph = graph
+                self.snapshot = snapshot
+                return
+
+            if snapshot.same_state(self.snapshot):
+                return
+
+            if self.records >= PerformanceConstants.JOURNAL_COMPACT_THRESHOLD or not os.path.exists(self.path):
+                self._write_snapshot(snapshot)
+            else:
+                ops = self._diff(self.snapshot, snapshot)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(ops, ensure_ascii=False, default=_json_default) + "\n")
+                self.records += 1
+            self.snapshot = snapshot
+
+    # ---------- 重放 ----------
+
+    def replay(self) -> Optional[CalculationGraph]:
+        """从日志重建计算图；日志不存在或损坏时返回None"""
+        state = None
+        records = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 最后一行可能因崩溃而不完整，忽略其后的内容
+                    break
+                if entry and entry[0] == "s":
+                    state = entry[1]
+                    state["nodes"] = {n["id"]: n for n in state["nodes"]}
+                    records = 0
+                elif state is not None:
+                    _apply_ops(state, entry)
+                    records += 1
+        if state is None:
+            return None
+
+        graph = CalculationGraph()
+        params: Dict[int, Parameter] = {}
+        for node_data in state["nodes"].values():
+            node = Node(name=node_data["name"], description=node_data["description"],
+                        id=node_data["id"], node_type=node_data["node_type"])
+            for param_data in node_data["parameters"]:
+                param = Parameter(
+                    name=param_data["name"],
+                    value=param_data["value"],
+                    unit=param_data["unit"],
+                    description=param_data["description"],
+                    confidence=param_data["confidence"],
+                    calculation_func=param_data["calculation_func"],
+                    param_type=param_data["param_type"],
+                    distribution=param_data.get("distribution", "auto"),
+                )
+                param.unlinked = param_data["unlinked"]
+                param.set_graph(graph)
+                params[param_data["k"]] = param
+                node.add_parameter(param)
+            graph.nodes[node.id] = node
+        for node_data in state["nodes"].values():
+            for param_data in node_data["parameters"]:
+                params[param_data["k"]].dependencies = [
+                    params[key] for key in param_data["dependencies"] if key in params
+                ]
+
+        layout = state.get("layout")
+        layout_manager = CanvasLayoutManager(
+            initial_cols=layout["cols"] if layout else 3,
+            initial_rows=layout["rows"] if layout else 10
+        )
+        if layout:
+            for node_id, row, col in layout["positions"]:
+                layout_manager.place_node(node_id, GridPosition(row, col))
+        graph.set_layout_manager(layout_manager)
+        graph._next_node_id = state.get("next_node_id", graph._next_node_id)
+        graph._rebuild_dependency_graph()
+
+        self._keys = {param: key for key, param in params.items()}
+        self._next_key = max(params, default=-1) + 1
+        self.graph = graph
+        self.snapshot = GraphSnapshot.capture(graph)
+        self.version = graph.version
+        self.records = records
+        return graph
+
+
+def _apply_ops(state: Dict[str, Any], ops: List[list]) -> None:
+    """把一行变更记录应用到重放中的状态字典"""
+    param_index = None
+    for op in ops:
+        kind = op[0]
+        if kind == "v":
+            _, key, value, unlinked, confidence = op
+            if param_index is None:
+                param_index = {
+                    param_data["k"]: param_data
+                    for node_data in state["nodes"].values()
+                    for param_data in node_data["parameters"]
+                }
+            param_data = param_index.get(key)
+            if param_data is not None:
+                param_data["value"] = value
+                param_data["unlinked"] = unlinked
+                param_data["confidence"] = confidence
+        elif kind == "n":
+            param_index = None
+            state["nodes"][op[1]["id"]] = op[1]
+        elif kind == "d":
+            param_index = None
+            state["nodes"].pop(op[1], None)
+        elif kind == "l":
+            state["layout"] = op[1]
+        elif kind == "m":
+            state["next_node_id"] = op[1]
+
+
+# sid -> SessionJournal
+_JOURNALS: Dict[str, SessionJournal] = {}
+
+
+def _journal_for(sid: str) -> Optional[SessionJournal]:
+    if not JOURNAL_DIR:
+        return None
+    with _lock:
+        journal = _JOURNALS.get(sid)
+        if journal is None:
+            os.makedirs(JOURNAL_DIR, exist_ok=True)
+            safe_sid = "".join(c for c in sid if c.isalnum() or c in "-_")
+            journal = SessionJournal(os.path.join(JOURNAL_DIR, f"{safe_sid}.journal"))
+            _JOURNALS[sid] = journal
+        return journal
+
+
+def record_session(sid: str, graph: CalculationGraph) -> None:
+    """记录会话计算图的最新变更（每次请求结束后调用）"""
+    journal = _journal_for(sid)
+    if journal is None:
+        return
+    try:
+        journal.flush(graph)
+    except Exception as e:
+        print(f"⚠️ 写入会话日志失败: {e}")
+
+
+def restore_session(sid: str) -> Optional[CalculationGraph]:
+    """从日志恢复会话计算图；没有日志时返回None"""
+    journal = _journal_for(sid)
+    if journal is None or not os.path.exists(journal.path):
+        return None
+    try:
+        with journal._lock:
+            graph = journal.replay()
+        if graph is not None:
+            print(f"♻️ 已从日志恢复会话计算图: {len(graph.nodes)}个节点")
+        return graph
+    except Exception as e:
+        print(f"⚠️ 从日志恢复会话失败: {e}")
+        return None
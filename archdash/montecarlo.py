@@ -0,0 +1,110 @@
+"""蒙特卡洛不确定性传播
+
+把输出参数上游的每个输入参数（没有计算函数或已断开计算的数值参数）按其置信度
+映射为一个分布，一次性抽取 N 个样本组成数组，经 ``batch_eval.evaluate_grid``
+批量代入计算代码，得到输出的样本分布。
+
+置信度决定分布的相对标准差：``(1 - 置信度) × MONTE_CARLO_CONFIDENCE_SPREAD``
+（相对于参数当前值的绝对值）。置信度为 100% 或当前值为 0 的参数不参与取样。
+各参数的分布类型可单独设置（``Parameter.distribution``），不同类型的标准差相同：
+
+- auto / normal：以当前值为均值的正态分布
+- uniform：以当前值为中心的均匀分布
+- triangular：以当前值为众数的对称三角分布
+- lognormal：以当前值为中位数的对数正态分布（当前值须为正，否则按正态分布）
+- fixed：不取样，始终使用当前值
+"""
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .batch_eval import ConeEvaluator, evaluate_grid, upstream_cone
+from .constants import AppConstants
+from .models import Parameter
+
+# 分布类型 -> 显示名称
+DISTRIBUTIONS = {
+    "auto": "按置信度（正态）",
+    "normal": "正态",
+    "uniform": "均匀",
+    "triangular": "三角",
+    "lognormal": "对数正态",
+    "fixed": "固定值",
+}
+
+
+def relative_spread(param: Parameter) -> float:
+    """参数取样分布的相对标准差"""
+    confidence = min(max(float(param.confidence), 0.0), 1.0)
+    return (1.0 - confidence) * AppConstants.MONTE_CARLO_CONFIDENCE_SPREAD
+
+
+def is_uncertain_input(param: Parameter) -> bool:
+    """参数是否作为不确定输入参与取样"""
+    if param.calculation_func and not param.unlinked:
+        return False
+    if getattr(param, "distribution", "auto") == "fixed":
+        return False
+    value = param.value
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        return False
+    return value != 0 and relative_spread(param) > 0
+
+
+def sample_parameter(param: Parameter, n: int, rng: np.random.Generator) -> np.ndarray:
+    """按参数的分布类型和置信度抽取 n 个样本"""
+    value = float(param.value)
+    spread = relative_spread(param)
+    sigma = abs(value) * spread
+    kind = getattr(param, "distribution", "auto")
+
+    if kind == "uniform":
+        half_width = sigma * math.sqrt(3)
+        samples = rng.uniform(value - half_width, value + half_width, n)
+    elif kind == "triangular":
+        half_width = sigma * math.sqrt(6)
+        samples = rng.triangular(value - half_width, value, value + half_width, n)
+    elif kind == "lognormal" and value > 0:
+        # 对数空间的标准差使分布的变异系数等于 spread
+        samples = rng.lognormal(math.log(value), math.sqrt(math.log1p(spread ** 2)), n)
+    else:
+        samples = rng.normal(value, sigma, n)
+
+    if getattr(param, "param_type", "float") == "int":
+        samples = np.round(samples)
+    return samples
+
+
+def uncertain_inputs(target: Parameter) -> List[Parameter]:
+    """目标参数上游参与取样的输入参数"""
+    return [param for param in upstream_cone(target) if param is not target and is_uncertain_input(param)]
+
+
+def summarize(samples: np.ndarray, bins: int = AppConstants.MONTE_CARLO_HISTOGRAM_BINS) -> Dict[str, Any]:
+    """输出样本的统计量和直方图（计算失败的样本为 NaN，不计入统计）"""
+    valid = samples[np.isfinite(samples)]
+    percentiles = AppConstants.MONTE_CARLO_PERCENTILES
+    counts, edges = np.histogram(valid, bins=bins)
+    return {
+        'count': len(valid),
+        'failed': len(samples) - len(valid),
+        'mean': float(valid.mean()),
+        'std': float(valid.std()),
+        'percentiles': dict(zip(percentiles, np.percentile(valid, percentiles).tolist())),
+        'histogram_counts': counts,
+        'histogram_edges': edges,
+    }
+
+
+def run_monte_carlo(target: Parameter, inputs: List[Parameter], n: int, job=None,
+                    seed: Optional[int] = None) -> Tuple[np.ndarray, str]:
+    """对 inputs 取样并批量计算 target，返回 (输出样本, 计算方式)
+
+    直接修改参数的值，应在计算图副本上调用。
+    """
+    rng = np.random.default_rng(seed)
+    columns = [sample_parameter(param, n, rng) for param in inputs]
+    return evaluate_grid(ConeEvaluator(target, inputs), columns, job)
@@ -0,0 +1,209 @@
+"""绘图参数选择器的搜索索引
+
+对可绘图参数（数值型参数）的标签（``节点名.参数名``）、单位和描述建立倒排索引：
+
+- 英文和数字按单词切分，查询词按前缀匹配（完整匹配得分更高）
+- 中文没有空格分词，按单字和相邻两字建立索引，查询时要求所有两字组都命中，
+  效果等价于子串匹配
+- 查询词没有任何命中时，用 difflib 在已有词中做近似匹配（容忍拼写错误）
+
+索引按节点的版本号增量维护：只有名称、参数等发生变化的节点会被重新切词。
+"""
+from __future__ import annotations
+
+import bisect
+import difflib
+import re
+import weakref
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .constants import AppConstants
+from .models import CalculationGraph
+
+_WORD_RE = re.compile(r"[^\W_㐀-鿿]+|[㐀-鿿]+")
+_CJK_RE = re.compile(r"[㐀-鿿]")
+
+# 字段权重：标签 > 单位 > 描述
+_FIELD_WEIGHTS = (("label", 3.0), ("unit", 2.0), ("description", 1.0))
+# 匹配方式系数：完整匹配 > 前缀匹配 > 近似匹配
+_EXACT, _PREFIX, _FUZZY = 1.0, 0.7, 0.4
+
+
+def _index_tokens(text: str) -> Set[str]:
+    """切分被索引的文本：单词、中文单字和中文两字组"""
+    tokens = set()
+    for word in _WORD_RE.findall(str(text or "").lower()):
+        if _CJK_RE.match(word):
+            tokens.update(word)
+            tokens.update(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.add(word)
+    return tokens
+
+
+def _query_terms(text: str) -> List[Tuple[str, bool]]:
+    """切分查询文本，返回 [(查询词, 是否允许前缀/近似匹配)]"""
+    terms = []
+    for word in _WORD_RE.findall(str(text or "").lower()):
+        if _CJK_RE.match(word):
+            if len(word) == 1:
+                terms.append((word, False))
+            else:
+                terms.extend((word[i:i + 2], False) for i in range(len(word) - 1))
+        else:
+            terms.append((word, True))
+    return terms
+
+
+class ParameterSearchIndex:
+    """单个计算图的可绘图参数索引"""
+
+    def __init__(self):
+        # node_id -> (节点版本, [条目])
+        self._nodes: Dict[str, Tuple[Any, List[Dict[str, Any]]]] = {}
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        # 词 -> {条目value: 字段权重}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._sorted_tokens: Optional[List[str]] = None
+        self._order: List[str] = []
+
+    # ---------- 维护 ----------
+
+    @staticmethod
+    def _node_entries(node_id: str, node) -> List[Dict[str, Any]]:
+        entries = []
+        for param in node.parameters:
+            if hasattr(param, 'param_type') and param.param_type in ['float', 'int'] and isinstance(param.value, (int, float)):
+                entries.append({
+                    'label': f"{node.name}.{param.name}",
+                    'value': f"{node_id}|{param.name}",
+                    'node_id': node_id,
+                    'param_name': param.name,
+                    'current_value': param.value,
+                    'unit': param.unit,
+                    'description': param.description,
+                })
+        return entries
+
+    def _add(self, entry: Dict[str, Any]) -> None:
+        key = entry['value']
+        self._entries[key] = entry
+        for field, weight in _FIELD_WEIGHTS:
+            for token in _index_tokens(entry[field]):
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    self._sorted_tokens = None
+                if postings.get(key, 0) < weight:
+                    postings[key] = weight
+
+    def _remove(self, entry: Dict[str, Any]) -> None:
+        key = entry['value']
+        if self._entries.get(key) is entry:
+            del self._entries[key]
+        for field, _ in _FIELD_WEIGHTS:
+            for token in _index_tokens(entry[field]):
+                postings = self._postings.get(token)
+                if postings is not None:
+                    postings.pop(key, None)
+                    if not postings:
+                        del self._postings[token]
+                        self._sorted_tokens = None
+
+    def refresh(self, graph: CalculationGraph) -> None:
+        """按节点版本增量更新索引：只重新索引新增或变化的节点，移除已删除的节点"""
+        changed = False
+        for node_id, node in graph.nodes.items():
+            version = node.version_key()
+            indexed = self._nodes.get(node_id)
+            if indexed is not None and indexed[0] == version:
+                continue
+            if indexed is not None:
+                for entry in indexed[1]:
+                    self._remove(entry)
+            entries = self._node_entries(node_id, node)
+            for entry in entries:
+                self._add(entry)
+            self._nodes[node_id] = (version, entries)
+            changed = True
+
+        for node_id in [node_id for node_id in self._nodes if node_id not in graph.nodes]:
+            for entry in self._nodes.pop(node_id)[1]:
+                self._remove(entry)
+            changed = True
+
+        if changed or len(self._order) != len(self._entries):
+            self._order = [entry['value'] for node_id in graph.nodes for entry in self._nodes[node_id][1]]
+
+    # ---------- 查询 ----------
+
+    def get(self, value: str) -> Optional[Dict[str, Any]]:
+        """按 ``节点ID|参数名`` 获取条目"""
+        return self._entries.get(value)
+
+    def all(self) -> List[Dict[str, Any]]:
+        """按画布中的节点顺序返回所有条目"""
+        return [self._entries[key] for key in self._order]
+
+    def _match_term(self, term: str, expand: bool) -> Dict[str, float]:
+        """返回 {条目value: 得分}"""
+        scores: Dict[str, float] = {}
+
+        def collect(token: str, factor: float) -> None:
+            for key, weight in self._postings[token].items():
+                score = weight * factor
+                if scores.get(key, 0) < score:
+                    scores[key] = score
+
+        if term in self._postings:
+            collect(term, _EXACT)
+        if not expand:
+            return scores
+
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self._postings)
+        start = bisect.bisect_left(self._sorted_tokens, term)
+        for token in self._sorted_tokens[start:]:
+            if not token.startswith(term):
+                break
+            if token != term:
+                collect(token, _PREFIX)
+
+        if not scores and len(term) >= AppConstants.PARAM_SEARCH_FUZZY_MIN_LENGTH:
+            for token in difflib.get_close_matches(term, self._sorted_tokens, n=5, cutoff=0.75):
+                collect(token, _FUZZY)
+        return scores
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """返回按得分排序的匹配条目；空查询返回全部条目"""
+        terms = _query_terms(query)
+        if not terms:
+            return self.all()
+
+        scores: Optional[Dict[str, float]] = None
+        for term, expand in terms:
+            term_scores = self._match_term(term, expand)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {key: score + term_scores[key] for key, score in scores.items() if key in term_scores}
+            if not scores:
+                return []
+
+        position = {key: index for index, key in enumerate(self._order)}
+        ranked = sorted(scores, key=lambda key: (-scores[key], position.get(key, 0)))
+        return [self._entries[key] for key in ranked]
+
+
+# 计算图 -> ParameterSearchIndex；计算图被替换后随之回收
+_INDEXES: "weakref.WeakKeyDictionary[CalculationGraph, ParameterSearchIndex]" = weakref.WeakKeyDictionary()
+
+
+def search_index_for(graph: CalculationGraph) -> ParameterSearchIndex:
+    """返回计算图的参数搜索索引（已同步到计算图的当前状态）"""
+    index = _INDEXES.get(graph)
+    if index is None:
+        index = ParameterSearchIndex()
+        _INDEXES[graph] = index
+    index.refresh(graph)
+    return index
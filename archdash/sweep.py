@@ -0,0 +1,126 @@
+"""参数扫描的采样策略"""
+from __future__ import annotations
+
+import bisect
+import heapq
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def coarse_to_fine_order(n: int, coarse_points: int) -> np.ndarray:
+    """返回下标 0..n-1 的一个排列，用于由粗到细的渐进扫描
+
+    先取首尾和均匀分布的约 coarse_points 个点，之后每一轮把间距减半、只取新增的点，
+    直到覆盖全部下标。按这个顺序计算，任意时刻已完成的点都大致均匀地覆盖整个范围。
+    """
+    if n <= 0:
+        return np.empty(0, dtype=np.int64)
+    stride = 1 << max(0, math.ceil(math.log2(max(n / max(coarse_points, 1), 1))))
+    seen = np.zeros(n, dtype=bool)
+    levels = []
+
+    first = np.unique(np.append(np.arange(0, n, stride), n - 1))
+    seen[first] = True
+    levels.append(first)
+    while stride > 1:
+        stride //= 2
+        level = np.arange(0, n, stride)
+        level = level[~seen[level]]
+        seen[level] = True
+        levels.append(level)
+    return np.concatenate(levels)
+
+
+def _deviation(x0: float, y0: float, x1: float, y1: float, x2: float, y2: float) -> float:
+    """中间点偏离两端连线的距离（Y方向）"""
+    return abs(y1 - (y0 + (y2 - y0) * (x1 - x0) / (x2 - x0)))
+
+
+def adaptive_sample(evaluate: Callable[[float], Optional[float]], x_start: float, x_end: float, *,
+                    initial_points: int, max_points: int, min_step: float, tolerance: float,
+                    on_point: Optional[Callable[[float, float], None]] = None) -> Tuple[List[float], List[float]]:
+    """自适应采样
+
+    先在均匀的粗网格上计算，然后反复把误差估计最大的区间一分为二，直到所有区间的误差
+    都低于 tolerance、计算次数达到 max_points，或区间宽度已小于 min_step。
+
+    区间的误差估计取它与左右相邻区间组成的两个三点组中，中间点偏离两端连线的距离的较大者
+    （相对于已采样Y值的范围）。平坦或线性的区段误差接近0，不再加密；拐点、阶跃处误差大，
+    会被持续细分。
+
+    Args:
+        evaluate: 计算 x 处的 Y 值，失败时返回 None（该点被跳过，所在区间不再细分）
+        on_point: 每得到一个点时调用（如发布中间结果、检查取消）
+    Returns:
+        按 X 排序的 (xs, ys)
+    """
+    xs: List[float] = []
+    ys: List[float] = []
+    evaluations = 0
+
+    def sample(x: float) -> None:
+        nonlocal evaluations
+        evaluations += 1
+        y = evaluate(x)
+        if y is None:
+            return
+        index = bisect.bisect_left(xs, x)
+        xs.insert(index, x)
+        ys.insert(index, y)
+        if on_point is not None:
+            on_point(x, y)
+
+    for x in np.linspace(x_start, x_end, max(2, min(initial_points, max_points))):
+        sample(float(x))
+
+    # 区间以左端点X标识，堆中可能残留过期的误差值，弹出时与 losses 核对
+    losses: Dict[float, float] = {}
+    heap: List[Tuple[float, float]] = []
+    unsplittable = set()
+
+    def y_scale() -> float:
+        return (max(ys) - min(ys)) or 1.0
+
+    def update_interval(index: int) -> None:
+        """重新计算 [xs[index], xs[index+1]] 的误差"""
+        if index < 0 or index >= len(xs) - 1:
+            return
+        left = xs[index]
+        if left in unsplittable or xs[index + 1] - left < 2 * min_step:
+            losses.pop(left, None)
+            return
+        loss = 0.0
+        if index >= 1:
+            loss = max(loss, _deviation(xs[index - 1], ys[index - 1], xs[index], ys[index], xs[index + 1], ys[index + 1]))
+        if index + 2 < len(xs):
+            loss = max(loss, _deviation(xs[index], ys[index], xs[index + 1], ys[index + 1], xs[index + 2], ys[index + 2]))
+        if len(xs) < 3:
+            loss = math.inf
+        loss /= y_scale()
+        losses[left] = loss
+        heapq.heappush(heap, (-loss, left))
+
+    for index in range(len(xs) - 1):
+        update_interval(index)
+
+    while heap and evaluations < max_points:
+        negative_loss, left = heapq.heappop(heap)
+        if losses.get(left) != -negative_loss:
+            continue
+        if -negative_loss < tolerance:
+            break
+        del losses[left]
+        index = bisect.bisect_left(xs, left)
+        middle = (left + xs[index + 1]) / 2
+        count = len(xs)
+        sample(middle)
+        if len(xs) == count:
+            unsplittable.add(left)
+            continue
+        # 新点影响的区间：新点两侧的两个区间，以及它们各自外侧的相邻区间
+        for neighbor in range(index - 1, index + 3):
+            update_interval(neighbor)
+
+    return xs, ys
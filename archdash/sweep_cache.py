@@ -0,0 +1,72 @@
+"""敏感性分析扫描结果缓存
+
+缓存键由 Y 参数上游锥体的内容哈希（扫描变量 X 作为自由变量，见
+``CalculationGraph.cone_hash``）和扫描设置组成，与会话、参数对象身份无关：
+同一会话重复相同的扫描，或不同会话加载了同一份计算图文件，都能直接取回结果。
+缓存在进程内所有会话间共享，按最近使用顺序淘汰，条目数和数据点总数都有上限。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .constants import AppConstants, PerformanceConstants
+from .models import CalculationGraph, Parameter
+
+
+def sweep_cache_key(graph: CalculationGraph, x_param: Parameter, y_param: Parameter,
+                    x_start: float, x_end: float, x_step: float, adaptive: bool) -> str:
+    """扫描结果的缓存键"""
+    settings = [graph.cone_hash(y_param, free=(x_param,)), x_start, x_end, x_step, adaptive]
+    if adaptive:
+        settings += [
+            AppConstants.SENSITIVITY_ADAPTIVE_INITIAL_POINTS,
+            AppConstants.SENSITIVITY_ADAPTIVE_TOLERANCE,
+            AppConstants.SENSITIVITY_ADAPTIVE_BUDGET_RATIO,
+        ]
+    return hashlib.sha256(json.dumps(settings).encode()).hexdigest()
+
+
+class SweepCache:
+    """LRU 扫描结果缓存"""
+
+    def __init__(self, max_entries: int = PerformanceConstants.SWEEP_CACHE_MAX_ENTRIES,
+                 max_points: int = PerformanceConstants.SWEEP_CACHE_MAX_POINTS):
+        self.max_entries = max_entries
+        self.max_points = max_points
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._points = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, x_values, y_values) -> None:
+        x_array = np.array(x_values, dtype=np.float64)
+        y_array = np.array(y_values, dtype=np.float64)
+        if len(x_array) > self.max_points:
+            return
+        # 缓存的数组在会话间共享，设为只读
+        x_array.flags.writeable = False
+        y_array.flags.writeable = False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._points -= len(previous[0])
+            self._entries[key] = (x_array, y_array)
+            self._points += len(x_array)
+            while len(self._entries) > self.max_entries or self._points > self.max_points:
+                _, (old_x, _) = self._entries.popitem(last=False)
+                self._points -= len(old_x)
+
+
+SWEEP_CACHE = SweepCache()
@@ -0,0 +1,112 @@
+"""累计绘图曲线的服务端存储
+
+敏感性分析的曲线数据以 numpy 数组保存在服务端（每个会话一个 TraceStore），
+浏览器的 ``cumulative-plot-data`` 中只保存曲线句柄（整数），生成图表时按句柄取回数据，
+避免每次点击都把所有历史曲线的 x/y 数组在浏览器和服务端之间来回传输。
+二维扫描的结果网格（PlotGrid）也保存在这里，与曲线共用句柄和容量。
+"""
+from __future__ import annotations
+
+import itertools
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from .constants import AppConstants
+from .session_graph import current_session_id
+
+
+@dataclass(frozen=True)
+class PlotTrace:
+    """一条敏感性分析曲线"""
+    x: np.ndarray
+    y: np.ndarray
+    trace_name: str
+    x_label: str
+    y_label: str
+    x_param: str
+    y_param: str
+    timestamp: str
+
+
+@dataclass(frozen=True)
+class PlotGrid:
+    """一次二维扫描的结果网格，z[i, j] 对应 (x[j], x2[i])"""
+    x: np.ndarray
+    x2: np.ndarray
+    z: np.ndarray
+    trace_name: str
+    x_label: str
+    x2_label: str
+    z_label: str
+    x_param: str
+    x2_param: str
+    z_param: str
+    timestamp: str
+
+
+class TraceStore:
+    """单个会话的曲线存储，超过容量时丢弃最早的曲线"""
+
+    def __init__(self, capacity: int = AppConstants.PLOT_MAX_STORED_TRACES):
+        self.capacity = capacity
+        self._traces: "OrderedDict[int, Union[PlotTrace, PlotGrid]]" = OrderedDict()
+        self._handles = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add(self, x_values: Iterable[float], y_values: Iterable[float], **meta) -> int:
+        """保存一条曲线，返回句柄"""
+        return self._add(PlotTrace(
+            x=np.asarray(x_values, dtype=np.float64),
+            y=np.asarray(y_values, dtype=np.float64),
+            **meta
+        ))
+
+    def add_grid(self, x_values: Iterable[float], x2_values: Iterable[float], z_values, **meta) -> int:
+        """保存一个二维扫描结果网格，返回句柄"""
+        return self._add(PlotGrid(
+            x=np.asarray(x_values, dtype=np.float64),
+            x2=np.asarray(x2_values, dtype=np.float64),
+            z=np.asarray(z_values, dtype=np.float64),
+            **meta
+        ))
+
+    def _add(self, trace: Union[PlotTrace, PlotGrid]) -> int:
+        with self._lock:
+            handle = next(self._handles)
+            self._traces[handle] = trace
+            while len(self._traces) > self.capacity:
+                self._traces.popitem(last=False)
+        return handle
+
+    def get(self, handle: int) -> Optional[Union[PlotTrace, PlotGrid]]:
+        with self._lock:
+            return self._traces.get(handle)
+
+    def get_many(self, handles: Iterable[int]) -> List[Union[PlotTrace, PlotGrid]]:
+        """按句柄顺序取回曲线，跳过已失效的句柄（如服务重启后）"""
+        with self._lock:
+            return [self._traces[handle] for handle in handles if handle in self._traces]
+
+    def discard(self, handles: Iterable[int]) -> None:
+        with self._lock:
+            for handle in handles:
+                self._traces.pop(handle, None)
+
+
+# sid -> TraceStore
+_STORES: Dict[str, TraceStore] = {}
+_lock = threading.Lock()
+
+
+def get_trace_store() -> TraceStore:
+    """获取当前会话的曲线存储"""
+    sid = current_session_id()
+    with _lock:
+        store = _STORES.get(sid)
+        if store is None:
+            store = _STORES[sid] = TraceStore()
+        return store
@@ -0,0 +1,115 @@
+"""会话计算图的后台自动保存
+
+后台线程定期检查所有会话的计算图，图在一段时间内不再变化（合并连续编辑）后，
+把它的快照序列化并原子地写入本地目录（先写临时文件再重命名）。是否需要保存依据
+计算图的 version 计数器（修改完成后才递增）判断，未变化的会话不会重复写入，
+修改进行中的会话留到下一轮。请求线程不参与任何磁盘读写。
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from constants import PerformanceConstants
+from models import GraphSnapshot
+from session_graph import SESSION_GRAPHS
+
+# 自动保存目录，可通过环境变量 ARCHDASH_AUTOSAVE_DIR 覆盖；设为空字符串则关闭自动保存
+AUTOSAVE_DIR = os.environ.get(
+    "ARCHDASH_AUTOSAVE_DIR",
+    os.path.join(os.path.expanduser("~"), ".archdash", "autosave")
+)
+
+
+class AutosaveService(threading.Thread):
+    """自动保存线程"""
+
+    def __init__(self, directory: str,
+                 interval: float = PerformanceConstants.AUTOSAVE_INTERVAL_S,
+                 debounce: float = PerformanceConstants.AUTOSAVE_DEBOUNCE_S):
+        super().__init__(name="archdash-autosave", daemon=True)
+        self.directory = directory
+        self.interval = interval
+        self.debounce = debounce
+        self._stop_event = threading.Event()
+        # sid -> ((图标识, 版本), 首次观察到该版本的时间)
+        self._seen: Dict[str, Tuple[Tuple[int, int], float]] = {}
+        # sid -> 已写入磁盘的 (图标识, 版本)
+        self._saved: Dict[str, Tuple[int, int]] = {}
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        while not self._stop_event.wait(self.interval):
+            self.save_dirty_sessions()
+
+    def save_dirty_sessions(self, force: bool = False) -> int:
+        """保存所有已稳定且有变化的会话，返回写入的会话数
+
+        Args:
+            force: 为True时忽略防抖时间，立即保存所有有变化的会话
+        """
+        now = time.monotonic()
+        saved = 0
+        for sid, graph in list(SESSION_GRAPHS.items()):
+            if graph.mutating:
+                continue  # 修改到一半的计算图不写入，修改完成后 version 变化，下一轮再处理
+            state = (id(graph), graph.version)
+            seen = self._seen.get(sid)
+            if seen is None or seen[0] != state:
+                # 新的修改：重新开始计时，等待编辑停止
+                seen = (state, now)
+                self._seen[sid] = seen
+
+            if self._saved.get(sid) == state:
+                continue
+            if not graph.nodes and sid not in self._saved:
+                continue  # 从未保存过的空白图无需写入
+            if not force and now - seen[1] < self.debounce:
+                continue
+
+            snapshot = GraphSnapshot.capture(graph)
+            if graph.mutating or graph.version != state[1]:
+                continue  # 采集期间开始了新的修改，快照可能不完整
+            if self._write(sid, snapshot):
+                self._saved[sid] = state
+                saved += 1
+        return saved
+
+    def path_for(self, sid: str) -> str:
+        safe_sid = "".join(c for c in sid if c.isalnum() or c in "-_")
+        return os.path.join(self.directory, f"{safe_sid}.json")
+
+    def _write(self, sid: str, snapshot: GraphSnapshot) -> bool:
+        path = self.path_for(sid)
+        tmp_path = f"{path}.tmp"
+        try:
+            data = snapshot.to_dict()
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            # 磁盘错误等，下一轮会重试
+            print(f"⚠️ 自动保存会话 {sid} 失败: {e}")
+            return False
+
+
+_service: Optional[AutosaveService] = None
+
+
+def start_autosave() -> Optional[AutosaveService]:
+    """启动自动保存线程（重复调用只启动一次）"""
+    global _service
+    if not AUTOSAVE_DIR:
+        return None
+    if _service is None:
+        _service = AutosaveService(AUTOSAVE_DIR)
+        _service.start()
+        print(f"💾 自动保存已启用: {AUTOSAVE_DIR}")
+    return _service
@@ -0,0 +1,225 @@
+"""多输入参数的批量计算（二维扫描等）
+
+``ConeEvaluator`` 只重新计算目标参数上游锥体中依赖自由参数（扫描变量）的那部分参数，
+按拓扑顺序逐个调用 ``Parameter.calculate``，不经过计算图的级联传播。
+
+``evaluate_grid`` 计算一批输入点，依次尝试：
+
+1. 向量化：把整批输入作为 numpy 数组一次性代入计算代码。只由四则运算、乘方、
+   ``abs``/``round`` 等组成的计算代码天然支持数组；使用 ``math`` 函数、条件分支等
+   不支持数组的代码会抛出异常或得到形状不符的结果。向量化结果还要与逐点计算的
+   抽查点比对，不一致时放弃
+2. 多进程并行：计算代码都是代码字符串时，把锥体序列化后分块交给进程池逐点计算
+3. 逐点计算：在当前线程中按由粗到细的顺序逐点计算
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from constants import PerformanceConstants
+from models import Parameter
+from sweep import coarse_to_fine_order
+
+# 锥体的可序列化描述：(参数列表, 目标下标, 自由参数下标)，
+# 参数为 (名称, 值, 计算代码, 依赖下标, 是否断开计算)
+ConeSpec = Tuple[List[Tuple[str, Any, Optional[str], List[int], bool]], int, List[int]]
+
+
+def upstream_cone(target: Parameter) -> List[Parameter]:
+    """目标参数及其全部传递依赖，依赖在前（拓扑顺序）"""
+    cone: List[Parameter] = []
+    visited = set()
+
+    def visit(param: Parameter) -> None:
+        if param in visited:
+            return
+        visited.add(param)
+        for dep in param.dependencies:
+            visit(dep)
+        cone.append(param)
+
+    visit(target)
+    return cone
+
+
+class ConeEvaluator:
+    """给定自由参数的取值，计算目标参数的值
+
+    直接修改锥体中参数的值，应在计算图副本上使用。
+    """
+
+    def __init__(self, target: Parameter, free: Sequence[Parameter]):
+        self.target = target
+        self.free = tuple(free)
+        self.cone = upstream_cone(target)
+
+        # 需要重新计算的参数：依赖自由参数（直接或间接）且未断开计算的参数
+        affected = set(self.free)
+        self.order: List[Parameter] = []
+        for param in self.cone:
+            if param in affected or not param.calculation_func or param.unlinked:
+                continue
+            if any(dep in affected for dep in param.dependencies):
+                affected.add(param)
+                self.order.append(param)
+
+    def evaluate(self, values: Sequence[Any]) -> Any:
+        """代入自由参数的取值（标量或等长数组）并返回目标参数的值
+
+        Raises:
+            ValueError: 锥体中有参数计算失败
+        """
+        for param, value in zip(self.free, values):
+            param._value = value
+        for param in self.order:
+            param.calculate()
+        return self.target._value
+
+    def evaluate_point(self, values: Sequence[float]) -> float:
+        """逐点计算，失败或结果不是有限数值时返回 NaN"""
+        try:
+            result = float(self.evaluate([float(v) for v in values]))
+        except Exception:
+            return float("nan")
+        return result if np.isfinite(result) else float("nan")
+
+    def evaluate_vectorized(self, columns: Sequence[np.ndarray]) -> Optional[np.ndarray]:
+        """向量化计算；计算代码不支持数组时返回None"""
+        n = len(columns[0])
+        originals = [column.copy() for column in columns]
+        try:
+            with np.errstate(all="ignore"):
+                result = np.asarray(self.evaluate(columns), dtype=np.float64)
+        except Exception:
+            return None
+        if result.ndim == 0:
+            result = np.full(n, float(result))
+        if result.shape != (n,):
+            return None
+        # 计算代码原地修改了输入数组，结果不可信
+        if any(not np.array_equal(column, original) for column, original in zip(columns, originals)):
+            return None
+        result = np.where(np.isfinite(result), result, np.nan)
+
+        # 抽查几个点：向量化与逐点计算的语义可能不同（如整数除法、比较运算）
+        for index in sorted({0, n // 2, n - 1}):
+            expected = self.evaluate_point([column[index] for column in originals])
+            if not np.isclose(result[index], expected, rtol=1e-9, atol=0.0, equal_nan=True):
+                return None
+        return result
+
+    def spec(self) -> Optional[ConeSpec]:
+        """锥体的可序列化描述；有计算函数不是代码字符串（无法传给子进程）时返回None"""
+        index = {param: i for i, param in enumerate(self.cone)}
+        params = []
+        for param in self.cone:
+            if param.calculation_func is not None and not isinstance(param.calculation_func, str):
+                return None
+            params.append((
+                param.name, param._value, param.calculation_func,
+                [index[dep] for dep in param.dependencies if dep in index], param.unlinked
+            ))
+        return params, index[self.target], [index[param] for param in self.free]
+
+    @classmethod
+    def from_spec(cls, spec: ConeSpec) -> "ConeEvaluator":
+        params, target_index, free_indices = spec
+        rebuilt: List[Parameter] = []
+        for name, value, calculation_func, dep_indices, unlinked in params:
+            rebuilt.append(Parameter(
+                name, value,
+                calculation_func=calculation_func,
+                unlinked=unlinked,
+                dependencies=[rebuilt[i] for i in dep_indices]
+            ))
+        return cls(rebuilt[target_index], [rebuilt[i] for i in free_indices])
+
+
+def _evaluate_chunk(spec: ConeSpec, points: np.ndarray) -> np.ndarray:
+    """子进程中逐点计算一块输入点（points 每行是一组自由参数取值）"""
+    evaluator = ConeEvaluator.from_spec(spec)
+    return np.array([evaluator.evaluate_point(point) for point in points], dtype=np.float64)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _parallel_workers() -> int:
+    return min(os.cpu_count() or 1, PerformanceConstants.BATCH_PARALLEL_WORKERS)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """进程内共享的进程池（首次使用时创建）
+
+    使用 spawn 方式启动子进程：服务进程中有多个线程，fork 可能复制到被其他线程持有的锁。
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=_parallel_workers(),
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def evaluate_grid(evaluator: ConeEvaluator, columns: Sequence[np.ndarray], job=None) -> Tuple[np.ndarray, str]:
+    """计算一批输入点
+
+    Args:
+        columns: 每个自由参数一列取值，各列等长
+        job: 可选的后台任务，用于上报进度和响应取消
+    Returns:
+        (结果数组（失败的点为 NaN）, 计算方式："vectorized"/"parallel"/"serial")
+    """
+    columns = [np.asarray(column, dtype=np.float64) for column in columns]
+    n = len(columns[0])
+    if job is not None:
+        job.report(0, n)
+
+    result = evaluator.evaluate_vectorized(columns)
+    if result is not None:
+        return result, "vectorized"
+
+    # 由粗到细的顺序：并行分块和逐点计算时，先完成的点都大致均匀地覆盖整个网格
+    order = coarse_to_fine_order(n, PerformanceConstants.SWEEP_COARSE_POINTS)
+    points = np.column_stack(columns)
+    result = np.full(n, np.nan)
+
+    spec = evaluator.spec() if n >= PerformanceConstants.BATCH_PARALLEL_MIN_POINTS and _parallel_workers() > 1 else None
+    if spec is not None:
+        chunk_size = PerformanceConstants.BATCH_PARALLEL_CHUNK_POINTS
+        pool = _get_pool()
+        pending: Dict[Any, np.ndarray] = {}
+        for start in range(0, n, chunk_size):
+            indices = order[start:start + chunk_size]
+            pending[pool.submit(_evaluate_chunk, spec, points[indices])] = indices
+        done = 0
+        try:
+            while pending:
+                if job is not None:
+                    job.checkpoint()
+                finished, _ = wait(pending, timeout=PerformanceConstants.JOB_POLL_INTERVAL_MS / 1000,
+                                   return_when=FIRST_COMPLETED)
+                for future in finished:
+                    indices = pending.pop(future)
+                    result[indices] = future.result()
+                    done += len(indices)
+                if job is not None:
+                    job.report(done, n)
+        finally:
+            for future in pending:
+                future.cancel()
+        return result, "parallel"
+
+    for count, index in enumerate(order):
+        if job is not None:
+            job.checkpoint()
+            job.report(count, n)
+        result[index] = evaluator.evaluate_point(points[index])
+    return result, "serial"
@@ -7,291 +7,336 @@ from dash import html, Output, Input
 
 
 def register_arrow_display_callback(app):
-    """注册Pin悬停箭头显示系统回调"""
+    """注册Pin悬停箭头显示系统回调
+
+    服务端只发送边模型的增量（见 edge_index.py），客户端把它合并到本地的边表中；
+    pin 悬停通过事件委托处理，箭头按边ID增量更新 SVG 层，重绘由 requestAnimationFrame
+    合并，并在画布尺寸变化（ResizeObserver）时触发。
+    """
     app.clientside_callback(
         """
-        function(connections_data, canvas_children) {
+        function(edge_data) {
             try {
-                var arrowContainer = document.getElementById('arrows-overlay-dynamic');
-                    if (!arrowContainer) {
-                        console.log('箭头容器未找到');
-                        return;
+                if (!window.archdashArrows) {
+                    window.archdashArrows = createArrowLayer();
+                }
+                if (edge_data) {
+                    window.archdashArrows.apply(edge_data);
+                }
+            } catch (error) {
+                console.error('客户端回调错误:', error);
+            }
+            return window.dash_clientside.no_update;
+
+            function createArrowLayer() {
+                var layer = {
+                    edges: {},       // edge_id -> [源节点, 源参数序号, 目标节点, 目标参数序号]
+                    names: {},       // 节点ID -> [节点名, [参数名...]]
+                    byPin: null,     // pin id -> [edge_id...]，边表变化后惰性重建
+                    activePin: null,
+                    container: null,
+                    paths: {},       // edge_id -> 已绘制的svg元素
+                    frame: null
+                };
+
+                function pinId(nodeId, paramIdx) {
+                    return 'pin-' + nodeId + '-' + paramIdx;
+                }
+
+                function edgesForPin(id) {
+                    if (!layer.byPin) {
+                        layer.byPin = {};
+                        Object.keys(layer.edges).forEach(function(edgeId) {
+                            var edge = layer.edges[edgeId];
+                            [pinId(edge[0], edge[1]), pinId(edge[2], edge[3])].forEach(function(pin) {
+                                (layer.byPin[pin] = layer.byPin[pin] || []).push(edgeId);
+                            });
+                        });
                     }
+                    return layer.byPin[id] || [];
+                }
 
-                    // 清除现有箭头
-                    arrowContainer.innerHTML = '';
+                function label(nodeId, paramIdx) {
+                    var entry = layer.names[nodeId];
+                    return entry ? entry[0] + '.' + (entry[1][paramIdx] || '') : nodeId;
+                }
 
-                    if (!connections_data || connections_data.length === 0) {
-                        console.log('无依赖关系数据');
+                layer.apply = function(data) {
+                    if (data.reset) {
+                        layer.edges = {};
+                        layer.names = {};
+                    }
+                    data.removed.forEach(function(edgeId) {
+                        delete layer.edges[edgeId];
+                    });
+                    data.added.forEach(function(record) {
+                        layer.edges[record[0]] = record.slice(1);
+                    });
+                    Object.assign(layer.names, data.names);
+                    layer.byPin = null;
+                    layer.scheduleRedraw();
+                };
+
+                layer.scheduleRedraw = function() {
+                    if (layer.frame === null) {
+                        layer.frame = window.requestAnimationFrame(function() {
+                            layer.frame = null;
+                            redraw();
+                        });
+                    }
+                };
+
+                // 只重绘与当前悬停pin相关的箭头：保留仍然有效的路径并更新坐标，移除其余路径
+                function redraw() {
+                    var container = document.getElementById('arrows-overlay-dynamic');
+                    if (container !== layer.container) {
+                        // 画布全量重绘后覆盖层是新元素，旧的路径随旧元素一起丢弃
+                        layer.container = container;
+                        layer.paths = {};
+                    }
+                    if (!container) {
                         return;
                     }
 
-                    console.log('初始化pin悬停箭头系统，连接数:', connections_data.length);
+                    var wanted = {};
+                    if (layer.activePin && document.getElementById(layer.activePin)) {
+                        edgesForPin(layer.activePin).forEach(function(edgeId) {
+                            wanted[edgeId] = true;
+                        });
+                    }
+
+                    Object.keys(layer.paths).forEach(function(edgeId) {
+                        if (!wanted[edgeId]) {
+                            layer.paths[edgeId].remove();
+                            delete layer.paths[edgeId];
+                        }
+                    });
 
-                    // 存储连接数据到全局变量，供事件处理器使用
-                    window.arrowConnectionsData = connections_data;
-                    window.arrowContainer = arrowContainer;
+                    var containerRect = container.getBoundingClientRect();
+                    Object.keys(wanted).forEach(function(edgeId) {
+                        var svg = drawArrow(edgeId, layer.edges[edgeId], containerRect, layer.paths[edgeId]);
+                        if (svg) {
+                            if (!layer.paths[edgeId]) {
+                                container.appendChild(svg);
+                                layer.paths[edgeId] = svg;
+                            }
+                        } else if (layer.paths[edgeId]) {
+                            layer.paths[edgeId].remove();
+                            delete layer.paths[edgeId];
+                        }
+                    });
+                }
 
-                    // 移除之前的事件监听器（避免重复绑定）
-                    var pinElements = document.querySelectorAll('[id^="pin-"]');
-                    for (var i = 0; i < pinElements.length; i++) {
-                        var pin = pinElements[i];
-                        pin.removeEventListener('mouseenter', window.pinMouseEnter);
-                        pin.removeEventListener('mouseleave', window.pinMouseLeave);
+                // 绘制或更新一条箭头 - 使用SVG路径；无法绘制时返回null
+                function drawArrow(edgeId, edge, containerRect, existing) {
+                    var sourcePinId = pinId(edge[0], edge[1]);
+                    var targetPinId = pinId(edge[2], edge[3]);
+                    var sourcePin = document.getElementById(sourcePinId);
+                    var targetPin = document.getElementById(targetPinId);
+
+                    // 虚拟化画布中，视口外的节点只渲染为占位块，此时箭头连到占位块上
+                    var offscreen = !sourcePin || !targetPin;
+                    sourcePin = sourcePin || document.getElementById('node-' + edge[0]);
+                    targetPin = targetPin || document.getElementById('node-' + edge[2]);
+                    if (!sourcePin || !targetPin) {
+                        return null;
                     }
 
-                    // 定义鼠标进入pin的处理函数
-                    window.pinMouseEnter = function(event) {
-                        var pinId = event.target.id;
-                        console.log('鼠标进入pin:', pinId);
+                    var sourceRect = sourcePin.getBoundingClientRect();
+                    var targetRect = targetPin.getBoundingClientRect();
 
-                        // 添加active类
-                        event.target.classList.add('active');
+                    // 计算源pin的右边中点作为起始点
+                    var x1 = sourceRect.right - containerRect.left;
+                    var y1 = sourceRect.top + sourceRect.height / 2 - containerRect.top;
 
-                        // 清除现有箭头
-                        window.arrowContainer.innerHTML = '';
+                    // 计算目标pin的左边中点作为结束点
+                    var x2 = targetRect.left - containerRect.left;
+                    var y2 = targetRect.top + targetRect.height / 2 - containerRect.top;
 
-                        // 找到与当前pin相关的所有连接
-                        var relevantConnections = window.arrowConnectionsData.filter(function(conn) {
-                            return conn.source_pin_id === pinId || conn.target_pin_id === pinId;
-                        });
+                    var dx = x2 - x1;
+                    var dy = y2 - y1;
+                    var length = Math.sqrt(dx * dx + dy * dy);
+                    if (length <= 5) {
+                        return null;
+                    }
 
-                        console.log('找到相关连接:', relevantConnections.length);
+                    // 计算贝塞尔曲线控制点（可选：使用曲线让箭头更美观）
+                    var useCurve = Math.abs(dx) > 100; // 距离较远时使用曲线
+                    var pathData;
+
+                    if (useCurve) {
+                        // 控制点应该在连线方向上偏移，而不是总是向右偏移
+                        var offsetX = dx * 0.3; // 保持dx的符号，确保控制点在正确方向
+                        var cp1x = x1 + offsetX;
+                        var cp1y = y1;
+                        var cp2x = x2 - offsetX;
+                        var cp2y = y2;
+
+                        // 对于水平线，添加一点垂直偏移让曲线更明显
+                        if (Math.abs(dy) < 1) {
+                            var verticalOffset = Math.min(Math.abs(dx) * 0.1, 20); // 最大20像素的垂直偏移
+                            cp1y = y1 - verticalOffset;
+                            cp2y = y2 - verticalOffset;
+                        }
 
-                        // 绘制相关的箭头
-                        drawArrows(relevantConnections, pinId);
-                    };
+                        pathData = 'M' + x1 + ',' + y1 + ' C' + cp1x + ',' + cp1y + ' ' + cp2x + ',' + cp2y + ' ' + x2 + ',' + y2;
+                    } else {
+                        // 使用直线
+                        pathData = 'M' + x1 + ',' + y1 + ' L' + x2 + ',' + y2;
+                    }
 
-                    // 定义鼠标离开pin的处理函数
-                    window.pinMouseLeave = function(event) {
-                        var pinId = event.target.id;
-                        console.log('鼠标离开pin:', pinId);
+                    if (existing) {
+                        var existingPath = existing.querySelector('path.arrow-path');
+                        existingPath.setAttribute('d', pathData);
+                        existingPath.setAttribute('stroke-dasharray', offscreen ? '2 6' : 'none');
+                        return existing;
+                    }
 
-                        // 移除active类
-                        event.target.classList.remove('active');
+                    // 悬停pin相关的连接使用活跃样式
+                    var arrowColor = '#e74c3c';
+                    var strokeWidth = '3';
+
+                    // 创建SVG元素
+                    var svg = document.createElementNS('http://www.w3.org/2000/svg', 'svg');
+                    svg.style.position = 'absolute';
+                    svg.style.top = '0';
+                    svg.style.left = '0';
+                    svg.style.width = '100%';
+                    svg.style.height = '100%';
+                    svg.style.pointerEvents = 'none';
+                    svg.style.zIndex = '1002';
+                    svg.style.overflow = 'visible';
+
+                    // 创建定义区域（包含渐变、滤镜等）
+                    var defs = document.createElementNS('http://www.w3.org/2000/svg', 'defs');
+
+                    // 创建线性渐变：半透明红色到深红色
+                    var gradient = document.createElementNS('http://www.w3.org/2000/svg', 'linearGradient');
+                    var gradientId = 'gradient-' + edgeId + '-active';
+                    gradient.setAttribute('id', gradientId);
+                    gradient.setAttribute('x1', '0%');
+                    gradient.setAttribute('y1', '0%');
+                    gradient.setAttribute('x2', '100%');
+                    gradient.setAttribute('y2', '0%');
+
+                    var startColor = 'rgba(231, 76, 60, 0.8)';
+                    var endColor = 'rgba(192, 57, 43, 0.9)';
+                    [['0%', startColor], ['70%', endColor], ['100%', startColor]].forEach(function(stop) {
+                        var stopElement = document.createElementNS('http://www.w3.org/2000/svg', 'stop');
+                        stopElement.setAttribute('offset', stop[0]);
+                        stopElement.setAttribute('stop-color', stop[1]);
+                        gradient.appendChild(stopElement);
+                    });
+                    defs.appendChild(gradient);
+
+                    // 创建箭头标记
+                    var marker = document.createElementNS('http://www.w3.org/2000/svg', 'marker');
+                    var arrowId = 'arrow-' + edgeId + '-active';
+                    marker.setAttribute('id', arrowId);
+                    marker.setAttribute('viewBox', '0 0 12 12');
+                    marker.setAttribute('refX', '11');
+                    marker.setAttribute('refY', '6');
+                    marker.setAttribute('markerWidth', '8');
+                    marker.setAttribute('markerHeight', '8');
+                    marker.setAttribute('orient', 'auto');
+                    marker.setAttribute('markerUnits', 'strokeWidth');
+
+                    var arrowPath = document.createElementNS('http://www.w3.org/2000/svg', 'path');
+                    arrowPath.setAttribute('d', 'M2,2 L10,6 L2,10 L4,6 Z');
+                    arrowPath.setAttribute('fill', 'url(#' + gradientId + ')');
+                    marker.appendChild(arrowPath);
+                    defs.appendChild(marker);
+                    svg.appendChild(defs);
+
+                    // 创建主路径
+                    var path = document.createElementNS('http://www.w3.org/2000/svg', 'path');
+                    path.setAttribute('class', 'arrow-path');
+                    path.setAttribute('d', pathData);
+                    path.setAttribute('stroke', 'url(#' + gradientId + ')');
+                    path.setAttribute('stroke-width', strokeWidth);
+                    path.setAttribute('fill', 'none');
+                    path.setAttribute('stroke-linecap', 'round');
+                    path.setAttribute('stroke-linejoin', 'round');
+                    path.setAttribute('marker-end', 'url(#' + arrowId + ')');
+                    path.style.transition = 'all 0.4s cubic-bezier(0.4, 0, 0.2, 1)';
+                    path.style.cursor = 'pointer';
+                    path.style.pointerEvents = 'stroke';
+
+                    // 连到视口外占位块的箭头用虚线表示，否则使用流动动画
+                    if (offscreen) {
+                        path.setAttribute('stroke-dasharray', '2 6');
+                    } else {
+                        path.style.strokeDasharray = '5 5';
+                        path.style.strokeDashoffset = '0';
+                        path.style.animation = 'flow-dash 2s linear infinite';
+                    }
 
-                        // 延迟清除箭头（给用户时间移动到箭头上）
-                        setTimeout(function() {
-                            // 检查是否还有active的pin
-                            var activePins = document.querySelectorAll('.param-pin.active');
-                            if (activePins.length === 0) {
-                                window.arrowContainer.innerHTML = '';
-                                console.log('清除所有箭头');
-                            }
-                        }, 200);
-                    };
-
-                    // 绘制箭头的函数 - 使用SVG路径
-                    function drawArrows(connections, activePinId) {
-                        var containerRect = window.arrowContainer.getBoundingClientRect();
-
-                        for (var i = 0; i < connections.length; i++) {
-                            var connection = connections[i];
-
-                            var sourcePin = document.getElementById(connection.source_pin_id);
-                            var targetPin = document.getElementById(connection.target_pin_id);
-
-                            if (sourcePin && targetPin) {
-                                var sourceRect = sourcePin.getBoundingClientRect();
-                                var targetRect = targetPin.getBoundingClientRect();
-
-                                // 计算源pin的右边中点作为起始点
-                                var x1 = sourceRect.right - containerRect.left;
-                                var y1 = sourceRect.top + sourceRect.height / 2 - containerRect.top;
-
-                                // 计算目标pin的左边中点作为结束点
-                                var x2 = targetRect.left - containerRect.left;
-                                var y2 = targetRect.top + targetRect.height / 2 - containerRect.top;
-
-                                var dx = x2 - x1;
-                                var dy = y2 - y1;
-                                var length = Math.sqrt(dx * dx + dy * dy);
-
-                                if (length > 5) {
-                                    // 确定箭头颜色和样式
-                                    var isActiveConnection = (connection.source_pin_id === activePinId || connection.target_pin_id === activePinId);
-                                    var arrowColor = isActiveConnection ? '#e74c3c' : '#007bff';
-                                    var arrowOpacity = isActiveConnection ? '1' : '0.6';
-                                    var strokeWidth = isActiveConnection ? '3' : '2';
-
-                                    // 创建SVG元素
-                                    var svg = document.createElementNS('http://www.w3.org/2000/svg', 'svg');
-                                    svg.style.position = 'absolute';
-                                    svg.style.top = '0';
-                                    svg.style.left = '0';
-                                    svg.style.width = '100%';
-                                    svg.style.height = '100%';
-                                    svg.style.pointerEvents = 'none';
-                                    svg.style.zIndex = isActiveConnection ? '1002' : '1000';
-                                    svg.style.overflow = 'visible';
-
-                                    // 创建定义区域（包含渐变、滤镜等）
-                                    var defs = document.createElementNS('http://www.w3.org/2000/svg', 'defs');
-
-                                    // 创建线性渐变
-                                    var gradient = document.createElementNS('http://www.w3.org/2000/svg', 'linearGradient');
-                                    var gradientId = 'gradient-' + i + '-' + (isActiveConnection ? 'active' : 'normal');
-                                    gradient.setAttribute('id', gradientId);
-                                    gradient.setAttribute('x1', '0%');
-                                    gradient.setAttribute('y1', '0%');
-                                    gradient.setAttribute('x2', '100%');
-                                    gradient.setAttribute('y2', '0%');
-
-                                    // 根据连接状态设置渐变色
-                                    var startColor, endColor;
-                                    if (isActiveConnection) {
-                                        startColor = 'rgba(231, 76, 60, 0.8)';   // 活跃连接：半透明红色
-                                        endColor = 'rgba(192, 57, 43, 0.9)';     // 到深红色
-                                    } else {
-                                        startColor = 'rgba(52, 152, 219, 0.6)';  // 普通连接：半透明蓝色
-                                        endColor = 'rgba(41, 128, 185, 0.7)';    // 到深蓝色
-                                    }
-
-                                    var stop1 = document.createElementNS('http://www.w3.org/2000/svg', 'stop');
-                                    stop1.setAttribute('offset', '0%');
-                                    stop1.setAttribute('stop-color', startColor);
-
-                                    var stop2 = document.createElementNS('http://www.w3.org/2000/svg', 'stop');
-                                    stop2.setAttribute('offset', '70%');
-                                    stop2.setAttribute('stop-color', endColor);
-
-                                    var stop3 = document.createElementNS('http://www.w3.org/2000/svg', 'stop');
-                                    stop3.setAttribute('offset', '100%');
-                                    stop3.setAttribute('stop-color', startColor);
-
-                                    gradient.appendChild(stop1);
-                                    gradient.appendChild(stop2);
-                                    gradient.appendChild(stop3);
-                                    defs.appendChild(gradient);
-
-                                    // 创建箭头标记
-                                    var marker = document.createElementNS('http://www.w3.org/2000/svg', 'marker');
-                                    var arrowId = 'arrow-' + i + '-' + (isActiveConnection ? 'active' : 'normal');
-
-                                    marker.setAttribute('id', arrowId);
-                                    marker.setAttribute('viewBox', '0 0 12 12');
-                                    marker.setAttribute('refX', '11');
-                                    marker.setAttribute('refY', '6');
-                                    marker.setAttribute('markerWidth', '8');
-                                    marker.setAttribute('markerHeight', '8');
-                                    marker.setAttribute('orient', 'auto');
-                                    marker.setAttribute('markerUnits', 'strokeWidth');
-
-                                    // 创建箭头路径（改为更优雅的形状）
-                                    var arrowPath = document.createElementNS('http://www.w3.org/2000/svg', 'path');
-                                    arrowPath.setAttribute('d', 'M2,2 L10,6 L2,10 L4,6 Z');  // 更优雅的箭头形状
-                                    arrowPath.setAttribute('fill', 'url(#' + gradientId + ')');
-
-                                    marker.appendChild(arrowPath);
-                                    defs.appendChild(marker);
-                                    svg.appendChild(defs);
-
-                                    // 计算贝塞尔曲线控制点（可选：使用曲线让箭头更美观）
-                                    var useCurve = Math.abs(dx) > 100; // 距离较远时使用曲线
-                                    var pathData;
-
-                                    if (useCurve) {
-                                        // 修复：正确计算贝塞尔曲线控制点
-                                        // 控制点应该在连线方向上偏移，而不是总是向右偏移
-                                        var offsetX = dx * 0.3; // 保持dx的符号，确保控制点在正确方向
-                                        var cp1x = x1 + offsetX;
-                                        var cp1y = y1;
-                                        var cp2x = x2 - offsetX;
-                                        var cp2y = y2;
-
-                                        // 对于水平线，添加一点垂直偏移让曲线更明显
-                                        if (Math.abs(dy) < 1) {
-                                            var verticalOffset = Math.min(Math.abs(dx) * 0.1, 20); // 最大20像素的垂直偏移
-                                            cp1y = y1 - verticalOffset;
-                                            cp2y = y2 - verticalOffset;
-                                        }
-
-                                        pathData = 'M' + x1 + ',' + y1 + ' C' + cp1x + ',' + cp1y + ' ' + cp2x + ',' + cp2y + ' ' + x2 + ',' + y2;
-                                    } else {
-                                        // 使用直线
-                                        pathData = 'M' + x1 + ',' + y1 + ' L' + x2 + ',' + y2;
-                                    }
-
-                                    // 创建主路径
-                                    var path = document.createElementNS('http://www.w3.org/2000/svg', 'path');
-                                    path.setAttribute('d', pathData);
-                                    path.setAttribute('stroke', 'url(#' + gradientId + ')');
-                                    path.setAttribute('stroke-width', strokeWidth);
-                                    path.setAttribute('fill', 'none');
-                                    path.setAttribute('stroke-linecap', 'round');
-                                    path.setAttribute('stroke-linejoin', 'round');
-                                    path.setAttribute('marker-end', 'url(#' + arrowId + ')');
-                                    path.style.transition = 'all 0.4s cubic-bezier(0.4, 0, 0.2, 1)';
-
-                                    // 添加交互效果
-                                    path.style.cursor = 'pointer';
-                                    path.style.pointerEvents = 'stroke';
-
-                                    // 添加流动动画（可选）
-                                    if (isActiveConnection) {
-                                        var animationLength = length;
-                                        path.style.strokeDasharray = '5 5';
-                                        path.style.strokeDashoffset = '0';
-                                        path.style.animation = 'flow-dash 2s linear infinite';
-                                    }
-
-                                    // 增强的悬停效果
-                                    path.addEventListener('mouseenter', function() {
-                                        this.setAttribute('stroke-width', parseFloat(strokeWidth) + 2);
-                                        this.style.opacity = '1';
-
-                                        // 添加脉冲动画
-                                        this.style.animation = 'pulse-glow 1s ease-in-out infinite alternate';
-                                    });
-
-                                    path.addEventListener('mouseleave', function() {
-                                        this.setAttribute('stroke-width', strokeWidth);
-                                        this.style.opacity = '';
-
-                                        // 恢复原始动画
-                                        if (isActiveConnection) {
-                                            this.style.animation = 'flow-dash 2s linear infinite';
-                                        } else {
-                                            this.style.animation = 'none';
-                                        }
-                                    });
-
-                                    // 设置工具提示
-                                    var title = document.createElementNS('http://www.w3.org/2000/svg', 'title');
-                                    title.textContent = connection.source_node_name + '.' + connection.source_param_name + 
-                                                      ' → ' + connection.target_node_name + '.' + connection.target_param_name;
-                                    path.appendChild(title);
-
-                                    svg.appendChild(path);
-
-                                    // 添加箭头出现动画
-                                    svg.style.animation = 'arrow-appear 0.6s cubic-bezier(0.4, 0, 0.2, 1) forwards';
-
-                                    window.arrowContainer.appendChild(svg);
-                                }
-                            }
-                        }
+                    // 增强的悬停效果
+                    path.addEventListener('mouseenter', function() {
+                        this.setAttribute('stroke-width', parseFloat(strokeWidth) + 2);
+                        this.style.opacity = '1';
+                        this.style.animation = 'pulse-glow 1s ease-in-out infinite alternate';
+                    });
+                    path.addEventListener('mouseleave', function() {
+                        this.setAttribute('stroke-width', strokeWidth);
+                        this.style.opacity = '';
+                        this.style.animation = offscreen ? 'none' : 'flow-dash 2s linear infinite';
+                    });
+
+                    // 设置工具提示
+                    var title = document.createElementNS('http://www.w3.org/2000/svg', 'title');
+                    title.textContent = label(edge[0], edge[1]) + ' → ' + label(edge[2], edge[3]);
+                    path.appendChild(title);
+                    svg.appendChild(path);
+
+                    // 添加箭头出现动画
+                    svg.style.animation = 'arrow-appear 0.6s cubic-bezier(0.4, 0, 0.2, 1) forwards';
+                    return svg;
+                }
+
+                // pin悬停使用事件委托，画布重绘后无需重新绑定监听器
+                document.addEventListener('mouseover', function(event) {
+                    var pin = event.target.closest && event.target.closest('.param-pin');
+                    if (!pin || pin.id === layer.activePin) {
+                        return;
                     }
+                    document.querySelectorAll('.param-pin.active').forEach(function(activePin) {
+                        activePin.classList.remove('active');
+                    });
+                    pin.classList.add('active');
+                    layer.activePin = pin.id;
+                    layer.scheduleRedraw();
+                });
 
-                    // 为所有pin添加事件监听器
-                    for (var i = 0; i < pinElements.length; i++) {
-                        var pin = pinElements[i];
-                        pin.addEventListener('mouseenter', window.pinMouseEnter);
-                        pin.addEventListener('mouseleave', window.pinMouseLeave);
+                document.addEventListener('mouseout', function(event) {
+                    var pin = event.target.closest && event.target.closest('.param-pin');
+                    if (!pin || pin.contains(event.relatedTarget)) {
+                        return;
                     }
+                    pin.classList.remove('active');
 
-                    console.log('Pin悬停事件监听器已设置，总pin数:', pinElements.length);
+                    // 延迟清除箭头（给用户时间移动到箭头上）
+                    setTimeout(function() {
+                        if (!document.querySelector('.param-pin.active')) {
+                            layer.activePin = null;
+                            layer.scheduleRedraw();
+                        }
+                    }, 200);
+                });
 
-            } catch (error) {
-                console.error('客户端回调错误:', error);
-            }
+                // 画布尺寸变化（节点增删、移动、窗口缩放）时重新计算箭头坐标
+                var canvas = document.getElementById('canvas-container');
+                if (canvas && window.ResizeObserver) {
+                    new ResizeObserver(layer.scheduleRedraw).observe(canvas);
+                }
+                window.addEventListener('resize', layer.scheduleRedraw);
 
-            return window.dash_clientside.no_update;
+                return layer;
+            }
         }
         """,
-        Output("arrows-overlay-dynamic", "style"),
+        Output("arrow-connections-data", "id"),  # 虚拟输出
         Input("arrow-connections-data", "data"),
-        Input("canvas-container", "children"),
         prevent_initial_call=True
     )
 
@@ -423,9 +468,203 @@ def register_theme_restore_callback(app):
     )
 
 
+def register_shared_param_menu_callback(app):
+    """注册精简渲染模式下共享参数菜单和类型提示框的回调
+
+    精简模式的参数行不再各自渲染 DropdownMenu 和 Tooltip，而是通过事件委托
+    共用页面上唯一的菜单和提示框，目标参数写入 param-menu-target。
+    """
+    app.clientside_callback(
+        """
+        function() {
+            if (window.sharedParamMenuInstalled) {
+                return window.dash_clientside.no_update;
+            }
+            window.sharedParamMenuInstalled = true;
+
+            const menu = document.getElementById('param-shared-menu');
+            const tooltip = document.getElementById('param-shared-tooltip');
+
+            function hideMenu() {
+                menu.classList.remove('show');
+                document.querySelectorAll('.node-container').forEach(node => {
+                    node.classList.remove('dropdown-active');
+                });
+            }
+
+            document.addEventListener('click', function(event) {
+                const button = event.target.closest('.lean-param-menu-btn');
+                if (button) {
+                    const row = button.closest('.lean-param-row');
+                    const index = parseInt(row.dataset.index, 10);
+                    window.dash_clientside.set_props('param-menu-target', {
+                        data: {node: row.dataset.node, index: index}
+                    });
+
+                    document.getElementById('param-menu-move-up').classList.toggle('disabled', index === 0);
+                    document.getElementById('param-menu-move-down').classList.toggle('disabled', row.dataset.last === 'true');
+
+                    const rect = button.getBoundingClientRect();
+                    menu.classList.add('show');
+                    menu.style.top = rect.bottom + 'px';
+                    menu.style.left = Math.max(0, rect.right - menu.offsetWidth) + 'px';
+                    event.stopPropagation();
+                    return;
+                }
+                // 点击菜单项或菜单外部区域都关闭菜单
+                if (menu.classList.contains('show')) {
+                    hideMenu();
+                }
+            }, true);
+
+            document.addEventListener('focusin', function(event) {
+                const input = event.target.closest('.lean-param-row .param-input');
+                if (!input) {
+                    return;
+                }
+                const row = input.closest('.lean-param-row');
+                const rect = input.getBoundingClientRect();
+                tooltip.textContent = '类型: ' + (row.dataset.type || '未知');
+                tooltip.style.top = (rect.top - 4) + 'px';
+                tooltip.style.left = (rect.left + rect.width / 2) + 'px';
+                tooltip.classList.add('show');
+            });
+
+            document.addEventListener('focusout', function(event) {
+                if (event.target.closest('.lean-param-row .param-input')) {
+                    tooltip.classList.remove('show');
+                }
+            });
+
+            return window.dash_clientside.no_update;
+        }
+        """,
+        Output("param-shared-menu", "title"),  # 虚拟输出
+        Input("param-shared-menu", "id")
+    )
+
+
+def register_canvas_viewport_callback(app):
+    """注册虚拟化画布的视口上报回调
+
+    画布带有 data-virtual 标记时，在滚动、窗口缩放和画布内容变化后把视口范围
+    （画布坐标）和已渲染节点的实测高度写入 canvas-viewport，由服务端替换占位块。
+    """
+    app.clientside_callback(
+        """
+        function(canvas_children) {
+            function measureViewport() {
+                const canvas = document.getElementById('canvas-container');
+                if (!canvas || !canvas.querySelector('[data-virtual]')) {
+                    return null;
+                }
+                const rect = canvas.getBoundingClientRect();
+                // 按100像素取整，小幅滚动不产生新的请求
+                const top = Math.max(0, Math.floor(-rect.top / 100) * 100);
+                const bottom = Math.ceil((window.innerHeight - rect.top) / 100) * 100;
+                const heights = {};
+                canvas.querySelectorAll('.node-container[id^="node-"]').forEach(function(node) {
+                    const style = window.getComputedStyle(node);
+                    heights[node.id.slice(5)] = Math.round(
+                        node.offsetHeight + parseFloat(style.marginTop) + parseFloat(style.marginBottom)
+                    );
+                });
+                const viewport = {top: top, bottom: bottom, heights: heights};
+                const key = JSON.stringify(viewport);
+                if (key === window.canvasViewportKey) {
+                    return null;
+                }
+                window.canvasViewportKey = key;
+                return viewport;
+            }
+
+            if (!window.canvasViewportInstalled) {
+                window.canvasViewportInstalled = true;
+                let scheduled = false;
+                function scheduleReport() {
+                    if (scheduled) {
+                        return;
+                    }
+                    scheduled = true;
+                    window.requestAnimationFrame(function() {
+                        scheduled = false;
+                        const viewport = measureViewport();
+                        if (viewport) {
+                            window.dash_clientside.set_props('canvas-viewport', {data: viewport});
+                        }
+                    });
+                }
+                window.addEventListener('scroll', scheduleReport, {passive: true});
+                window.addEventListener('resize', scheduleReport);
+            }
+
+            // 等待本次画布更新完成布局后再测量
+            return new Promise(function(resolve) {
+                window.requestAnimationFrame(function() {
+                    resolve(measureViewport() || window.dash_clientside.no_update);
+                });
+            });
+        }
+        """,
+        Output("canvas-viewport", "data"),
+        Input("canvas-container", "children")
+    )
+
+
+def register_plot_width_callback(app):
+    """注册敏感性分析图表宽度上报回调
+
+    把图表绘图区的像素宽度（按50像素取整）写入 sensitivity-plot-width，
+    服务端据此决定大数据量曲线降采样后的点数；窗口缩放时重新上报。
+    """
+    app.clientside_callback(
+        """
+        function(plot_id) {
+            function measureWidth() {
+                const plot = document.getElementById(plot_id);
+                if (!plot || !plot.offsetWidth) {
+                    return null;
+                }
+                const layout = plot.querySelector('.js-plotly-plot');
+                const size = layout && layout._fullLayout && layout._fullLayout._size;
+                const width = size ? size.w : plot.offsetWidth;
+                return Math.max(50, Math.round(width / 50) * 50);
+            }
+
+            if (!window.plotWidthInstalled) {
+                window.plotWidthInstalled = true;
+                let timer = null;
+                window.addEventListener('resize', function() {
+                    clearTimeout(timer);
+                    timer = setTimeout(function() {
+                        const width = measureWidth();
+                        if (width && width !== window.plotWidthReported) {
+                            window.plotWidthReported = width;
+                            window.dash_clientside.set_props('sensitivity-plot-width', {data: width});
+                        }
+                    }, 200);
+                });
+            }
+
+            const width = measureWidth();
+            if (!width) {
+                return window.dash_clientside.no_update;
+            }
+            window.plotWidthReported = width;
+            return width;
+        }
+        """,
+        Output("sensitivity-plot-width", "data"),
+        Input("sensitivity-plot", "id")
+    )
+
+
 def register_all_clientside_callbacks(app):
     """注册所有客户端回调函数"""
     register_arrow_display_callback(app)
     register_dropdown_zindex_callback(app)
     register_theme_toggle_callback(app)
-    register_theme_restore_callback(app) 
\ No newline at end of file
+    register_theme_restore_callback(app) 
+    register_shared_param_menu_callback(app)
+    register_canvas_viewport_callback(app)
+    register_plot_width_callback(app)
@@ -0,0 +1,63 @@
+"""曲线降采样
+
+使用 LTTB（Largest-Triangle-Three-Buckets）算法把长曲线降到与图表像素宽度相当的点数：
+每个桶中保留与前一个保留点、下一个桶均值构成三角形面积最大的点，能较好地保留
+峰值、拐点等形状特征。
+"""
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """把 (x, y) 降采样到 threshold 个点；点数不超过 threshold 时原样返回
+
+    Args:
+        x: 单调递增的横坐标
+        y: 纵坐标
+        threshold: 目标点数（至少为3）
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    # 首尾两点固定保留，中间的点平均分到 threshold - 2 个桶中
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # 下一个桶的均值（最后一个桶用末尾点）
+        if bucket + 2 < len(edges):
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+            next_x = x[next_start:next_end].mean()
+            next_y = y[next_start:next_end].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        px, py = x[previous], y[previous]
+        areas = np.abs((px - next_x) * (y[start:end] - py) - (px - x[start:end]) * (next_y - py))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return x[selected], y[selected]
+
+
+def downsample_range(x: np.ndarray, y: np.ndarray, x_min: Optional[float], x_max: Optional[float],
+                     threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """只对 [x_min, x_max] 范围内的数据降采样（两侧各多保留一个点，使曲线延伸到坐标轴边缘）
+
+    x_min/x_max 为None时表示不限制。
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    start = 0 if x_min is None else max(int(np.searchsorted(x, x_min, side="left")) - 1, 0)
+    end = len(x) if x_max is None else min(int(np.searchsorted(x, x_max, side="right")) + 1, len(x))
+    return lttb(x[start:end], y[start:end], threshold)
@@ -0,0 +1,145 @@
+"""画布箭头的紧凑边模型
+
+每条依赖边（源参数 -> 目标参数）分配一个整数ID，记录为
+``[edge_id, 源节点ID, 源参数序号, 目标节点ID, 目标参数序号]``，pin 的 DOM id
+由客户端按 ``pin-{节点ID}-{参数序号}`` 拼出。节点名和参数名单独放在 names 表中
+（``{节点ID: [节点名, [参数名...]]}``），只在变化时发送。
+
+服务端为每个计算图维护一个递增的版本号和最近若干次变更的日志，客户端带上
+自己已应用的版本号，服务端只返回此后新增和删除的边；版本落后太多或计算图被
+替换时返回完整数据（reset）。
+"""
+from __future__ import annotations
+
+import itertools
+import weakref
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from constants import PerformanceConstants
+from models import CalculationGraph
+
+EdgeKey = Tuple[str, int, str, int]
+
+_index_serials = itertools.count(1)
+
+
+class EdgeIndex:
+    """单个计算图的边模型"""
+
+    def __init__(self, max_log: int = PerformanceConstants.EDGE_LOG_SIZE):
+        # 区分不同计算图的边模型，避免客户端把旧图的版本号当成新图的
+        self.serial = next(_index_serials)
+        self.version = 0
+        self._ids: Dict[EdgeKey, int] = {}
+        self._next_id = 0
+        self._edges: Dict[int, EdgeKey] = {}
+        self._names: Dict[str, list] = {}
+        # (版本, 新增边ID, 删除边ID, 名称变化的节点ID)
+        self._log: deque = deque(maxlen=max_log)
+
+    def _edge_id(self, key: EdgeKey) -> int:
+        edge_id = self._ids.get(key)
+        if edge_id is None:
+            edge_id = self._next_id
+            self._next_id += 1
+            self._ids[key] = edge_id
+        return edge_id
+
+    def refresh(self, graph: CalculationGraph) -> bool:
+        """按计算图的当前依赖关系更新边模型，有变化时版本号加一并返回True"""
+        locations = {}
+        for node_id, node in graph.nodes.items():
+            for param_idx, param in enumerate(node.parameters):
+                locations[param] = (node_id, param_idx)
+
+        edges: Dict[int, EdgeKey] = {}
+        for node_id, node in graph.nodes.items():
+            for param_idx, param in enumerate(node.parameters):
+                for dep_param in param.dependencies:
+                    source = locations.get(dep_param)
+                    if source is not None:
+                        key = (source[0], source[1], node_id, param_idx)
+                        edges[self._edge_id(key)] = key
+
+        names = {}
+        for _, _, target_node_id, _ in edges.values():
+            names.setdefault(target_node_id, None)
+        for source_node_id, _, _, _ in edges.values():
+            names.setdefault(source_node_id, None)
+        for node_id in names:
+            node = graph.nodes[node_id]
+            names[node_id] = [node.name, [param.name for param in node.parameters]]
+
+        added = [edge_id for edge_id in edges if edge_id not in self._edges]
+        removed = [edge_id for edge_id in self._edges if edge_id not in edges]
+        renamed = [node_id for node_id, value in names.items() if self._names.get(node_id) != value]
+        if not added and not removed and not renamed:
+            return False
+
+        self.version += 1
+        self._log.append((self.version, added, removed, renamed))
+        self._edges = edges
+        self._names = names
+        return True
+
+    def _record(self, edge_id: int) -> list:
+        return [edge_id, *self._edges[edge_id]]
+
+    def payload_since(self, client_version: Optional[int]) -> Optional[Dict[str, Any]]:
+        """返回客户端从 client_version 更新到当前版本所需的数据，已是最新时返回None"""
+        if client_version == self.version:
+            return None
+
+        oldest = self._log[0][0] if self._log else self.version + 1
+        if client_version is None or client_version > self.version or client_version < oldest - 1:
+            return {
+                "index": self.serial,
+                "version": self.version,
+                "reset": True,
+                "added": [self._record(edge_id) for edge_id in self._edges],
+                "removed": [],
+                "names": dict(self._names),
+            }
+
+        added, removed, renamed = set(), set(), set()
+        for version, log_added, log_removed, log_renamed in self._log:
+            if version <= client_version:
+                continue
+            added.update(log_added)
+            removed.update(log_removed)
+            renamed.update(log_renamed)
+
+        added_records: List[list] = [self._record(edge_id) for edge_id in sorted(added) if edge_id in self._edges]
+        for record in added_records:
+            renamed.update((record[1], record[3]))
+        return {
+            "index": self.serial,
+            "version": self.version,
+            "reset": False,
+            "added": added_records,
+            "removed": sorted(edge_id for edge_id in removed if edge_id not in self._edges),
+            "names": {node_id: self._names[node_id] for node_id in renamed if node_id in self._names},
+        }
+
+
+# 计算图 -> EdgeIndex；计算图被替换后随之回收，新图的客户端会收到完整数据
+_EDGE_INDEXES: "weakref.WeakKeyDictionary[CalculationGraph, EdgeIndex]" = weakref.WeakKeyDictionary()
+
+
+def edge_payload(graph: CalculationGraph, client_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """刷新计算图的边模型并返回客户端需要的增量数据，已是最新时返回None
+
+    Args:
+        client_data: 客户端已应用的版本 ``{"index", "version"}``（也可以是上一次收到的完整数据）
+    """
+    index = _EDGE_INDEXES.get(graph)
+    if index is None:
+        index = EdgeIndex()
+        _EDGE_INDEXES[graph] = index
+    index.refresh(graph)
+
+    client_version = None
+    if isinstance(client_data, dict) and client_data.get("index") == index.serial:
+        client_version = client_data.get("version")
+    return index.payload_since(client_version)
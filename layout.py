@@ -1,6 +1,8 @@
 from dash import html, dcc
 import dash_bootstrap_components as dbc
 import dash_ace
+from constants import AppConstants, PerformanceConstants
+from montecarlo import DISTRIBUTIONS
 
 app_layout = dbc.Container([
     html.H1([
@@ -102,6 +104,23 @@ app_layout = dbc.Container([
                             title="保存文件",
                             **{"data-testid": "save-file-button"}
                         ),
+                        # 撤销/重做按钮
+                        html.Button(
+                            "↶", 
+                            id="undo-button", 
+                            className="btn btn-outline-secondary btn-sm",
+                            title="撤销",
+                            style={"marginLeft": "8px"},
+                            **{"data-testid": "undo-button"}
+                        ),
+                        html.Button(
+                            "↷", 
+                            id="redo-button", 
+                            className="btn btn-outline-secondary btn-sm",
+                            title="重做",
+                            style={"marginLeft": "4px"},
+                            **{"data-testid": "redo-button"}
+                        ),
                         # 分隔符1
                         html.Div(
                             style={
@@ -248,6 +267,79 @@ app_layout = dbc.Container([
                                     )
                                 ], width=4),
                             ], className="mb-2"),
+
+                            # 二维扫描：第二输入参数及其范围（勾选"二维扫描"时显示）
+                            dbc.Collapse([
+                                dbc.Row([
+                                    dbc.Col([
+                                        dbc.Label("第二输入参数:", className="mb-1"),
+                                        dbc.InputGroup([
+                                            dbc.Input(
+                                                id="x2-param-display",
+                                                placeholder="点击选择第二输入参数",
+                                                readonly=True,
+                                                className="mb-1"
+                                            ),
+                                            dbc.Button(
+                                                "选择",
+                                                id="x2-param-select-btn",
+                                                color="primary",
+                                                size="sm",
+                                                outline=True
+                                            )
+                                        ])
+                                    ], width=8),
+                                    dbc.Col([
+                                        dbc.Label("显示为:", className="mb-1"),
+                                        dbc.RadioItems(
+                                            options=[
+                                                {"label": "热力图", "value": "heatmap"},
+                                                {"label": "等高线", "value": "contour"}
+                                            ],
+                                            value="heatmap",
+                                            id="sweep-2d-render",
+                                            inline=True,
+                                            style={"fontSize": "0.8rem"}
+                                        )
+                                    ], width=4),
+                                ], className="mb-2"),
+                                dbc.Row([
+                                    dbc.Col([
+                                        dbc.Label("起始值:", className="mb-1"),
+                                        dbc.Input(
+                                            id="x2-start-value",
+                                            type="number",
+                                            value=0,
+                                            size="sm",
+                                            debounce=True,
+                                            className="form-control"
+                                        )
+                                    ], width=4),
+                                    dbc.Col([
+                                        dbc.Label("结束值:", className="mb-1"),
+                                        dbc.Input(
+                                            id="x2-end-value",
+                                            type="number",
+                                            value=100,
+                                            size="sm",
+                                            debounce=True,
+                                            className="form-control"
+                                        )
+                                    ], width=4),
+                                    dbc.Col([
+                                        dbc.Label("步长:", className="mb-1"),
+                                        dbc.Input(
+                                            id="x2-step-value",
+                                            type="number",
+                                            value=10,
+                                            size="sm",
+                                            min=0.1,
+                                            debounce=True,
+                                            className="form-control"
+                                        )
+                                    ], width=4),
+                                ], className="mb-2"),
+                            ], id="sweep-2d-collapse", is_open=False),
                             
                             # 系列名称和累计绘图选项
                             dbc.Row([
@@ -287,9 +379,105 @@ app_layout = dbc.Container([
                                             placement="top"
                                         )
                                     ]),
-                                ], width=4, className="d-flex justify-content-end align-items-center"),
+                                    html.Div([
+                                        dbc.Checklist(
+                                            options=[
+                                                {"label": "自适应", "value": "adaptive"}
+                                            ],
+                                            value=[],
+                                            id="adaptive-sampling-checkbox",
+                                            inline=True,
+                                            style={"fontSize": "0.8rem"}
+                                        ),
+                                        dbc.Tooltip(
+                                            "在曲线变化剧烈处加密采样，平坦处少算点；步长作为最小采样间距",
+                                            target="adaptive-sampling-checkbox",
+                                            placement="top"
+                                        )
+                                    ]),
+                                    html.Div([
+                                        dbc.Checklist(
+                                            options=[
+                                                {"label": "二维扫描", "value": "grid"}
+                                            ],
+                                            value=[],
+                                            id="sweep-2d-checkbox",
+                                            inline=True,
+                                            style={"fontSize": "0.8rem"}
+                                        ),
+                                        dbc.Tooltip(
+                                            "X轴参数与第二输入参数组成网格，结果显示为热力图或等高线图，可导出为 npz 数组",
+                                            target="sweep-2d-checkbox",
+                                            placement="top"
+                                        )
+                                    ]),
+                                ], width=4, className="d-flex flex-column justify-content-center align-items-end"),
                             ], className="mb-2"),
                             
+                            # 不确定性分析：龙卷风图的扰动幅度、蒙特卡洛和龙卷风图按钮（以Y轴参数为输出），局部导数按钮（以X轴参数为输入）
+                            dbc.Row([
+                                dbc.Col([
+                                    dbc.InputGroup([
+                                        dbc.InputGroupText("龙卷风图扰动 ±", style={"fontSize": "0.8rem"}),
+                                        dbc.Input(
+                                            id="tornado-perturbation-input",
+                                            type="number",
+                                            value=AppConstants.TORNADO_DEFAULT_PERTURBATION,
+                                            min=0.1,
+                                            max=99,
+                                            size="sm",
+                                            debounce=True,
+                                            style={"fontSize": "0.8rem"}
+                                        ),
+                                        dbc.InputGroupText("%", style={"fontSize": "0.8rem"})
+                                    ], size="sm"),
+                                    dbc.Tooltip(
+                                        "龙卷风图中Y轴参数上游的每个输入分别按此比例上调、下调",
+                                        target="tornado-perturbation-input",
+                                        placement="top"
+                                    )
+                                ], width=6),
+                                dbc.Col([
+                                    dbc.ButtonGroup([
+                                        dbc.Button(
+                                            [html.Span("蒙特卡洛")],
+                                            id="monte-carlo-btn",
+                                            color="warning",
+                                            size="sm"
+                                        ),
+                                        dbc.Button(
+                                            [html.Span("龙卷风图")],
+                                            id="tornado-btn",
+                                            color="warning",
+                                            outline=True,
+                                            size="sm"
+                                        ),
+                                        dbc.Button(
+                                            [html.Span("局部导数")],
+                                            id="local-derivative-btn",
+                                            color="info",
+                                            outline=True,
+                                            size="sm"
+                                        )
+                                    ], className="w-100"),
+                                    dbc.Tooltip(
+                                        "按上游输入的置信度取样，查看Y轴参数的输出分布",
+                                        target="monte-carlo-btn",
+                                        placement="top"
+                                    ),
+                                    dbc.Tooltip(
+                                        "逐个扰动上游输入，按对Y轴参数的影响排序",
+                                        target="tornado-btn",
+                                        placement="top"
+                                    ),
+                                    dbc.Tooltip(
+                                        "求所有下游参数对X轴参数（勾选二维扫描时还有第二输入参数）的导数，显示在画布中；点击清除按钮移除",
+                                        target="local-derivative-btn",
+                                        placement="top"
+                                    )
+                                ], width=6)
+                            ], className="mb-2"),
+
                             dbc.Row([
                                 dbc.Col([
                                     dbc.ButtonGroup([
@@ -312,14 +500,40 @@ app_layout = dbc.Container([
                                             size="sm"
                                         ),
                                         dbc.Button(
-                                            [html.Span("导出csv")], 
+                                            [html.Span("导出数据")], 
                                             id="export-plot-data-btn", 
                                             color="info", 
                                             size="sm"
                                         )
                                     ], className="w-100")
                                 ])
-                            ])
+                            ]),
+
+                            # 后台计算进度（计算时显示）
+                            html.Div([
+                                dbc.Row([
+                                    dbc.Col([
+                                        dbc.Progress(
+                                            id="sweep-progress",
+                                            value=0,
+                                            label="",
+                                            striped=True,
+                                            animated=True,
+                                            style={"height": "20px"}
+                                        )
+                                    ], width=9, className="d-flex flex-column justify-content-center"),
+                                    dbc.Col([
+                                        dbc.Button(
+                                            "取消",
+                                            id="cancel-sweep-btn",
+                                            color="danger",
+                                            size="sm",
+                                            outline=True,
+                                            className="w-100"
+                                        )
+                                    ], width=3),
+                                ], className="g-1 align-items-center")
+                            ], id="sweep-progress-container", className="mt-2", style={"display": "none"})
                         ], className="p-2 dropdown-container")
                     ], className="glass-card dropdown-safe-card")
                 ], className="p-1 sensitivity-analysis-card", style={"minHeight": "450px"})
@@ -373,17 +587,36 @@ app_layout = dbc.Container([
     ], className="mt-2"),
 
     dcc.Store(id="node-data", data={}),  # 简化为空字典，布局由layout_manager管理
-    dcc.Store(id="arrow-connections-data", data=[]),  # 存储箭头连接数据
+    dcc.Store(id="arrow-connections-data", data=None),  # 箭头边模型的增量数据（见 edge_index.py）
+    dcc.Store(id="arrow-connections-version", data=None),  # 客户端已收到的边模型版本 {index, version}
     dcc.Store(id="dependencies-collapse-state", data={"is_open": False}),  # 存储依赖关系面板折叠状态
-    dcc.Store(id="cumulative-plot-data", data=[]),  # 存储累计绘图数据
+    dcc.Store(id="cumulative-plot-data", data=[]),  # 累计绘图的曲线句柄，数据保存在服务端（见 trace_store.py）
+    dcc.Store(id="plot-trace-handles", data=[]),  # 图表中各曲线（按绘制顺序）对应的句柄，用于缩放重采样和导出
+    dcc.Store(id="sensitivity-plot-width", data=None),  # 图表绘图区的像素宽度，决定降采样点数
+    dcc.Store(id="sweep-job", data=None),  # 正在运行的敏感性分析后台任务（见 jobs.py）
+    dcc.Interval(id="sweep-job-interval", interval=PerformanceConstants.JOB_POLL_INTERVAL_MS, disabled=True),  # 轮询后台任务进度
     dcc.Store(id="selected-x-param", data=None),  # 存储选中的X轴参数
     dcc.Store(id="selected-y-param", data=None),  # 存储选中的Y轴参数
+    dcc.Store(id="selected-x2-param", data=None),  # 存储选中的第二输入参数（二维扫描）
     dcc.Store(id="current-param-type", data="x"),  # 存储当前选择的参数类型
     dcc.Store(id="canvas-events", data=[]),  # 存储画布更新事件
     dcc.Store(id="app-messages", data={"messages": [], "timestamp": 0}),  # 统一消息管理
+    dcc.Store(id="param-menu-target", data=None),  # 精简渲染模式下共享参数菜单当前指向的参数
+    dcc.Store(id="canvas-viewport", data=None),  # 虚拟化画布中客户端上报的视口位置和节点实测高度
     dcc.Download(id="download-graph"),  # 用于下载计算图文件
     dcc.Download(id="download-plot-data"),  # 新增：用于下载绘图数据
 # 移除旧的context menu，使用新的dropdown menu
+
+    # 精简渲染模式下所有参数行共享的操作菜单和类型提示框，由客户端事件委托定位和显示
+    html.Div([
+        html.Button("编辑参数", id="param-menu-edit", className="dropdown-item text-primary"),
+        html.Hr(className="dropdown-divider"),
+        html.Button("删除参数", id="param-menu-delete", className="dropdown-item text-danger"),
+        html.Hr(className="dropdown-divider"),
+        html.Button("上移", id="param-menu-move-up", className="dropdown-item"),
+        html.Button("下移", id="param-menu-move-down", className="dropdown-item"),
+    ], id="param-shared-menu", className="dropdown-menu shared-param-menu"),
+    html.Div(id="param-shared-tooltip", className="shared-param-tooltip"),
     
     # 参数编辑模态窗口
     dbc.Modal([
@@ -428,7 +661,7 @@ app_layout = dbc.Container([
                         "fontSize": "0.85rem",
                         "color": "#495057"
                     })
-                ], width=6),
+                ], width=4),
                 dbc.Col([
                     dbc.Label("置信度:", style={"fontSize": "0.9rem"}),
                     html.Div(id="param-edit-confidence-display", style={
@@ -439,7 +672,22 @@ app_layout = dbc.Container([
                         "fontSize": "0.85rem",
                         "color": "#495057"
                     })
-                ], width=6),
+                ], width=4),
+                dbc.Col([
+                    dbc.Label("不确定性分布:", style={"fontSize": "0.9rem"}),
+                    dcc.Dropdown(
+                        id="param-edit-distribution",
+                        options=[{"label": label, "value": value} for value, label in DISTRIBUTIONS.items()],
+                        value="auto",
+                        clearable=False,
+                        style={"fontSize": "0.85rem"}
+                    ),
+                    dbc.Tooltip(
+                        "蒙特卡洛分析中按置信度对该参数取样的分布类型",
+                        target="param-edit-distribution",
+                        placement="top"
+                    )
+                ], width=4),
             ], className="mb-3"),
             
             dbc.Row([
@@ -632,6 +880,14 @@ app_layout = dbc.Container([
                                 "borderRadius": "0.375rem",
                                 "padding": "10px"
                             }
+                        ),
+                        dbc.Pagination(
+                            id="param-search-page",
+                            max_value=1,
+                            active_page=1,
+                            size="sm",
+                            fully_expanded=False,
+                            className="mt-2 mb-0 justify-content-center"
                         )
                     ])
                 ])
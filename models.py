@@ -1,15 +1,75 @@
 from typing import Dict, List, Optional, Any, Union, Callable, TypeVar, cast, Tuple
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+from collections import deque
 import numpy as np
 import json
+import copy
 from datetime import datetime
 import uuid
 import os
 import traceback
+import hashlib
+from functools import lru_cache
+from contextlib import contextmanager
 
 # 定义类型变量
 T = TypeVar('T', float, int, str)
 
+@lru_cache(maxsize=1024)
+def compile_calculation(code: str):
+    """编译计算函数代码并在进程内缓存
+
+    相同的计算代码（例如多个会话加载的同一示例图）共享同一个代码对象，
+    避免每次计算都重新解析源码。
+    """
+    return compile(code, "<calculation>", "exec")
+
+# 参与内容哈希的参数字段，任何一个变化都会使参数及其下游的内容哈希失效
+_HASHED_FIELDS = frozenset({"_value", "calculation_func", "unlinked", "param_type", "dependencies"})
+
+def _calculation_code_key(calculation_func: Any) -> str:
+    """计算函数的内容标识：代码字符串本身，或可调用对象的限定名与字节码"""
+    if calculation_func is None or isinstance(calculation_func, str):
+        return calculation_func or ""
+    code = getattr(calculation_func, "__code__", None)
+    name = f"{getattr(calculation_func, '__module__', '')}.{getattr(calculation_func, '__qualname__', repr(calculation_func))}"
+    return f"{name}:{code.co_code.hex()}" if code is not None else name
+
+def _hash_fields(param: 'Parameter', include_value: bool = True) -> str:
+    """参数自身参与内容哈希的字段（JSON 编码）"""
+    return json.dumps([
+        param.param_type,
+        _calculation_code_key(param.calculation_func),
+        param.unlinked,
+        repr(param.value) if include_value else None,
+    ], ensure_ascii=False)
+
+def _merkle_hash(param: 'Parameter', visiting: set) -> str:
+    """计算参数的内容哈希，已缓存的上游哈希直接复用
+
+    上游变化时的失效沿计算图的 _dependents_map 传播，因此只有各依赖都与本参数属于同一
+    计算图、且依赖的哈希本身已缓存时才缓存本参数的哈希；依赖不属于计算图（或尚未加入）
+    时每次重新计算，避免上游变化后仍返回过期的缓存。
+    """
+    cached = param.__dict__.get("_content_hash")
+    if cached is not None:
+        return cached
+    if param in visiting:
+        return "cycle"
+    visiting.add(param)
+    digest = hashlib.sha256(_hash_fields(param).encode())
+    graph = param.__dict__.get("_graph")
+    cacheable = True
+    for dep in param.dependencies:
+        digest.update(_merkle_hash(dep, visiting).encode())
+        if dep.__dict__.get("_content_hash") is None or graph is None or dep.__dict__.get("_graph") is not graph:
+            cacheable = False
+    visiting.discard(param)
+    content_hash = digest.hexdigest()
+    if cacheable:
+        object.__setattr__(param, "_content_hash", content_hash)
+    return content_hash
+
 @dataclass
 class Parameter:
     """参数类，用于存储和管理单个参数
@@ -21,8 +81,10 @@ class Parameter:
         description: 参数描述
         confidence: 参数置信度（0-1之间）
         calculation_func: 计算函数（字符串形式）
-        dependencies: 依赖参数列表
+        dependencies: 依赖参数列表；修改时整体赋值或使用 add_dependency，不要原地修改列表
+            （append/pop 等不会使内容哈希失效）
         unlinked: 是否断开计算连接（用户手动设置值时为True）
+        distribution: 蒙特卡洛分析中按置信度取样的分布类型（见 montecarlo.DISTRIBUTIONS）
         _graph: 所属的计算图（用于自动更新传播）
         _calculation_traceback: 新增属性
     """
@@ -33,6 +95,7 @@ class Parameter:
     calculation_func: Optional[str] = None
     dependencies: List['Parameter'] = field(default_factory=list)
     unlinked: bool = False  # 是否断开计算连接
+    distribution: str = "auto"  # 蒙特卡洛取样分布
 
     _value: T = 0.0  # 内部值存储
     _graph: Optional['CalculationGraph'] = field(default=None, repr=False)  # 计算图引用
@@ -49,8 +112,39 @@ class Parameter:
         self.dependencies = kwargs.get('dependencies', [])
         self.unlinked = kwargs.get('unlinked', False)
         self.param_type = kwargs.get('param_type', "float")  # 新增：参数类型，默认为float
+        self.distribution = kwargs.get('distribution', "auto")
         self._graph = kwargs.get('_graph', None)
         self._internal_id = uuid.uuid4()
+
+    def __setattr__(self, name, value):
+        # 任何字段变化都递增版本号，供画布渲染缓存判断参数是否需要重绘
+        if name not in ("_version", "_graph", "_calculation_traceback"):
+            object.__setattr__(self, "_version", self.__dict__.get("_version", 0) + 1)
+        object.__setattr__(self, name, value)
+        if name in _HASHED_FIELDS:
+            self.invalidate_content_hash()
+
+    @property
+    def content_hash(self) -> str:
+        """Merkle 式内容哈希
+
+        由参数类型、计算代码、是否断开计算、当前值以及各依赖参数的内容哈希导出，与对象身份、
+        参数名和节点无关：两个参数（可以在不同会话中）哈希相同，说明它们的值由相同的代码从
+        相同的上游值得到。哈希按需计算并缓存，参数或其任一上游变化时失效，下次访问时只重算
+        失效的部分。
+        """
+        return _merkle_hash(self, set())
+
+    def invalidate_content_hash(self) -> None:
+        """使本参数及所有下游参数（按计算图中注册的依赖关系）的内容哈希失效"""
+        if self.__dict__.get("_content_hash") is None:
+            # 哈希有效的参数，其上游哈希必然有效；已失效说明下游也已失效
+            return
+        object.__setattr__(self, "_content_hash", None)
+        graph = self.__dict__.get("_graph")
+        if graph is not None:
+            for dependent in graph._dependents_map.get(self, ()):
+                dependent.invalidate_content_hash()
     
     @property
     def value(self) -> T:
@@ -87,6 +181,7 @@ class Parameter:
             raise ValueError("参数不能依赖自身")
         if param not in self.dependencies:
             self.dependencies.append(param)
+            self.invalidate_content_hash()
             # 立即在图上更新依赖关系
             if self._graph:
                 self._graph.register_dependency(dependent=self, dependency=param)
@@ -137,7 +232,7 @@ class Parameter:
         }
         
         try:
-            exec(self.calculation_func, safe_globals, local_env)
+            exec(compile_calculation(self.calculation_func), safe_globals, local_env)
             result = local_env.get('result')
             if result is None:
                 # 如果计算函数没有产生 'result'，也视为一种计算失败
@@ -186,6 +281,7 @@ class Parameter:
             "dependencies": [dep.name for dep in self.dependencies],
             "unlinked": self.unlinked,
             "param_type": self.param_type,  # 新增：包含参数类型
+            "distribution": self.distribution,
             "calculation_traceback": self._calculation_traceback
         }
     
@@ -200,7 +296,8 @@ class Parameter:
             confidence=data["confidence"],
             calculation_func=data["calculation_func"],
             unlinked=data.get("unlinked", False),
-            param_type=data.get("param_type", "float")  # 新增：读取参数类型，默认为float（兼容旧格式）
+            param_type=data.get("param_type", "float"),  # 新增：读取参数类型，默认为float（兼容旧格式）
+            distribution=data.get("distribution", "auto")
         )
         
         # 添加依赖
@@ -246,6 +343,12 @@ class Node:
         for key, value in kwargs.items():
             if key != 'node_type':
                 setattr(self, key, value)
+
+    def __setattr__(self, name, value):
+        # 名称、描述、参数列表等变化时递增版本号
+        if name != "_version":
+            object.__setattr__(self, "_version", self.__dict__.get("_version", 0) + 1)
+        object.__setattr__(self, name, value)
     
     def __hash__(self):
         return hash(self._internal_id)
@@ -254,10 +357,22 @@ class Node:
         if not isinstance(other, Node):
             return NotImplemented
         return self._internal_id == other._internal_id
+
+    def version_key(self) -> Tuple:
+        """节点渲染状态签名
+
+        由节点自身版本号和各参数的（身份、版本号、是否有依赖）组成。
+        参数列表被原地增删、换序，或参数字段被修改时签名都会改变。
+        """
+        return (self._version, tuple(
+            (param._internal_id, param._version, bool(param.dependencies))
+            for param in self.parameters
+        ))
     
     def add_parameter(self, parameter: Parameter) -> None:
         """添加参数到节点"""
         self.parameters.append(parameter)
+        self._version += 1
     
     def remove_parameter(self, name: str) -> None:
         """从节点移除参数"""
@@ -286,6 +401,257 @@ class Node:
             "id": self.id
         }
 
+@dataclass(frozen=True)
+class ParameterState:
+    """参数在某一时刻的不可变快照（用于撤销/重做）"""
+    param: Parameter
+    name: str
+    value: Any
+    unit: str
+    description: str
+    confidence: float
+    calculation_func: Optional[str]
+    dependencies: Tuple[Parameter, ...]
+    unlinked: bool
+    param_type: str
+    distribution: str
+
+    @classmethod
+    def capture(cls, param: Parameter) -> 'ParameterState':
+        return cls(
+            param=param,
+            name=param.name,
+            value=param._value,
+            unit=param.unit,
+            description=param.description,
+            confidence=param.confidence,
+            calculation_func=param.calculation_func,
+            dependencies=tuple(param.dependencies),
+            unlinked=param.unlinked,
+            param_type=getattr(param, 'param_type', "float"),
+            distribution=param.distribution
+        )
+
+    def restore(self, graph: 'CalculationGraph') -> Parameter:
+        """把快照中的字段写回参数对象并返回该对象"""
+        param = self.param
+        param.name = self.name
+        param._value = self.value
+        param.unit = self.unit
+        param.description = self.description
+        param.confidence = self.confidence
+        param.calculation_func = self.calculation_func
+        param.dependencies = list(self.dependencies)
+        param.unlinked = self.unlinked
+        param.param_type = self.param_type
+        param.distribution = self.distribution
+        param.set_graph(graph)
+        return param
+
+
+@dataclass(frozen=True)
+class NodeState:
+    """节点及其参数列表在某一时刻的不可变快照"""
+    node: Node
+    node_id: str
+    name: str
+    description: str
+    node_type: str
+    parameters: Tuple[ParameterState, ...]
+
+
+@dataclass(frozen=True)
+class GraphSnapshot:
+    """计算图快照
+
+    与上一快照相比未发生变化的 NodeState / ParameterState 直接复用同一对象，
+    因此每个历史步骤只为实际变化的部分占用内存。
+    """
+    nodes: Tuple[NodeState, ...]
+    layout: Optional[Tuple[int, int, Tuple[Tuple[str, int, int], ...]]]
+    next_node_id: int
+    label: str = ""
+
+    @classmethod
+    def capture(cls, graph: 'CalculationGraph', previous: Optional['GraphSnapshot'] = None,
+                label: str = "") -> 'GraphSnapshot':
+        previous_nodes = {state.node_id: state for state in previous.nodes} if previous else {}
+
+        node_states = []
+        for node_id, node in graph.nodes.items():
+            previous_node = previous_nodes.get(node_id)
+            previous_params = {state.param: state for state in previous_node.parameters} if previous_node else {}
+
+            param_states = []
+            for param in node.parameters:
+                state = ParameterState.capture(param)
+                previous_state = previous_params.get(param)
+                param_states.append(previous_state if previous_state == state else state)
+
+            node_state = NodeState(
+                node=node,
+                node_id=node_id,
+                name=node.name,
+                description=node.description,
+                node_type=node.node_type,
+                parameters=tuple(param_states)
+            )
+            node_states.append(previous_node if previous_node == node_state else node_state)
+
+        layout = None
+        if graph.layout_manager:
+            lm = graph.layout_manager
+            layout = (lm.cols, lm.rows, tuple(
+                (node_id, pos.row, pos.col) for node_id, pos in lm.node_positions.items()
+            ))
+            if previous and previous.layout == layout:
+                layout = previous.layout
+
+        return cls(nodes=tuple(node_states), layout=layout,
+                   next_node_id=graph._next_node_id, label=label)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """将快照转换为与 CalculationGraph.to_dict(include_layout=True) 相同格式的字典
+
+        只读取快照本身的字段，可在其他线程修改计算图时安全调用。
+        """
+        names = {state.param: state.name for node_state in self.nodes for state in node_state.parameters}
+        graph_dict = {
+            "nodes": {},
+            "dependencies": {},
+            "metadata": {
+                "created_at": datetime.now().isoformat(),
+                "node_count": len(self.nodes),
+                "total_parameters": sum(len(node_state.parameters) for node_state in self.nodes)
+            }
+        }
+        for node_state in self.nodes:
+            parameters = []
+            for state in node_state.parameters:
+                dependencies = [names.get(dep, dep.name) for dep in state.dependencies]
+                parameters.append({
+                    "name": state.name,
+                    "value": state.value,
+                    "unit": state.unit,
+                    "description": state.description,
+                    "confidence": state.confidence,
+                    "calculation_func": state.calculation_func,
+                    "dependencies": dependencies,
+                    "unlinked": state.unlinked,
+                    "param_type": state.param_type,
+                    "distribution": state.distribution,
+                    "calculation_traceback": state.param._calculation_traceback
+                })
+                if dependencies:
+                    graph_dict["dependencies"][f"{node_state.node_id}.{state.name}"] = dependencies
+            graph_dict["nodes"][node_state.node_id] = {
+                "name": node_state.name,
+                "description": node_state.description,
+                "parameters": parameters,
+                "node_type": node_state.node_type,
+                "id": node_state.node_id
+            }
+
+        if self.layout is not None:
+            cols, rows, positions = self.layout
+            graph_dict["layout"] = {
+                "cols": cols,
+                "rows": rows,
+                "node_positions": {node_id: {"row": row, "col": col} for node_id, row, col in positions}
+            }
+        return graph_dict
+
+    def same_state(self, other: 'GraphSnapshot') -> bool:
+        """比较两个快照描述的图状态是否相同（忽略标签）"""
+        return (self.nodes == other.nodes and self.layout == other.layout
+                and self.next_node_id == other.next_node_id)
+
+    def restore(self, graph: 'CalculationGraph') -> None:
+        """把计算图恢复到快照状态"""
+        graph.nodes.clear()
+        for node_state in self.nodes:
+            node = node_state.node
+            node.id = node_state.node_id
+            node.name = node_state.name
+            node.description = node_state.description
+            node.node_type = node_state.node_type
+            node.parameters = [state.restore(graph) for state in node_state.parameters]
+            graph.nodes[node_state.node_id] = node
+
+        if self.layout is not None and graph.layout_manager:
+            lm = graph.layout_manager
+            lm.cols, lm.rows, positions = self.layout
+            lm.reset()
+            for node_id, row, col in positions:
+                lm.place_node(node_id, GridPosition(row, col))
+
+        graph._next_node_id = self.next_node_id
+        graph.recently_updated_params.clear()
+        graph._rebuild_dependency_graph()
+
+
+class GraphHistory:
+    """计算图的有界撤销/重做历史
+
+    在每次修改计算图之前调用 checkpoint() 记录修改前的快照（通常经由 CalculationGraph.mutation）。
+    """
+
+    def __init__(self, max_steps: int = 50):
+        self._undo: deque = deque(maxlen=max_steps)
+        self._redo: List[GraphSnapshot] = []
+        self._last: Optional[GraphSnapshot] = None  # 最近一次捕获的快照，用于结构共享
+
+    def _capture(self, graph: 'CalculationGraph', label: str = "") -> GraphSnapshot:
+        snapshot = GraphSnapshot.capture(graph, self._last, label)
+        self._last = snapshot
+        return snapshot
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def checkpoint(self, graph: 'CalculationGraph', label: str) -> None:
+        """记录即将进行的修改之前的状态"""
+        snapshot = self._capture(graph, label)
+        if self._undo and self._undo[-1].same_state(snapshot):
+            # 上次记录后图没有变化，只更新操作说明
+            self._undo[-1] = snapshot
+        else:
+            self._undo.append(snapshot)
+        self._redo.clear()
+
+    def undo(self, graph: 'CalculationGraph') -> Optional[str]:
+        """撤销最近一次修改，返回被撤销操作的说明；无可撤销操作时返回None"""
+        current = self._capture(graph)
+        while self._undo:
+            snapshot = self._undo.pop()
+            if not snapshot.same_state(current):
+                self._redo.append(replace(current, label=snapshot.label))
+                snapshot.restore(graph)
+                return snapshot.label
+        return None
+
+    def redo(self, graph: 'CalculationGraph') -> Optional[str]:
+        """重做最近一次撤销的修改，返回操作说明；无可重做操作时返回None"""
+        current = self._capture(graph)
+        while self._redo:
+            snapshot = self._redo.pop()
+            if not snapshot.same_state(current):
+                self._undo.append(replace(current, label=snapshot.label))
+                snapshot.restore(graph)
+                return snapshot.label
+        return None
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
+        self._last = None
+
+
 class CalculationGraph:
     """计算图类，管理所有节点和参数之间的依赖关系"""
     
@@ -299,6 +665,9 @@ class CalculationGraph:
         self.layout_manager: Optional['CanvasLayoutManager'] = None
         self._next_node_id = 1
         self.recently_updated_params: set[str] = set()
+        self.history = GraphHistory()
+        self.version = 0  # 修改计数器，每次修改完成（及撤销/重做）后递增，供自动保存、会话日志判断是否有变化
+        self._mutations = 0  # 进行中的修改数，非零时计算图可能处于修改到一半的状态
         
     def get_next_node_id(self) -> str:
         """生成下一个唯一的节点ID"""
@@ -381,6 +750,47 @@ class CalculationGraph:
                 if param not in self._dependents_map[dep]:
                     self._dependents_map[dep].append(param)
 
+    def get_parameter_dependents(self, param: 'Parameter') -> List['Parameter']:
+        """返回直接依赖该参数的参数（查依赖关系映射，无需遍历所有参数）"""
+        return list(self._dependents_map.get(param, []))
+
+    def cone_hash(self, target: 'Parameter', free: Tuple['Parameter', ...] = ()) -> str:
+        """target 上游锥体（target 及其全部传递依赖）的内容哈希
+
+        free 中的参数（如扫描变量）只按其在 free 中的位置计入，不计入值和上游；
+        依赖自由参数的计算参数会被重新计算，也不计入当前值。不依赖自由参数的上游
+        直接使用参数的 Merkle 内容哈希（见 Parameter.content_hash），无需重新遍历。
+        与对象身份、节点ID无关，加载同一份计算图文件的不同会话得到相同的哈希。
+        """
+        # 自由参数的全部下游：只有这些参数的哈希需要按扫描语义重新计算
+        downstream = set(free)
+        pending = list(free)
+        while pending:
+            for dependent in self._dependents_map.get(pending.pop(), ()):
+                if dependent not in downstream:
+                    downstream.add(dependent)
+                    pending.append(dependent)
+
+        hashes: Dict['Parameter', str] = {}
+
+        def visit(param: 'Parameter') -> str:
+            if param not in downstream:
+                return param.content_hash
+            if param in hashes:
+                return hashes[param]
+            if param in free:
+                hashes[param] = hashlib.sha256(f"free:{free.index(param)}".encode()).hexdigest()
+                return hashes[param]
+            hashes[param] = "cycle"
+            recomputed = bool(param.calculation_func) and not param.unlinked
+            digest = hashlib.sha256(_hash_fields(param, include_value=not recomputed).encode())
+            for dep in param.dependencies:
+                digest.update(visit(dep).encode())
+            hashes[param] = digest.hexdigest()
+            return hashes[param]
+
+        return visit(target)
+
     def propagate_updates(self, changed_param: 'Parameter') -> List[Dict[str, Any]]:
         """从一个改变的参数开始，递归地更新所有依赖它的下游参数"""
         
@@ -508,6 +918,114 @@ class CalculationGraph:
         """设置布局管理器"""
         self.layout_manager = layout_manager
     
+    @contextmanager
+    def mutation(self, label: str):
+        """修改计算图的上下文：进入时记录撤销点，退出时递增 version
+
+        version 在修改完成后才递增，其他请求（进度轮询等）按 version 记录的状态
+        不会是修改到一半的计算图；修改进行中 mutating 为 True。
+
+        Args:
+            label: 即将进行的操作说明，撤销/重做时用于提示
+        """
+        self.history.checkpoint(self, label)
+        self._mutations += 1
+        try:
+            yield self
+        finally:
+            self._mutations -= 1
+            self.version += 1
+
+    @property
+    def mutating(self) -> bool:
+        """是否有修改正在进行"""
+        return self._mutations > 0
+
+    def undo(self) -> Optional[str]:
+        """撤销最近一次修改，返回被撤销操作的说明"""
+        label = self.history.undo(self)
+        if label is not None:
+            self.version += 1
+        return label
+
+    def redo(self) -> Optional[str]:
+        """重做最近一次撤销的修改，返回操作说明"""
+        label = self.history.redo(self)
+        if label is not None:
+            self.version += 1
+        return label
+
+    def inherit_history(self, previous: 'CalculationGraph', label: str) -> None:
+        """接管被替换计算图的撤销历史，使整图替换（加载、清空）也可撤销
+
+        Args:
+            previous: 即将被替换的计算图
+            label: 替换操作的说明
+        """
+        previous.history.checkpoint(previous, label)
+        self.history = previous.history
+
+    def clone(self, include_layout: bool = True, memo: Optional[Dict['Parameter', 'Parameter']] = None) -> 'CalculationGraph':
+        """复制计算图，得到可独立修改的副本
+
+        一次线性遍历复制节点、参数（值、unlinked 状态、计算回溯）和依赖关系，
+        依赖映射直接由原图换算而来，无需重建。计算代码、描述等不可变字符串
+        与原图共享，编译后的代码对象通过 compile_calculation 缓存共享。
+
+        Args:
+            include_layout: 是否同时复制布局管理器
+            memo: 可选字典，调用后填充为 原参数 -> 新参数 的映射，
+                  便于在副本中定位原图的参数
+
+        Returns:
+            新的计算图实例
+        """
+        graph = CalculationGraph()
+        param_map = memo if memo is not None else {}
+
+        for node_id, node in self.nodes.items():
+            new_node = Node(
+                name=node.name,
+                description=node.description,
+                id=node.id,
+                node_type=node.node_type
+            )
+            for param in node.parameters:
+                new_param = Parameter(
+                    param.name,
+                    param._value,
+                    param.unit,
+                    description=param.description,
+                    confidence=param.confidence,
+                    calculation_func=param.calculation_func,
+                    unlinked=param.unlinked,
+                    param_type=getattr(param, 'param_type', "float"),
+                    distribution=param.distribution,
+                    _graph=graph
+                )
+                new_param._calculation_traceback = param._calculation_traceback
+                new_node.parameters.append(new_param)
+                param_map[param] = new_param
+            graph.nodes[node_id] = new_node
+
+        # 依赖关系与依赖者映射按对象映射换算（依赖可能指向图外参数，此时保留原引用）
+        for param, new_param in param_map.items():
+            new_param.dependencies = [param_map.get(dep, dep) for dep in param.dependencies]
+        for param, dependents in self._dependents_map.items():
+            if isinstance(param, Parameter):
+                graph._dependents_map[param_map.get(param, param)] = [
+                    param_map.get(dependent, dependent) for dependent in dependents
+                ]
+
+        graph.dependencies = copy.copy(self.dependencies)
+        graph._next_node_id = self._next_node_id
+        graph.recently_updated_params = set(self.recently_updated_params)
+
+        if include_layout and self.layout_manager:
+            graph.set_layout_manager(self.layout_manager.clone())
+
+        return graph
+
     def to_dict(self, include_layout: bool = True) -> Dict[str, Any]:
         """将计算图转换为字典格式
         
@@ -617,7 +1135,8 @@ class CalculationGraph:
                     description=param_data.get("description", ""),
                     confidence=param_data.get("confidence", 1.0),
                     calculation_func=param_data.get("calculation_func"),
-                    unlinked=param_data.get("unlinked", False)
+                    unlinked=param_data.get("unlinked", False),
+                    distribution=param_data.get("distribution", "auto")
                 )
                 
                 # 设置计算图引用
@@ -840,6 +1359,16 @@ class CanvasLayoutManager:
         
         return layout_manager
 
+    def clone(self) -> 'CanvasLayoutManager':
+        """复制布局管理器（网格和位置映射均为独立副本）"""
+        layout_manager = CanvasLayoutManager.__new__(CanvasLayoutManager)
+        layout_manager.cols = self.cols
+        layout_manager.rows = self.rows
+        layout_manager.grid = [list(row) for row in self.grid]
+        layout_manager.node_positions = dict(self.node_positions)
+        layout_manager.position_nodes = dict(self.position_nodes)
+        return layout_manager
+
     def _init_grid(self):
         """初始化网格"""
         self.grid = [[None for _ in range(self.cols)] for _ in range(self.rows)]
@@ -11,6 +11,7 @@ from flask import has_request_context, request
 from urllib.parse import urlparse, parse_qs
 
 from models import CalculationGraph, CanvasLayoutManager
+from journal import record_session, restore_session
 
 # 线程安全锁
 _lock = threading.Lock()
@@ -59,6 +60,13 @@ def _get_session_id() -> str:
     return sid
 
 
+def current_session_id() -> str:
+    """返回当前请求的会话 sid；无请求上下文时返回 "default"。"""
+    if not has_request_context():
+        return "default"
+    return _get_session_id()
+
+
 def get_graph() -> CalculationGraph:
     """获取当前会话的 CalculationGraph；若无请求上下文则返回默认全局图。"""
     # 无活动请求时返回默认图（例如应用启动阶段）
@@ -69,8 +77,11 @@ def get_graph() -> CalculationGraph:
     sid = _get_session_id()
     with _lock:
         if sid not in SESSION_GRAPHS:
-            g = CalculationGraph()
-            g.set_layout_manager(CanvasLayoutManager(initial_cols=3, initial_rows=10))
+            # 进程重启后，优先从会话日志恢复
+            g = restore_session(sid)
+            if g is None:
+                g = CalculationGraph()
+                g.set_layout_manager(CanvasLayoutManager(initial_cols=3, initial_rows=10))
             SESSION_GRAPHS[sid] = g
         return SESSION_GRAPHS[sid]
 
@@ -87,6 +98,16 @@ def set_graph(graph: CalculationGraph) -> None:
         SESSION_GRAPHS[sid] = graph
 
 
+def record_current_session() -> None:
+    """把当前会话计算图的变更追加到会话日志（在每次回调请求结束后调用）"""
+    if not has_request_context():
+        return
+    sid = _get_session_id()
+    g = SESSION_GRAPHS.get(sid)
+    if g is not None:
+        record_session(sid, g)
+
+
 class GraphProxy:
     """延迟代理，属性访问自动转发到当前 session 的 graph。"""
 
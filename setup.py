@@ -9,7 +9,7 @@ with open("README.md", "r", encoding="utf-8") as fh:
 
 # 读取 requirements
 requirements = [
-    "dash>=2.0.0",
+    "dash>=4.2.0",
     "dash-bootstrap-components==2.0.3", 
     "dash-ace",
     "pandas>=1.0.0",
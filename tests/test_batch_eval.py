@@ -0,0 +1,112 @@
+"""batch_eval：锥体求值与批量计算"""
+import numpy as np
+import pytest
+
+from batch_eval import ConeEvaluator, evaluate_grid, upstream_cone
+from models import Parameter
+
+
+def build_cone(code="result = dependencies[0].value * dependencies[1].value + dependencies[2].value ** 2"):
+    """x、y 为自由参数，c 为常量，mid 依赖三者，target 依赖 mid 和 c"""
+    x = Parameter("x", 1.0)
+    y = Parameter("y", 2.0)
+    c = Parameter("c", 3.0)
+    mid = Parameter("mid", 0.0, calculation_func=code, dependencies=[x, y, c])
+    target = Parameter("target", 0.0, calculation_func="result = dependencies[0].value / dependencies[1].value",
+                       dependencies=[mid, c])
+    return x, y, c, mid, target
+
+
+def test_upstream_cone_is_topological():
+    x, y, c, mid, target = build_cone()
+    cone = upstream_cone(target)
+    assert cone[-1] is target
+    assert set(cone) == {x, y, c, mid, target}
+    assert cone.index(mid) > max(cone.index(x), cone.index(y), cone.index(c))
+
+
+def test_only_parameters_depending_on_free_inputs_are_recalculated():
+    x, y, c, mid, target = build_cone()
+    evaluator = ConeEvaluator(target, [x])
+    assert evaluator.order == [mid, target]
+
+    unlinked = Parameter("unlinked", 5.0, calculation_func="result = dependencies[0].value", dependencies=[x],
+                         unlinked=True)
+    top = Parameter("top", 0.0, calculation_func="result = dependencies[0].value + dependencies[1].value",
+                    dependencies=[unlinked, c])
+    assert ConeEvaluator(top, [x]).order == []
+
+
+def test_vectorized_matches_serial():
+    x, y, c, mid, target = build_cone()
+    evaluator = ConeEvaluator(target, [x, y])
+    xs, ys = np.meshgrid(np.linspace(-2.0, 2.0, 7), np.linspace(0.5, 3.0, 5))
+    columns = [xs.ravel(), ys.ravel()]
+
+    vectorized = evaluator.evaluate_vectorized([column.copy() for column in columns])
+    serial = np.array([evaluator.evaluate_point(point) for point in zip(*columns)])
+    assert vectorized is not None
+    np.testing.assert_allclose(vectorized, serial, rtol=1e-12)
+
+
+def test_evaluate_grid_modes_agree():
+    """向量化、逐点两种方式（以及锥体序列化后重建）的结果一致"""
+    x, y, c, mid, target = build_cone()
+    columns = [np.linspace(-1.0, 1.0, 9), np.linspace(1.0, 2.0, 9)]
+    vectorized, mode = evaluate_grid(ConeEvaluator(target, [x, y]), columns)
+    assert mode == "vectorized"
+
+    x, y, c, mid, target = build_cone(
+        "result = float(dependencies[0].value) * dependencies[1].value + dependencies[2].value ** 2"
+    )
+    evaluator = ConeEvaluator(target, [x, y])
+    serial, mode = evaluate_grid(evaluator, columns)
+    assert mode == "serial"
+    np.testing.assert_allclose(serial, vectorized, rtol=1e-12)
+
+    rebuilt = ConeEvaluator.from_spec(evaluator.spec())
+    np.testing.assert_allclose([rebuilt.evaluate_point(point) for point in zip(*columns)], vectorized, rtol=1e-12)
+
+
+def test_unvectorizable_semantics_fall_back():
+    """条件分支在数组上会抛出异常，退回逐点计算"""
+    x = Parameter("x", 1.0)
+    target = Parameter("target", 0.0, dependencies=[x],
+                       calculation_func="result = dependencies[0].value if dependencies[0].value > 0 else 0.0")
+    columns = [np.linspace(-1.0, 1.0, 5)]
+    evaluator = ConeEvaluator(target, [x])
+    assert evaluator.evaluate_vectorized(columns) is None
+    result, mode = evaluate_grid(evaluator, columns)
+    assert mode == "serial"
+    np.testing.assert_allclose(result, [0.0, 0.0, 0.0, 0.5, 1.0])
+
+
+def test_failed_points_are_nan():
+    x = Parameter("x", 1.0)
+    target = Parameter("target", 0.0, dependencies=[x],
+                       calculation_func="import math\nresult = math.log(dependencies[0].value)")
+    result, mode = evaluate_grid(ConeEvaluator(target, [x]), [np.array([-1.0, 1.0, np.e])])
+    assert mode == "serial"
+    assert np.isnan(result[0])
+    np.testing.assert_allclose(result[1:], [0.0, 1.0])
+
+
+@pytest.mark.parametrize("n", [1, 2, 17])
+def test_evaluate_grid_reports_progress(n):
+    class RecordingJob:
+        def __init__(self):
+            self.reports = []
+
+        def report(self, done, total):
+            self.reports.append((done, total))
+
+        def checkpoint(self):
+            pass
+
+    x = Parameter("x", 1.0)
+    target = Parameter("target", 0.0, dependencies=[x],
+                       calculation_func="result = dependencies[0].value if dependencies[0].value > 0 else 0.0")
+    job = RecordingJob()
+    evaluate_grid(ConeEvaluator(target, [x]), [np.linspace(0.0, 1.0, n)], job=job)
+    assert job.reports[0] == (0, n)
+    assert all(total == n for _, total in job.reports)
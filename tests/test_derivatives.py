@@ -0,0 +1,119 @@
+"""derivatives：对偶数运算与前向模式求导"""
+import numpy as np
+import pytest
+
+from derivatives import Dual, downstream_order, forward_derivatives
+from models import CalculationGraph, Node, Parameter
+
+
+def dual(value, *der):
+    return Dual(value, np.array(der, dtype=float))
+
+
+def assert_dual(result, value, *der):
+    assert isinstance(result, Dual)
+    assert result.val == pytest.approx(value)
+    np.testing.assert_allclose(result.der, der)
+
+
+def test_arithmetic():
+    a, b = dual(3.0, 1.0, 0.0), dual(2.0, 0.0, 1.0)
+    assert_dual(a + b, 5.0, 1.0, 1.0)
+    assert_dual(a - b, 1.0, 1.0, -1.0)
+    assert_dual(a * b, 6.0, 2.0, 3.0)
+    assert_dual(a / b, 1.5, 0.5, -0.75)
+    assert_dual(2.0 * a + 1, 7.0, 2.0, 0.0)
+    assert_dual(1 - a, -2.0, -1.0, 0.0)
+    assert_dual(6 / a, 2.0, -2.0 / 3, 0.0)
+    assert_dual(-a, -3.0, -1.0, 0.0)
+    assert_dual(abs(-a), 3.0, 1.0, 0.0)
+    assert_dual(np.float64(2.0) * a, 6.0, 2.0, 0.0)
+
+
+def test_powers():
+    a, b = dual(3.0, 1.0, 0.0), dual(2.0, 0.0, 1.0)
+    assert_dual(a ** 2, 9.0, 6.0, 0.0)
+    assert_dual(a ** 0, 1.0, 0.0, 0.0)
+    assert_dual(2 ** b, 4.0, 0.0, 4.0 * np.log(2.0))
+    assert_dual(a ** b, 9.0, 6.0, 9.0 * np.log(3.0))
+    with pytest.raises(ValueError):
+        dual(-1.0, 1.0, 0.0) ** b
+
+
+def test_comparisons_use_values_and_float_is_rejected():
+    a = dual(3.0, 1.0)
+    assert a > 2 and a <= 3 and a == 3.0 and a != dual(3.5, 0.0)
+    assert int(a) == 3 and round(a) == 3 and f"{a:.1f}" == "3.0"
+    with pytest.raises(TypeError):
+        float(a)
+
+
+def build_graph():
+    """x、y 为输入；square = x²（对偶数），logged = log(x)·y（math 函数，退回有限差分），
+    total = square + logged，name 为字符串参数"""
+    graph = CalculationGraph()
+    node = Node(name="N")
+    graph.add_node(node)
+    x = Parameter("x", 2.0)
+    y = Parameter("y", 3.0)
+    square = Parameter("square", 0.0, calculation_func="result = dependencies[0].value ** 2", dependencies=[x])
+    logged = Parameter("logged", 0.0, dependencies=[x, y],
+                       calculation_func="import math\nresult = math.log(dependencies[0].value) * dependencies[1].value")
+    total = Parameter("total", 0.0, calculation_func="result = dependencies[0].value + dependencies[1].value",
+                      dependencies=[square, logged])
+    name = Parameter("name", "", param_type="string", calculation_func="result = f'{dependencies[0].value:.1f}'",
+                     dependencies=[x])
+    for param in (x, y, square, logged, total, name):
+        graph.add_parameter_to_node(node.id, param)
+    return graph, x, y, square, logged, total, name
+
+
+def test_downstream_order_is_topological():
+    graph, x, y, square, logged, total, name = build_graph()
+    order = downstream_order(graph, [x])
+    assert set(order) == {square, logged, total, name}
+    assert order.index(total) > max(order.index(square), order.index(logged))
+    assert set(downstream_order(graph, [y])) == {logged, total}
+
+
+def test_forward_derivatives_with_finite_difference_fallback():
+    graph, x, y, square, logged, total, name = build_graph()
+    results = forward_derivatives(graph, [x, y])
+
+    assert results[square].method == "dual"
+    np.testing.assert_allclose(results[square].gradient, [4.0, 0.0])
+
+    assert results[logged].method == "finite_difference"
+    np.testing.assert_allclose(results[logged].gradient, [3.0 / 2.0, np.log(2.0)], rtol=1e-6)
+
+    # 下游参数按链式法则组合有限差分得到的导数
+    assert results[total].method == "dual"
+    assert results[total].value == pytest.approx(4.0 + np.log(2.0) * 3.0)
+    np.testing.assert_allclose(results[total].gradient, [4.0 + 1.5, np.log(2.0)], rtol=1e-6)
+
+    # 结果为字符串的参数没有导数
+    assert name not in results
+
+
+def test_failed_parameters_and_their_dependents_are_skipped():
+    graph, x, y, square, logged, total, name = build_graph()
+    logged.calculation_func = "import math\nresult = math.log(dependencies[0].value - 10) * dependencies[1].value"
+    results = forward_derivatives(graph, [x])
+    assert square in results
+    assert logged not in results and total not in results
+
+
+def test_quantized_results_use_larger_step():
+    """取整后的结果用较大步长差分，避免微小步长跨过取整边界得到极大的差商"""
+    graph = CalculationGraph()
+    node = Node(name="N")
+    graph.add_node(node)
+    x = Parameter("x", 10.4)
+    count = Parameter("count", 0, param_type="int", dependencies=[x],
+                      calculation_func="import math\nresult = int(math.floor(dependencies[0].value * 10))")
+    graph.add_parameter_to_node(node.id, x)
+    graph.add_parameter_to_node(node.id, count)
+    results = forward_derivatives(graph, [x])
+    assert results[count].method == "finite_difference"
+    # 平均斜率为 10
+    assert 5 < results[count].gradient[0] < 20
@@ -0,0 +1,42 @@
+"""downsample：LTTB 曲线降采样"""
+import numpy as np
+
+from downsample import downsample_range, lttb
+
+
+def test_short_curves_are_unchanged():
+    x = np.arange(5.0)
+    y = x ** 2
+    for threshold in (2, 5, 10):
+        rx, ry = lttb(x, y, threshold)
+        np.testing.assert_array_equal(rx, x)
+        np.testing.assert_array_equal(ry, y)
+
+
+def test_keeps_endpoints_and_point_count():
+    x = np.linspace(0.0, 10.0, 1001)
+    y = np.sin(x)
+    rx, ry = lttb(x, y, 50)
+    assert len(rx) == len(ry) == 50
+    assert rx[0] == x[0] and rx[-1] == x[-1]
+    assert np.all(np.diff(rx) > 0)
+    # 选出的都是原始数据点
+    np.testing.assert_array_equal(ry, np.sin(rx))
+
+
+def test_keeps_spikes():
+    x = np.arange(1000.0)
+    y = np.zeros(1000)
+    y[137] = 5.0
+    y[612] = -3.0
+    rx, ry = lttb(x, y, 20)
+    assert 5.0 in ry and -3.0 in ry
+
+
+def test_downsample_range_keeps_one_point_outside_each_edge():
+    x = np.arange(100.0)
+    y = x * 2
+    rx, ry = downsample_range(x, y, 10.5, 20.5, threshold=100)
+    np.testing.assert_array_equal(rx, np.arange(10.0, 22.0))
+    rx, _ = downsample_range(x, y, None, None, threshold=10)
+    assert len(rx) == 10 and rx[0] == 0.0 and rx[-1] == 99.0
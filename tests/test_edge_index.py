@@ -0,0 +1,121 @@
+"""edge_index：画布箭头的增量边数据"""
+from edge_index import EdgeIndex, edge_payload
+from models import CalculationGraph, Node, Parameter
+
+
+def build_graph():
+    graph = CalculationGraph()
+    source = Node(name="source")
+    sink = Node(name="sink")
+    graph.add_node(source)
+    graph.add_node(sink)
+    a = Parameter("a", 1.0)
+    b = Parameter("b", 2.0)
+    total = Parameter("total", 0.0, calculation_func="result = dependencies[0].value + dependencies[1].value",
+                      dependencies=[a, b])
+    graph.add_parameter_to_node(source.id, a)
+    graph.add_parameter_to_node(source.id, b)
+    graph.add_parameter_to_node(sink.id, total)
+    return graph, source, sink, a, b, total
+
+
+class Client:
+    """按客户端的方式应用边数据"""
+
+    def __init__(self):
+        self.data = None
+        self.edges = {}
+        self.names = {}
+
+    def apply(self, payload):
+        if payload is None:
+            return
+        if payload["reset"]:
+            self.edges, self.names = {}, {}
+        for edge_id in payload["removed"]:
+            del self.edges[edge_id]
+        for record in payload["added"]:
+            self.edges[record[0]] = tuple(record[1:])
+        self.names.update(payload["names"])
+        self.data = {"index": payload["index"], "version": payload["version"]}
+
+
+def full_state(index):
+    payload = index.payload_since(None)
+    return {record[0]: tuple(record[1:]) for record in payload["added"]}, payload["names"]
+
+
+def test_incremental_payloads_match_full_state():
+    graph, source, sink, a, b, total = build_graph()
+    client = Client()
+    first = edge_payload(graph, client.data)
+    assert first["reset"]
+    client.apply(first)
+    assert sorted(client.edges.values()) == [("1", 0, "2", 0), ("1", 1, "2", 0)]
+    assert edge_payload(graph, client.data) is None
+
+    # 删除一条依赖
+    total.dependencies = [a]
+    graph.update_parameter_dependencies(total)
+    payload = edge_payload(graph, client.data)
+    assert not payload["reset"] and payload["added"] == [] and len(payload["removed"]) == 1
+    client.apply(payload)
+
+    # 重命名只发送名称变化
+    b.name = "b2"
+    payload = edge_payload(graph, client.data)
+    assert payload["added"] == [] and payload["removed"] == [] and payload["names"] == {"1": ["source", ["a", "b2"]]}
+    client.apply(payload)
+
+    # 新节点和新依赖
+    extra = Node(name="extra")
+    graph.add_node(extra)
+    c = Parameter("c", 0.0, calculation_func="result = dependencies[0].value", dependencies=[total])
+    graph.add_parameter_to_node(extra.id, c)
+    client.apply(edge_payload(graph, client.data))
+
+    index = EdgeIndex()
+    index.refresh(graph)
+    expected_edges, expected_names = full_state(index)
+    assert sorted(client.edges.values()) == sorted(expected_edges.values())
+    assert client.names["3"] == expected_names["3"] == ["extra", ["c"]]
+
+
+def test_skipped_versions_are_merged():
+    graph, source, sink, a, b, total = build_graph()
+    index = EdgeIndex()
+    index.refresh(graph)
+    client = Client()
+    client.apply(index.payload_since(None))
+    version = index.version
+
+    total.dependencies = [a]
+    graph.update_parameter_dependencies(total)
+    index.refresh(graph)
+    total.dependencies = [a, b]
+    graph.update_parameter_dependencies(total)
+    index.refresh(graph)
+
+    # 边先删后加，ID不变：合并后既不新增也不删除
+    payload = index.payload_since(version)
+    assert payload["removed"] == []
+    client.apply(payload)
+    assert client.edges == full_state(index)[0]
+
+
+def test_stale_or_foreign_clients_get_reset():
+    graph, source, sink, a, b, total = build_graph()
+    index = EdgeIndex(max_log=2)
+    index.refresh(graph)
+    start = index.version
+    for name in ("x", "y", "z"):
+        a.name = name
+        assert index.refresh(graph)
+    assert index.payload_since(start)["reset"]
+    assert not index.payload_since(index.version - 2)["reset"]
+    assert index.payload_since(index.version + 1)["reset"]
+    assert not index.refresh(graph)
+
+    other, *_ = build_graph()
+    client_data = {"index": index.serial, "version": index.version}
+    assert edge_payload(other, client_data)["reset"]
@@ -0,0 +1,109 @@
+"""GraphHistory：撤销/重做与结构共享快照"""
+from models import CalculationGraph, CanvasLayoutManager, GraphHistory, GraphSnapshot, Node, Parameter
+
+
+def build_graph():
+    graph = CalculationGraph()
+    graph.set_layout_manager(CanvasLayoutManager(initial_cols=3, initial_rows=6))
+    node = Node(name="N")
+    graph.add_node(node)
+    a = Parameter("a", 1.0)
+    total = Parameter("total", 0.0, calculation_func="result = dependencies[0].value * 2", dependencies=[a])
+    graph.add_parameter_to_node(node.id, a)
+    graph.add_parameter_to_node(node.id, total)
+    graph.propagate_updates(a)
+    return graph, node, a, total
+
+
+def test_undo_redo_values():
+    graph, node, a, total = build_graph()
+    with graph.mutation("修改参数 a"):
+        graph.set_parameter_value(a, 5.0)
+    assert total.value == 10.0
+
+    assert graph.undo() == "修改参数 a"
+    assert (a.value, total.value) == (1.0, 2.0)
+    assert graph.undo() is None
+
+    assert graph.redo() == "修改参数 a"
+    assert (a.value, total.value) == (5.0, 10.0)
+    assert graph.redo() is None
+
+
+def test_undo_restores_structure_and_layout():
+    graph, node, a, total = build_graph()
+    with graph.mutation("创建节点 M"):
+        extra = Node(name="M")
+        graph.add_node(extra)
+    with graph.mutation("删除参数"):
+        node.parameters.pop(1)
+    assert [p.name for p in node.parameters] == ["a"]
+
+    assert graph.undo() == "删除参数"
+    assert node.parameters == [a, total]
+    assert graph.get_parameter_dependents(a) == [total]
+    assert graph.undo() == "创建节点 M"
+    assert list(graph.nodes) == [node.id]
+    assert extra.id not in graph.layout_manager.node_positions
+    assert graph.redo() == "创建节点 M"
+    assert graph.nodes[extra.id] is extra
+    assert extra.id in graph.layout_manager.node_positions
+
+
+def test_new_mutation_clears_redo_and_noop_steps_are_skipped():
+    graph, node, a, total = build_graph()
+    with graph.mutation("修改参数 a"):
+        graph.set_parameter_value(a, 3.0)
+    graph.undo()
+    assert graph.history.can_redo
+    with graph.mutation("无变化"):
+        pass
+    assert not graph.history.can_redo
+
+    # 没有实际变化的撤销点被跳过
+    with graph.mutation("修改参数 a"):
+        graph.set_parameter_value(a, 4.0)
+    with graph.mutation("无变化"):
+        pass
+    assert graph.undo() == "修改参数 a"
+    assert a.value == 1.0
+
+
+def test_version_bumps_after_mutation():
+    graph, node, a, total = build_graph()
+    version = graph.version
+    with graph.mutation("修改参数 a"):
+        assert graph.mutating and graph.version == version
+        graph.set_parameter_value(a, 2.0)
+    assert not graph.mutating and graph.version == version + 1
+    graph.undo()
+    assert graph.version == version + 2
+    assert graph.redo() is not None and graph.version == version + 3
+
+
+def test_history_is_bounded():
+    graph, node, a, total = build_graph()
+    graph.history = GraphHistory(max_steps=3)
+    for value in range(2, 8):
+        with graph.mutation(f"设为 {value}"):
+            graph.set_parameter_value(a, float(value))
+    undone = []
+    while (label := graph.undo()) is not None:
+        undone.append(label)
+    assert undone == ["设为 7", "设为 6", "设为 5"]
+    assert a.value == 4.0
+
+
+def test_snapshots_share_unchanged_nodes():
+    graph, node, a, total = build_graph()
+    other = Node(name="other")
+    graph.add_node(other)
+    graph.add_parameter_to_node(other.id, Parameter("b", 1.0))
+    first = GraphSnapshot.capture(graph)
+    a.value = 9.0
+    second = GraphSnapshot.capture(graph, first)
+    assert second.nodes[1] is first.nodes[1]
+    assert second.nodes[0] is not first.nodes[0]
+    assert second.nodes[0].parameters[1] is first.nodes[0].parameters[1]
+    assert not second.same_state(first)
+    assert GraphSnapshot.capture(graph, second).same_state(second)
@@ -0,0 +1,130 @@
+"""jobs：后台任务的公平调度、取代与准入控制"""
+import threading
+import time
+
+import pytest
+
+from jobs import Job, JobRejected, JobRunner
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("等待超时")
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def blocked_runner():
+    """单工作线程的执行器，工作线程被一个任务占住，直到 release 置位"""
+    runner = JobRunner(max_workers=1, max_queued=4, max_queued_per_session=2)
+    release = threading.Event()
+    blocker = runner.submit(("busy", "sweep"), lambda job: release.wait(5))
+    wait_until(lambda: blocker.status == Job.RUNNING)
+    yield runner, release, blocker
+    release.set()
+
+
+def test_fair_share_order(blocked_runner):
+    runner, release, blocker = blocked_runner
+    order = []
+
+    def task(tag):
+        return lambda job: order.append(tag)
+
+    jobs = [
+        runner.submit(("A", "sweep"), task("A1")),
+        runner.submit(("A", "monte_carlo"), task("A2")),
+        runner.submit(("B", "sweep"), task("B1")),
+        runner.submit(("C", "sweep"), task("C1")),
+    ]
+    # 会话A先提交两个任务，但B、C不必等A的全部任务完成
+    assert [runner.queue_position(job) for job in jobs] == [1, 4, 2, 3]
+
+    release.set()
+    wait_until(lambda: all(job.finished for job in jobs))
+    assert order == ["A1", "B1", "C1", "A2"]
+
+
+def test_resubmission_supersedes_previous_job(blocked_runner):
+    runner, release, blocker = blocked_runner
+    first = runner.submit(("A", "sweep"), lambda job: "first")
+    second = runner.submit(("A", "sweep"), lambda job: "second")
+    assert first.status == Job.CANCELLED
+    assert not runner.is_current(first) and runner.is_current(second)
+
+    release.set()
+    wait_until(lambda: second.finished)
+    assert second.result == "second"
+    assert runner.collect(second.id) is second
+    assert runner.get(second.id) is None
+
+
+def test_rejected_submission_keeps_previous_job(blocked_runner):
+    runner, release, blocker = blocked_runner
+    runner.submit(("A", "sweep"), lambda job: None)
+    kept = runner.submit(("A", "monte_carlo"), lambda job: None)
+    with pytest.raises(JobRejected):
+        runner.submit(("A", "tornado"), lambda job: None)
+
+    # 取代排队中的任务不占用新的名额
+    replacement = runner.submit(("A", "monte_carlo"), lambda job: None)
+    assert kept.status == Job.CANCELLED and runner.is_current(replacement)
+
+    runner.submit(("B", "sweep"), lambda job: None)
+    runner.submit(("C", "sweep"), lambda job: None)
+    with pytest.raises(JobRejected):
+        runner.submit(("D", "sweep"), lambda job: None)
+
+    # 被拒绝时同一所有者正在运行的任务不受影响
+    with pytest.raises(JobRejected):
+        runner.submit(("busy", "sweep"), lambda job: None)
+    assert blocker.status == Job.RUNNING and not blocker.cancelled and runner.is_current(blocker)
+
+
+def test_cancel_running_job_at_checkpoint():
+    runner = JobRunner(max_workers=1)
+    started = threading.Event()
+
+    def long_task(job):
+        started.set()
+        while True:
+            job.checkpoint()
+            time.sleep(0.005)
+
+    job = runner.submit(("A", "sweep"), long_task)
+    started.wait(5)
+    runner.cancel(job.id)
+    wait_until(lambda: job.finished)
+    assert job.status == Job.CANCELLED
+
+
+def test_failed_job_records_error():
+    runner = JobRunner(max_workers=1)
+
+    def failing(job):
+        raise ValueError("boom")
+
+    job = runner.submit(("A", "sweep"), failing)
+    wait_until(lambda: job.finished)
+    assert job.status == Job.FAILED and job.error == "boom"
+
+
+def test_jobs_pause_during_interactive_operations():
+    runner = JobRunner(max_workers=1)
+    progress = []
+
+    def task(job):
+        for i in range(200):
+            job.checkpoint()
+            progress.append(i)
+            time.sleep(0.001)
+
+    with runner.interactive():
+        job = runner.submit(("A", "sweep"), task)
+        time.sleep(0.05)
+        paused_at = len(progress)
+    assert paused_at <= 1
+    wait_until(lambda: job.finished)
+    assert job.status == Job.DONE and len(progress) == 200
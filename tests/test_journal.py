@@ -0,0 +1,164 @@
+"""journal：变更日志的记录与重放"""
+import json
+
+import pytest
+
+from constants import PerformanceConstants
+from journal import SessionJournal, _apply_ops
+from models import CalculationGraph, CanvasLayoutManager, GridPosition, Node, Parameter
+
+
+def build_graph():
+    graph = CalculationGraph()
+    graph.set_layout_manager(CanvasLayoutManager(initial_cols=3, initial_rows=6))
+    source = Node(name="source")
+    sink = Node(name="sink")
+    graph.add_node(source)
+    graph.add_node(sink)
+    a = Parameter("a", 1.0, unit="m", confidence=0.8, distribution="uniform")
+    b = Parameter("b", 2.0)
+    total = Parameter("total", 0.0, calculation_func="result = dependencies[0].value + dependencies[1].value",
+                      dependencies=[a, b])
+    graph.add_parameter_to_node(source.id, a)
+    graph.add_parameter_to_node(source.id, b)
+    graph.add_parameter_to_node(sink.id, total)
+    graph.propagate_updates(a)
+    return graph
+
+
+def describe(graph):
+    """计算图中与身份无关的内容，用于比较重放结果"""
+    nodes = {}
+    for node_id, node in graph.nodes.items():
+        nodes[node_id] = (node.name, node.description, [
+            (p.name, p.value, p.unit, p.confidence, p.calculation_func, [d.name for d in p.dependencies],
+             p.unlinked, p.param_type, p.distribution)
+            for p in node.parameters
+        ])
+    lm = graph.layout_manager
+    layout = (lm.cols, lm.rows, sorted((node_id, pos.row, pos.col) for node_id, pos in lm.node_positions.items()))
+    return nodes, layout, graph._next_node_id
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return SessionJournal(str(tmp_path / "session.journal"))
+
+
+def replay(journal):
+    return SessionJournal(journal.path).replay()
+
+
+def test_replay_round_trip(journal):
+    graph = build_graph()
+    journal.flush(graph)
+    assert describe(replay(journal)) == describe(graph)
+
+    source, sink = graph.nodes["1"], graph.nodes["2"]
+    a, b = source.parameters
+    with graph.mutation("修改参数 a"):
+        graph.set_parameter_value(a, 5.0)
+    journal.flush(graph)
+    with graph.mutation("重命名参数 b"):
+        b.name = "b2"
+        b.distribution = "triangular"
+    journal.flush(graph)
+    with graph.mutation("创建节点"):
+        extra = Node(name="extra")
+        graph.add_node(extra)
+        graph.add_parameter_to_node(extra.id, Parameter("c", "text", param_type="string"))
+    journal.flush(graph)
+    with graph.mutation("移动节点"):
+        graph.layout_manager.move_node(sink.id, GridPosition(4, 2))
+    journal.flush(graph)
+    with graph.mutation("删除节点"):
+        graph.layout_manager.remove_node(extra.id)
+        del graph.nodes[extra.id]
+    journal.flush(graph)
+
+    assert journal.records == 5
+    replayed = replay(journal)
+    assert describe(replayed) == describe(graph)
+    # 依赖关系指向重放后的参数对象
+    total = replayed.nodes["2"].parameters[0]
+    assert total.dependencies == replayed.nodes["1"].parameters
+    assert replayed.get_parameter_dependents(replayed.nodes["1"].parameters[0]) == [total]
+
+
+def test_unchanged_graph_is_not_recorded(journal):
+    graph = build_graph()
+    journal.flush(graph)
+    with graph.mutation("无变化"):
+        pass
+    journal.flush(graph)
+    journal.flush(graph)
+    assert journal.records == 0
+
+
+def test_flush_during_mutation_does_not_lose_edits(journal):
+    """修改进行中的 flush（如并发的轮询请求）不记录，修改完成后的 flush 记录完整结果"""
+    graph = build_graph()
+    journal.flush(graph)
+    a, b = graph.nodes["1"].parameters
+    with graph.mutation("批量修改"):
+        a.value = 2.0
+        journal.flush(graph)
+        b.value = 3.0
+    journal.flush(graph)
+
+    values = {p.name: p.value for p in replay(journal).nodes["1"].parameters}
+    assert values == {"a": 2.0, "b": 3.0}
+
+
+def test_compaction_rewrites_snapshot(journal, monkeypatch):
+    monkeypatch.setattr(PerformanceConstants, "JOURNAL_COMPACT_THRESHOLD", 2)
+    graph = build_graph()
+    journal.flush(graph)
+    a = graph.nodes["1"].parameters[0]
+    for value in (2.0, 3.0, 4.0, 5.0):
+        with graph.mutation("修改参数 a"):
+            graph.set_parameter_value(a, value)
+        journal.flush(graph)
+
+    with open(journal.path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert json.loads(lines[0])[0] == "s"
+    # 第3次记录前已有2条变更记录，改写为快照；之后又追加1条
+    assert len(lines) == 2 and journal.records == 1
+    assert describe(replay(journal)) == describe(graph)
+
+
+def test_truncated_last_line_is_ignored(journal):
+    graph = build_graph()
+    journal.flush(graph)
+    a = graph.nodes["1"].parameters[0]
+    with graph.mutation("修改参数 a"):
+        graph.set_parameter_value(a, 7.0)
+    journal.flush(graph)
+    expected = describe(graph)
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('[["v", 0, 9')
+    assert describe(replay(journal)) == expected
+
+
+def test_replay_continues_appending(journal):
+    """重放后继续在同一日志上追加变更"""
+    graph = build_graph()
+    journal.flush(graph)
+    restored_journal = SessionJournal(journal.path)
+    restored = restored_journal.replay()
+    with restored.mutation("修改参数 b"):
+        restored.set_parameter_value(restored.nodes["1"].parameters[1], 10.0)
+    restored_journal.flush(restored)
+    assert restored_journal.records == 1
+    assert describe(replay(journal)) == describe(restored)
+
+
+def test_apply_ops_updates_values_and_structure():
+    state = {"nodes": {"1": {"id": "1", "parameters": [{"k": 0, "value": 1.0, "unlinked": False, "confidence": 1.0}]}}}
+    _apply_ops(state, [["v", 0, 2.0, True, 0.5], ["n", {"id": "2", "parameters": []}], ["m", 3],
+                       ["l", {"cols": 4, "rows": 5, "positions": []}]])
+    assert state["nodes"]["1"]["parameters"][0] == {"k": 0, "value": 2.0, "unlinked": True, "confidence": 0.5}
+    assert "2" in state["nodes"] and state["next_node_id"] == 3 and state["layout"]["cols"] == 4
+    _apply_ops(state, [["d", "2"]])
+    assert "2" not in state["nodes"]
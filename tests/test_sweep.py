@@ -0,0 +1,50 @@
+"""sweep：由粗到细的扫描顺序与自适应采样"""
+import numpy as np
+import pytest
+
+from sweep import adaptive_sample, coarse_to_fine_order
+
+
+@pytest.mark.parametrize("n,coarse", [(0, 8), (1, 8), (2, 8), (7, 8), (100, 8), (1000, 64), (1025, 64)])
+def test_coarse_to_fine_order_is_permutation(n, coarse):
+    order = coarse_to_fine_order(n, coarse)
+    assert sorted(order.tolist()) == list(range(n))
+
+
+def test_coarse_to_fine_order_starts_with_even_coverage():
+    order = coarse_to_fine_order(1000, 10)
+    first = order[:10]
+    assert 0 in first and 999 in first
+    # 第一轮的点大致均匀分布
+    gaps = np.diff(np.sort(order[:17]))
+    assert gaps.max() <= 2 * gaps[:-1].min() + 1
+
+
+def test_adaptive_sample_refines_where_curve_bends():
+    step = lambda x: 1.0 if x > 0.3 else 0.0
+    xs, ys = adaptive_sample(step, 0.0, 1.0, initial_points=11, max_points=60, min_step=1e-4, tolerance=1e-3)
+    assert xs == sorted(xs)
+    assert len(xs) <= 60
+    near_step = sum(1 for x in xs if 0.2 <= x <= 0.4)
+    far_from_step = sum(1 for x in xs if 0.6 <= x <= 0.8)
+    assert near_step > far_from_step
+    # 阶跃位置被夹在很小的区间内
+    left = max(x for x, y in zip(xs, ys) if y == 0.0)
+    right = min(x for x, y in zip(xs, ys) if y == 1.0)
+    assert right - left < 1e-2
+
+
+def test_adaptive_sample_stops_on_linear_curve():
+    xs, ys = adaptive_sample(lambda x: 2 * x + 1, 0.0, 1.0, initial_points=5, max_points=100,
+                             min_step=1e-6, tolerance=1e-6)
+    assert len(xs) == 5
+    assert ys == [2 * x + 1 for x in xs]
+
+
+def test_adaptive_sample_skips_failed_points():
+    seen = []
+    evaluate = lambda x: None if 0.4 < x < 0.6 else x ** 2
+    xs, ys = adaptive_sample(evaluate, 0.0, 1.0, initial_points=11, max_points=40, min_step=1e-3, tolerance=1e-4,
+                             on_point=lambda x, y: seen.append((x, y)))
+    assert all(not (0.4 < x < 0.6) for x in xs)
+    assert sorted(seen) == list(zip(xs, ys))
@@ -0,0 +1,74 @@
+"""龙卷风图（单因素敏感性排序）
+
+对输出参数上游的每个输入参数（没有计算函数或已断开计算的非零数值参数），
+在其余输入保持当前值的前提下分别上调、下调一个比例，得到 2k+1 个情景
+（含基准情景）。整数类型的输入扰动后取整，取整后上下调都等于当前值的输入不参与排序。所有情景组成一批，经 ``batch_eval.evaluate_grid`` 一次算完，
+再按输出的变化幅度对输入排序。
+"""
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from batch_eval import ConeEvaluator, evaluate_grid, upstream_cone
+from models import Parameter
+
+
+def perturbed_values(param: Parameter, fraction: float) -> Tuple[float, float]:
+    """输入下调、上调 fraction 后的取值；整数类型的参数取整"""
+    value = float(param.value)
+    low, high = value * (1 - fraction), value * (1 + fraction)
+    if getattr(param, "param_type", "float") == "int":
+        low, high = float(np.round(low)), float(np.round(high))
+    return low, high
+
+
+def perturbable_inputs(target: Parameter, fraction: float) -> List[Parameter]:
+    """目标参数上游可以按比例扰动的输入参数（整数参数取整后上下调都不变的除外）"""
+    inputs = []
+    for param in upstream_cone(target):
+        if param is target or (param.calculation_func and not param.unlinked):
+            continue
+        value = param.value
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        if math.isfinite(value) and value != 0 and perturbed_values(param, fraction) != (value, value):
+            inputs.append(param)
+    return inputs
+
+
+def scenario_columns(inputs: List[Parameter], fraction: float) -> List[np.ndarray]:
+    """情景矩阵的各列（每个输入一列）
+
+    第0个情景为基准；第 2i+1、2i+2 个情景分别把第 i 个输入下调、上调 fraction
+    （整数类型的输入取整，见 perturbed_values）。
+    """
+    base = np.array([float(param.value) for param in inputs])
+    scenarios = np.tile(base, (2 * len(inputs) + 1, 1))
+    for i, param in enumerate(inputs):
+        scenarios[2 * i + 1, i], scenarios[2 * i + 2, i] = perturbed_values(param, fraction)
+    return list(scenarios.T)
+
+
+def run_tornado(target: Parameter, inputs: List[Parameter], fraction: float, job=None) -> Dict[str, Any]:
+    """批量计算所有情景，返回基准值和按变化幅度从大到小排序的各输入结果
+
+    直接修改参数的值，应在计算图副本上调用。
+
+    Returns:
+        {'baseline': 基准输出, 'method': 计算方式, 'rows': [{'param', 'low', 'high', 'swing'}, ...]}，
+        low/high 为该输入下调/上调时的输出（计算失败为 NaN），swing 为两者与基准偏差的最大绝对值
+    """
+    values, method = evaluate_grid(ConeEvaluator(target, inputs), scenario_columns(inputs, fraction), job)
+    baseline = values[0]
+    rows = []
+    for i, param in enumerate(inputs):
+        low, high = values[2 * i + 1], values[2 * i + 2]
+        deviations = np.abs(np.array([low, high]) - baseline)
+        swing = float(np.nanmax(deviations)) if np.isfinite(deviations).any() else float("nan")
+        rows.append({'param': param, 'low': float(low), 'high': float(high), 'swing': swing})
+    # 计算失败（NaN）的输入排在最后
+    rows.sort(key=lambda row: -row['swing'] if math.isfinite(row['swing']) else math.inf)
+    return {'baseline': float(baseline), 'method': method, 'rows': rows}